@@ -7,10 +7,10 @@ from django.urls import reverse
 from django.conf import settings
 from django.utils import timezone
 from datetime import datetime
-from calendar import monthrange
 from django.db.models import Count, Q
 
-from extractor.models import Ticket, SolicitudPruebas  
+from extractor import public_cache
+from extractor.models import Ticket, SolicitudPruebas
 
 
 def consultar_ticket(request):
@@ -19,62 +19,36 @@ def consultar_ticket(request):
     error = None
     
     # ========== 1. ESTADÍSTICAS SOLO DEL MES ACTUAL ==========
-    hoy = timezone.now()
-    inicio_mes = datetime(hoy.year, hoy.month, 1)
-    
-    # Obtener el último día del mes actual
-    ultimo_dia = monthrange(hoy.year, hoy.month)[1]
-    fin_mes = datetime(hoy.year, hoy.month, ultimo_dia, 23, 59, 59)
-    
-    # Aplicar timezone si es necesario
-    if timezone.is_aware(inicio_mes):
-        inicio_mes = timezone.make_aware(inicio_mes)
-        fin_mes = timezone.make_aware(fin_mes)
-    
-    # Filtrar tickets del mes actual
-    tickets_mes = Ticket.objects.filter(
-        fecha_creacion__gte=inicio_mes,
-        fecha_creacion__lte=fin_mes
-    )
-
-    solicitudes_sin_ticket = SolicitudPruebas.objects.filter(
-        ticket__isnull=True,  # Sin ticket asociado
-        fecha_creacion__gte=inicio_mes,
-        fecha_creacion__lte=fin_mes
-    ).count()
+    # Se leen de TicketDailyStats a través de la caché compartida (TTL corto,
+    # invalidada por las señales de Ticket y SolicitudPruebas)
+    hoy = timezone.localdate()
+    conteo_mes, solicitudes_sin_ticket = public_cache.estadisticas_mes(hoy)
+    conteo_mes = dict(conteo_mes)
     
     # ========== ESTADÍSTICAS CORREGIDAS ==========
-    total_tickets_mes = tickets_mes.count()
+    total_tickets_mes = sum(conteo_mes.values())
     
     # ✅ CORREGIDO: Tickets pendientes (GENERADO es el estado inicial)
-    tickets_pendientes_mes = tickets_mes.filter(
-        estado__in=['GENERADO']
-    ).count()
+    tickets_pendientes_mes = conteo_mes.get('GENERADO', 0)
     
     # Tickets en proceso
-    tickets_en_proceso_mes = tickets_mes.filter(
-        estado='EN_PROCESO'
-    ).count()
+    tickets_en_proceso_mes = conteo_mes.get('EN_PROCESO', 0)
     
     # Tickets completados exitosamente
-    tickets_completados_mes = tickets_mes.filter(
-        estado='COMPLETADO'
-    ).count()
+    tickets_completados_mes = conteo_mes.get('COMPLETADO', 0)
     
     # Tickets NO EXITOSOS
-    tickets_no_exitosos_mes = tickets_mes.filter(
-        estado='NO EXITOSO'  # ← Atención al espacio
-    ).count()
+    tickets_no_exitosos_mes = conteo_mes.get('NO EXITOSO', 0)  # ← Atención al espacio
     
     # Tickets CANCELADOS
-    tickets_cancelados_mes = tickets_mes.filter(
-        estado='CANCELADO'
-    ).count()
+    tickets_cancelados_mes = conteo_mes.get('CANCELADO', 0)
     
     # Estadísticas detalladas por estado
-    estadisticas_estados = list(tickets_mes.values('estado').annotate(
-    cantidad=Count('estado')
-    ).order_by('estado'))
+    estadisticas_estados = [
+        {'estado': estado, 'cantidad': cantidad}
+        for estado, cantidad in sorted(conteo_mes.items())
+        if cantidad
+    ]
 
     if solicitudes_sin_ticket > 0:
         estadisticas_estados.append({
@@ -90,11 +64,7 @@ def consultar_ticket(request):
     
     # ========== 2. LISTA DE TICKETS PENDIENTES (para mostrar en tabla) ==========
     # ✅ NUEVO: Obtener los tickets con estado GENERADO (pendientes)
-    tickets_pendientes_lista = Ticket.objects.select_related(
-        'cliente', 'proyecto', 'tipo_servicio'
-    ).filter(
-        estado='GENERADO'  # Tickets que están pendientes de atención
-    ).order_by('-fecha_creacion')[:20]  # Últimos 20 tickets pendientes
+    tickets_pendientes_lista = public_cache.tickets_pendientes()  # Últimos 20 tickets pendientes
     
     # ========== 3. NOMBRE DEL MES EN ESPAÑOL ==========
     meses_espanol = {
@@ -11,6 +11,7 @@ from django.http import HttpResponse
 from django.utils import timezone
 import logging
 
+from extractor import csv_export
 from extractor.models import Cliente
 
 logger = logging.getLogger(__name__)
@@ -131,27 +132,15 @@ def cliente_delete(request, id):
 def export_clientes_csv(request):
     """Exporta clientes a CSV"""
     try:
-        clientes = Cliente.objects.all()
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"clientes_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        import csv
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'])
-        
-        for cliente in clientes:
-            writer.writerow([
-                cliente.id, cliente.nombre, cliente.nomenclatura,
-                'Sí' if cliente.activo else 'No',
-                cliente.fecha_creacion.strftime('%d/%m/%Y %H:%M') if cliente.fecha_creacion else ''
-            ])
-        
-        return response
+        filas = (
+            [id_, nombre, nomenclatura, 'Sí' if activo else 'No', csv_export.formatear(fecha, '%d/%m/%Y %H:%M')]
+            for id_, nombre, nomenclatura, activo, fecha in csv_export.iterar(
+                Cliente.objects.all(), 'id', 'nombre', 'nomenclatura', 'activo', 'fecha_creacion'
+            )
+        )
+        return csv_export.respuesta_csv(
+            'clientes', ['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'], filas
+        )
         
     except Exception as e:
         logger.error(f"Error exportando clientes: {str(e)}")
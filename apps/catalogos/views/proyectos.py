@@ -9,6 +9,7 @@ from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 import logging
 
+from extractor import csv_export
 from extractor.models import Cliente, Proyecto
 
 logger = logging.getLogger(__name__)
@@ -162,31 +163,23 @@ def proyecto_delete(request, id):
 def export_proyectos_csv(request):
     """Exporta proyectos a CSV"""
     try:
-        proyectos = Proyecto.objects.all().select_related('cliente')
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"proyectos_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Cliente', 'Nombre', 'Código', 'Descripción', 'Activo', 'Fecha Inicio', 'Fecha Fin'])
-        
-        for proyecto in proyectos:
-            writer.writerow([
-                proyecto.id,
-                proyecto.cliente.nombre if proyecto.cliente else '',
-                proyecto.nombre,
-                proyecto.codigo,
-                proyecto.descripcion or '',
-                'Sí' if proyecto.activo else 'No',
-                proyecto.fecha_inicio.strftime('%d/%m/%Y') if proyecto.fecha_inicio else '',
-                proyecto.fecha_fin.strftime('%d/%m/%Y') if proyecto.fecha_fin else ''
-            ])
-        
-        return response
+        filas = (
+            [
+                id_, cliente or '', nombre, codigo, descripcion or '',
+                'Sí' if activo else 'No',
+                csv_export.formatear(fecha_inicio, '%d/%m/%Y'),
+                csv_export.formatear(fecha_fin, '%d/%m/%Y'),
+            ]
+            for id_, cliente, nombre, codigo, descripcion, activo, fecha_inicio, fecha_fin in csv_export.iterar(
+                Proyecto.objects.all(),
+                'id', 'cliente__nombre', 'nombre', 'codigo', 'descripcion', 'activo', 'fecha_inicio', 'fecha_fin',
+            )
+        )
+        return csv_export.respuesta_csv(
+            'proyectos',
+            ['ID', 'Cliente', 'Nombre', 'Código', 'Descripción', 'Activo', 'Fecha Inicio', 'Fecha Fin'],
+            filas,
+        )
         
     except Exception as e:
         logger.error(f"Error exportando proyectos: {str(e)}")
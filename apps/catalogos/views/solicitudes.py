@@ -4,17 +4,15 @@ Vistas para gestión de Solicitudes de Pruebas
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.core.cache import cache
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Q
 from django.http import HttpResponse
 from django.utils import timezone
 from datetime import timedelta
 import io
-import os
 import csv
 from datetime import datetime
-from openpyxl import load_workbook
 from django.conf import settings
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
@@ -23,9 +21,11 @@ from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import never_cache
 import logging
-from extractor.jira_helper import create_jira_issue_from_ticket
+from extractor.jira_helper import enqueue_jira_issue_from_ticket
+from apps.excel_processor.services import template_cache, template_writer
 from apps.excel_processor.services.ticket_generator import generate_and_save_ticket
 from extractor.models import Cliente, Proyecto, TipoServicio, SolicitudPruebas, Ticket
+from extractor.pagination import paginar
 
 logger = logging.getLogger('security')
 
@@ -86,21 +86,33 @@ def solicitud_list(request):
     por_pagina = request.GET.get('por_pagina', 10)
     try:
         por_pagina = int(por_pagina)
+        if por_pagina not in [10, 20, 50, 100]:
+            por_pagina = 20
     except ValueError:
         por_pagina = 20
     
-    paginator = Paginator(solicitudes, por_pagina)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Totales generales en una sola consulta
+    resumen = SolicitudPruebas.objects.aggregate(
+        total=Count('id'),
+        con_ticket=Count('id', filter=Q(ticket__isnull=False)),
+    )
+    
+    # Paginación por cursor; sin filtros el total ya está en el resumen
+    filtrado = any([cliente_id, proyecto_id, fecha_desde, fecha_hasta, con_ticket])
+    page_obj = paginar(
+        request, solicitudes, ('-fecha_creacion', '-id'), por_pagina,
+        filtrado=filtrado,
+        total=None if filtrado else resumen['total'],
+    )
     
     context = {
         'solicitudes': page_obj,
         'page_obj': page_obj,
         'clientes': Cliente.objects.filter(activo=True),
         'proyectos': Proyecto.objects.filter(activo=True),
-        'total_solicitudes': SolicitudPruebas.objects.count(),
-        'solicitudes_con_ticket': SolicitudPruebas.objects.filter(ticket__isnull=False).count(),
-        'solicitudes_sin_ticket': SolicitudPruebas.objects.filter(ticket__isnull=True).count(),
+        'total_solicitudes': resumen['total'],
+        'solicitudes_con_ticket': resumen['con_ticket'],
+        'solicitudes_sin_ticket': resumen['total'] - resumen['con_ticket'],
         'cliente_selected': int(cliente_id) if cliente_id else 0,
         'proyecto_selected': int(proyecto_id) if proyecto_id else 0,
         'fecha_desde': fecha_desde or '',
@@ -475,129 +487,116 @@ def _generar_excel_solicitud(request, solicitud):
     """
     Función interna compartida para generar el Excel de solicitud
     """
-    plantilla_path = os.path.join(
-        settings.BASE_DIR,
-        'static',
-        'plantillas',
-        'BID-PMC-FOR-00017_Formato_de_Solicitud_de_Pruebas.xlsx'
-    )
+    plantilla = template_cache.obtener(template_cache.PLANTILLA_SOLICITUD)
     
-    if not os.path.exists(plantilla_path):
+    if plantilla is None:
         if request.user.is_authenticated:
-            messages.error(request, f"No se encontró la plantilla en: {plantilla_path}")
+            messages.error(request, f"No se encontró la plantilla en: {template_cache.ruta(template_cache.PLANTILLA_SOLICITUD)}")
         return redirect('extractor:solicitud_detail', id=solicitud.id)
     
     try:
-        wb = load_workbook(plantilla_path)
-        
-        if 'Solicitud de Pruebas V4' in wb.sheetnames:
-            ws = wb['Solicitud de Pruebas V4']
-        else:
-            ws = wb.active
-        
-        def set_cell_value(sheet, coordinate, value):
-            try:
-                for merged_range in sheet.merged_cells.ranges:
-                    if coordinate in merged_range:
-                        top_left = merged_range.start_cell.coordinate
-                        sheet[top_left] = value
-                        return
-                sheet[coordinate] = value
-            except Exception as e:
-                print(f"⚠️ Error en {coordinate}: {e}")
-        
-        # Cliente (C5)
-        if solicitud.cliente:
-            set_cell_value(ws, 'C5', solicitud.cliente.nombre)
-        
-        # Proyecto (H5)
-        if solicitud.proyecto:
-            set_cell_value(ws, 'H5', solicitud.proyecto.nombre)
-        
-        # Fecha Solicitud (M5)
-        if solicitud.fecha_solicitud:
-            if hasattr(solicitud.fecha_solicitud, 'strftime'):
-                fecha_str = solicitud.fecha_solicitud.strftime('%d/%m/%Y')
-            else:
-                try:
-                    fecha_obj = datetime.strptime(str(solicitud.fecha_solicitud), '%Y-%m-%d')
-                    fecha_str = fecha_obj.strftime('%d/%m/%Y')
-                except:
-                    fecha_str = str(solicitud.fecha_solicitud)
-            set_cell_value(ws, 'M5', fecha_str)
-        
-        # Hora Solicitud (M6)
-        if solicitud.hora_solicitud:
-            if hasattr(solicitud.hora_solicitud, 'strftime'):
-                hora_str = solicitud.hora_solicitud.strftime('%H:%M') + ' hrs'
+        with plantilla.abrir() as wb:
+            if 'Solicitud de Pruebas V4' in wb.sheetnames:
+                ws = wb['Solicitud de Pruebas V4']
             else:
-                try:
-                    hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M:%S')
-                    hora_str = hora_obj.strftime('%H:%M') + ' hrs'
-                except:
+                ws = wb.active
+            
+            valores = {}
+            
+            # Cliente (C5)
+            if solicitud.cliente:
+                valores['C5'] = solicitud.cliente.nombre
+            
+            # Proyecto (H5)
+            if solicitud.proyecto:
+                valores['H5'] = solicitud.proyecto.nombre
+            
+            # Fecha Solicitud (M5)
+            if solicitud.fecha_solicitud:
+                if hasattr(solicitud.fecha_solicitud, 'strftime'):
+                    fecha_str = solicitud.fecha_solicitud.strftime('%d/%m/%Y')
+                else:
                     try:
-                        hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M')
+                        fecha_obj = datetime.strptime(str(solicitud.fecha_solicitud), '%Y-%m-%d')
+                        fecha_str = fecha_obj.strftime('%d/%m/%Y')
+                    except:
+                        fecha_str = str(solicitud.fecha_solicitud)
+                valores['M5'] = fecha_str
+            
+            # Hora Solicitud (M6)
+            if solicitud.hora_solicitud:
+                if hasattr(solicitud.hora_solicitud, 'strftime'):
+                    hora_str = solicitud.hora_solicitud.strftime('%H:%M') + ' hrs'
+                else:
+                    try:
+                        hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M:%S')
                         hora_str = hora_obj.strftime('%H:%M') + ' hrs'
                     except:
-                        hora_str = str(solicitud.hora_solicitud) + ' hrs'
-            set_cell_value(ws, 'M6', hora_str)
-        
-        # Tipo de Pruebas (D8)
-        if solicitud.tipo_prueba:
-            set_cell_value(ws, 'D8', solicitud.tipo_prueba.nombre)
-        
-        # Área Solicitante (K8)
-        set_cell_value(ws, 'K8', solicitud.area_solicitante or '')
-        
-        # Responsable Solicitud (D12)
-        set_cell_value(ws, 'D12', solicitud.responsable_solicitud or '')
-        
-        # Líder de Proyecto (J12)
-        set_cell_value(ws, 'J12', solicitud.lider_proyecto or '')
-        
-        # Tipo de Aplicación (D17)
-        set_cell_value(ws, 'D17', solicitud.tipo_aplicacion or '')
-        
-        # Número de Versión (M17)
-        set_cell_value(ws, 'M17', solicitud.numero_version or '')
-        
-        # Funcionalidad (D20)
-        if solicitud.funcionalidad_liberacion:
-            set_cell_value(ws, 'D20', solicitud.funcionalidad_liberacion)
-        
-        # Detalle de cambios (D22)
-        if solicitud.detalle_cambios:
-            set_cell_value(ws, 'D22', solicitud.detalle_cambios)
-        
-        # Justificación (D24)
-        if solicitud.justificacion_cambio:
-            set_cell_value(ws, 'D24', solicitud.justificacion_cambio)
-        
-        # Puntos a considerar (D26)
-        if solicitud.puntos_considerar:
-            set_cell_value(ws, 'D26', solicitud.puntos_considerar)
-        
-        # Pendientes (D28)
-        if solicitud.pendientes:
-            set_cell_value(ws, 'D28', solicitud.pendientes)
-        
-        # Insumos (D30)
-        if solicitud.insumos:
-            set_cell_value(ws, 'D30', solicitud.insumos)
-        
-        # Nombre de servicio (D37)
-        set_cell_value(ws, 'D37', 'Servicio de Pruebas')
-        
-        # Soporte back (J37)
-        set_cell_value(ws, 'J37', solicitud.responsable_solicitud or '')
-        
-        # Detalles del servicio (D39)
-        detalles = f"Cliente: {solicitud.cliente.nombre if solicitud.cliente else ''} - Proyecto: {solicitud.proyecto.nombre if solicitud.proyecto else ''}"
-        set_cell_value(ws, 'D39', detalles)
-        
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+                        try:
+                            hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M')
+                            hora_str = hora_obj.strftime('%H:%M') + ' hrs'
+                        except:
+                            hora_str = str(solicitud.hora_solicitud) + ' hrs'
+                valores['M6'] = hora_str
+            
+            # Tipo de Pruebas (D8)
+            if solicitud.tipo_prueba:
+                valores['D8'] = solicitud.tipo_prueba.nombre
+            
+            # Área Solicitante (K8)
+            valores['K8'] = solicitud.area_solicitante or ''
+            
+            # Responsable Solicitud (D12)
+            valores['D12'] = solicitud.responsable_solicitud or ''
+            
+            # Líder de Proyecto (J12)
+            valores['J12'] = solicitud.lider_proyecto or ''
+            
+            # Tipo de Aplicación (D17)
+            valores['D17'] = solicitud.tipo_aplicacion or ''
+            
+            # Número de Versión (M17)
+            valores['M17'] = solicitud.numero_version or ''
+            
+            # Funcionalidad (D20)
+            if solicitud.funcionalidad_liberacion:
+                valores['D20'] = solicitud.funcionalidad_liberacion
+            
+            # Detalle de cambios (D22)
+            if solicitud.detalle_cambios:
+                valores['D22'] = solicitud.detalle_cambios
+            
+            # Justificación (D24)
+            if solicitud.justificacion_cambio:
+                valores['D24'] = solicitud.justificacion_cambio
+            
+            # Puntos a considerar (D26)
+            if solicitud.puntos_considerar:
+                valores['D26'] = solicitud.puntos_considerar
+            
+            # Pendientes (D28)
+            if solicitud.pendientes:
+                valores['D28'] = solicitud.pendientes
+            
+            # Insumos (D30)
+            if solicitud.insumos:
+                valores['D30'] = solicitud.insumos
+            
+            # Nombre de servicio (D37)
+            valores['D37'] = 'Servicio de Pruebas'
+            
+            # Soporte back (J37)
+            valores['J37'] = solicitud.responsable_solicitud or ''
+            
+            # Detalles del servicio (D39)
+            detalles = f"Cliente: {solicitud.cliente.nombre if solicitud.cliente else ''} - Proyecto: {solicitud.proyecto.nombre if solicitud.proyecto else ''}"
+            valores['D39'] = detalles
+            
+            template_writer.escribir(ws, valores)
+            
+            buffer = io.BytesIO()
+            wb.save(buffer)
+            buffer.seek(0)
         
         response = HttpResponse(
             buffer.getvalue(),
@@ -674,18 +673,17 @@ def solicitud_crear_ticket(request, solicitud_id):
             'tipo_servicio_obj': solicitud.tipo_prueba
         }
         
-        # Generar y guardar ticket
-        ticket_code, ticket_obj = generate_and_save_ticket(
-            extracted_data,
-            solicitud.tipo_servicio_code,
-            nomenclaturas,
-            objetos_encontrados,
-            request
-        )
-        
-        # 🔥 CREAR ISSUE EN JIRA usando el helper
-        if ticket_obj:
-            # Preparar datos para Jira
+        with transaction.atomic():
+            # Generar y guardar ticket
+            ticket_code, ticket_obj = generate_and_save_ticket(
+                extracted_data,
+                solicitud.tipo_servicio_code,
+                nomenclaturas,
+                objetos_encontrados,
+                request
+            )
+            
+            # 🔥 Registrar el issue de Jira en el outbox (se crea en segundo plano)
             jira_data = {
                 'cliente_obj': solicitud.cliente,
                 'proyecto_obj': solicitud.proyecto,
@@ -697,22 +695,15 @@ def solicitud_crear_ticket(request, solicitud_id):
                 'detalle_cambios': solicitud.detalle_cambios or '',
                 'justificacion_cambio': solicitud.justificacion_cambio or '',
             }
+            enqueue_jira_issue_from_ticket(ticket_obj, jira_data, request)
             
-            success, message, jira_issue = create_jira_issue_from_ticket(
-                ticket_obj, jira_data, request
-            )
-            
-            if success:
-                messages.success(request, f'📋 {message}')
-            else:
-                messages.warning(request, f'Ticket creado pero {message}')
-        
-        # Actualizar la solicitud con el ticket
-        solicitud.ticket = ticket_obj
-        solicitud.tiene_ticket = True
-        solicitud.fecha_asociacion_ticket = timezone.now()
-        solicitud.save()
+            # Actualizar la solicitud con el ticket
+            solicitud.ticket = ticket_obj
+            solicitud.tiene_ticket = True
+            solicitud.fecha_asociacion_ticket = timezone.now()
+            solicitud.save()
         
+        messages.info(request, '📋 La incidencia en Jira se creará en segundo plano')
         messages.success(request, f'✅ Ticket generado exitosamente: {ticket_code}')
         return redirect('extractor:ticket_detail', id=ticket_obj.id)
         
@@ -747,106 +738,93 @@ def imprimir_solicitud_excel_public(request, id):
     
     solicitud = get_object_or_404(SolicitudPruebas, id=id)
     
-    plantilla_path = os.path.join(
-        settings.BASE_DIR,
-        'static',
-        'plantillas',
-        'BID-PMC-FOR-00017_Formato_de_Solicitud_de_Pruebas.xlsx'
-    )
+    plantilla = template_cache.obtener(template_cache.PLANTILLA_SOLICITUD)
     
-    if not os.path.exists(plantilla_path):
+    if plantilla is None:
         # Redirigir al detalle público si no hay plantilla
         from django.shortcuts import redirect
         return redirect('extractor:solicitud_detail_public', id=solicitud.id)
     
     try:
-        wb = load_workbook(plantilla_path)
-        
-        if 'Solicitud de Pruebas V4' in wb.sheetnames:
-            ws = wb['Solicitud de Pruebas V4']
-        else:
-            ws = wb.active
-        
-        def set_cell_value(sheet, coordinate, value):
-            try:
-                for merged_range in sheet.merged_cells.ranges:
-                    if coordinate in merged_range:
-                        top_left = merged_range.start_cell.coordinate
-                        sheet[top_left] = value
-                        return
-                sheet[coordinate] = value
-            except Exception as e:
-                print(f"⚠️ Error en {coordinate}: {e}")
-        
-        # Llenar datos de la solicitud
-        if solicitud.cliente:
-            set_cell_value(ws, 'C5', solicitud.cliente.nombre)
-        
-        if solicitud.proyecto:
-            set_cell_value(ws, 'H5', solicitud.proyecto.nombre)
-        
-        if solicitud.fecha_solicitud:
-            if hasattr(solicitud.fecha_solicitud, 'strftime'):
-                fecha_str = solicitud.fecha_solicitud.strftime('%d/%m/%Y')
-            else:
-                try:
-                    fecha_obj = datetime.strptime(str(solicitud.fecha_solicitud), '%Y-%m-%d')
-                    fecha_str = fecha_obj.strftime('%d/%m/%Y')
-                except:
-                    fecha_str = str(solicitud.fecha_solicitud)
-            set_cell_value(ws, 'M5', fecha_str)
-        
-        if solicitud.hora_solicitud:
-            if hasattr(solicitud.hora_solicitud, 'strftime'):
-                hora_str = solicitud.hora_solicitud.strftime('%H:%M') + ' hrs'
+        with plantilla.abrir() as wb:
+            if 'Solicitud de Pruebas V4' in wb.sheetnames:
+                ws = wb['Solicitud de Pruebas V4']
             else:
-                try:
-                    hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M:%S')
-                    hora_str = hora_obj.strftime('%H:%M') + ' hrs'
-                except:
+                ws = wb.active
+            
+            valores = {}
+            
+            # Llenar datos de la solicitud
+            if solicitud.cliente:
+                valores['C5'] = solicitud.cliente.nombre
+            
+            if solicitud.proyecto:
+                valores['H5'] = solicitud.proyecto.nombre
+            
+            if solicitud.fecha_solicitud:
+                if hasattr(solicitud.fecha_solicitud, 'strftime'):
+                    fecha_str = solicitud.fecha_solicitud.strftime('%d/%m/%Y')
+                else:
                     try:
-                        hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M')
+                        fecha_obj = datetime.strptime(str(solicitud.fecha_solicitud), '%Y-%m-%d')
+                        fecha_str = fecha_obj.strftime('%d/%m/%Y')
+                    except:
+                        fecha_str = str(solicitud.fecha_solicitud)
+                valores['M5'] = fecha_str
+            
+            if solicitud.hora_solicitud:
+                if hasattr(solicitud.hora_solicitud, 'strftime'):
+                    hora_str = solicitud.hora_solicitud.strftime('%H:%M') + ' hrs'
+                else:
+                    try:
+                        hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M:%S')
                         hora_str = hora_obj.strftime('%H:%M') + ' hrs'
                     except:
-                        hora_str = str(solicitud.hora_solicitud) + ' hrs'
-            set_cell_value(ws, 'M6', hora_str)
-        
-        if solicitud.tipo_prueba:
-            set_cell_value(ws, 'D8', solicitud.tipo_prueba.nombre)
-        
-        set_cell_value(ws, 'K8', solicitud.area_solicitante or '')
-        set_cell_value(ws, 'D12', solicitud.responsable_solicitud or '')
-        set_cell_value(ws, 'J12', solicitud.lider_proyecto or '')
-        set_cell_value(ws, 'D17', solicitud.tipo_aplicacion or '')
-        set_cell_value(ws, 'M17', solicitud.numero_version or '')
-        
-        if solicitud.funcionalidad_liberacion:
-            set_cell_value(ws, 'D20', solicitud.funcionalidad_liberacion)
-        
-        if solicitud.detalle_cambios:
-            set_cell_value(ws, 'D22', solicitud.detalle_cambios)
-        
-        if solicitud.justificacion_cambio:
-            set_cell_value(ws, 'D24', solicitud.justificacion_cambio)
-        
-        if solicitud.puntos_considerar:
-            set_cell_value(ws, 'D26', solicitud.puntos_considerar)
-        
-        if solicitud.pendientes:
-            set_cell_value(ws, 'D28', solicitud.pendientes)
-        
-        if solicitud.insumos:
-            set_cell_value(ws, 'D30', solicitud.insumos)
-        
-        set_cell_value(ws, 'D37', 'Servicio de Pruebas')
-        set_cell_value(ws, 'J37', solicitud.responsable_solicitud or '')
-        
-        detalles = f"Cliente: {solicitud.cliente.nombre if solicitud.cliente else ''} - Proyecto: {solicitud.proyecto.nombre if solicitud.proyecto else ''}"
-        set_cell_value(ws, 'D39', detalles)
-        
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+                        try:
+                            hora_obj = datetime.strptime(str(solicitud.hora_solicitud), '%H:%M')
+                            hora_str = hora_obj.strftime('%H:%M') + ' hrs'
+                        except:
+                            hora_str = str(solicitud.hora_solicitud) + ' hrs'
+                valores['M6'] = hora_str
+            
+            if solicitud.tipo_prueba:
+                valores['D8'] = solicitud.tipo_prueba.nombre
+            
+            valores['K8'] = solicitud.area_solicitante or ''
+            valores['D12'] = solicitud.responsable_solicitud or ''
+            valores['J12'] = solicitud.lider_proyecto or ''
+            valores['D17'] = solicitud.tipo_aplicacion or ''
+            valores['M17'] = solicitud.numero_version or ''
+            
+            if solicitud.funcionalidad_liberacion:
+                valores['D20'] = solicitud.funcionalidad_liberacion
+            
+            if solicitud.detalle_cambios:
+                valores['D22'] = solicitud.detalle_cambios
+            
+            if solicitud.justificacion_cambio:
+                valores['D24'] = solicitud.justificacion_cambio
+            
+            if solicitud.puntos_considerar:
+                valores['D26'] = solicitud.puntos_considerar
+            
+            if solicitud.pendientes:
+                valores['D28'] = solicitud.pendientes
+            
+            if solicitud.insumos:
+                valores['D30'] = solicitud.insumos
+            
+            valores['D37'] = 'Servicio de Pruebas'
+            valores['J37'] = solicitud.responsable_solicitud or ''
+            
+            detalles = f"Cliente: {solicitud.cliente.nombre if solicitud.cliente else ''} - Proyecto: {solicitud.proyecto.nombre if solicitud.proyecto else ''}"
+            valores['D39'] = detalles
+            
+            template_writer.escribir(ws, valores)
+            
+            buffer = io.BytesIO()
+            wb.save(buffer)
+            buffer.seek(0)
         
         response = HttpResponse(
             buffer.getvalue(),
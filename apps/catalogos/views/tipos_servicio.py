@@ -10,6 +10,7 @@ from django.http import HttpResponse
 from django.utils import timezone
 import logging
 
+from extractor import csv_export
 from extractor.models import TipoServicio
 
 logger = logging.getLogger(__name__)
@@ -131,28 +132,15 @@ def tipo_servicio_delete(request, id):
 def export_tipos_servicio_csv(request):
     """Exporta tipos de servicio a CSV"""
     try:
-        tipos = TipoServicio.objects.all()
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"tipos_servicio_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'])
-        
-        for tipo in tipos:
-            writer.writerow([
-                tipo.id,
-                tipo.nombre,
-                tipo.nomenclatura,
-                'Sí' if tipo.activo else 'No',
-                tipo.fecha_creacion.strftime('%d/%m/%Y %H:%M') if tipo.fecha_creacion else ''
-            ])
-        
-        return response
+        filas = (
+            [id_, nombre, nomenclatura, 'Sí' if activo else 'No', csv_export.formatear(fecha, '%d/%m/%Y %H:%M')]
+            for id_, nombre, nomenclatura, activo, fecha in csv_export.iterar(
+                TipoServicio.objects.all(), 'id', 'nombre', 'nomenclatura', 'activo', 'fecha_creacion'
+            )
+        )
+        return csv_export.respuesta_csv(
+            'tipos_servicio', ['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'], filas
+        )
         
     except Exception as e:
         logger.error(f"Error exportando tipos de servicio: {str(e)}")
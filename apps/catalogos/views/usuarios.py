@@ -6,14 +6,23 @@ import json
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 import logging
 from django.conf import settings
 
+from extractor import csv_export, ticket_stats
 from extractor.models import Usuario, Cliente, Ticket
+from extractor.pagination import paginar
+
+# Órdenes permitidos en el listado (el id desempata para el cursor)
+ORDENES_USUARIOS = {
+    '-date_joined': ('-date_joined', '-id'),
+    'date_joined': ('date_joined', 'id'),
+    'username': ('username', 'id'),
+    '-username': ('-username', '-id'),
+}
 
 logger = logging.getLogger(__name__)
 
@@ -63,18 +72,22 @@ def usuarios_list(request):
     
     # Ordenamiento
     orden = request.GET.get('orden', '-date_joined')
-    usuarios = usuarios.order_by(orden)
+    if orden not in ORDENES_USUARIOS:
+        orden = '-date_joined'
     
     # Paginación
     por_pagina = request.GET.get('por_pagina', 20)
     try:
         por_pagina = int(por_pagina)
+        if por_pagina not in [10, 20, 50, 100]:
+            por_pagina = 20
     except ValueError:
         por_pagina = 20
     
-    paginator = Paginator(usuarios, por_pagina)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginar(
+        request, usuarios, ORDENES_USUARIOS[orden], por_pagina,
+        filtrado=any([rol, cliente_id, search, is_active]),
+    )
     
     context = {
         'usuarios': page_obj,
@@ -147,9 +160,12 @@ def usuario_detail(request, id):
     tickets_asignados_filtrados = tickets_asignados_filtrados.order_by('-fecha_creacion')
     
     # Obtener años disponibles para el filtro (desde el primer ticket hasta ahora)
-    años_disponibles = Ticket.objects.filter(
+    años_disponibles = ticket_stats.estadisticas().filter(
         Q(creado_por=usuario) | Q(asignado_a=usuario)
-    ).dates('fecha_creacion', 'year', order='DESC')
+    ).dates('fecha', 'year', order='DESC')
+    
+    # Totales históricos desde la tabla precalculada
+    totales = ticket_stats.totales_usuario(usuario)
     
     # Si no hay años disponibles, usar el año actual
     if not años_disponibles:
@@ -165,8 +181,8 @@ def usuario_detail(request, id):
         'usuario': usuario,
         'tickets_creados': tickets_creados_filtrados,  # Filtrados
         'tickets_asignados': tickets_asignados_filtrados,  # Filtrados
-        'total_tickets_creados': tickets_creados_base.count(),  # Total histórico
-        'total_tickets_asignados': tickets_asignados_base.count(),  # Total histórico
+        'total_tickets_creados': totales['creados'],  # Total histórico
+        'total_tickets_asignados': totales['asignados'],  # Total histórico
         # Nuevos campos para el filtro
         'mes_seleccionado': mes_seleccionado,
         'año_seleccionado': año_seleccionado,
@@ -397,42 +413,31 @@ def export_usuarios_csv(request):
         messages.error(request, 'No tienes permiso para exportar usuarios')
         return redirect('extractor:usuarios_list')
     
+    def si_no(valor):
+        return 'Sí' if valor else 'No'
+    
     try:
-        usuarios = Usuario.objects.all().select_related('cliente_asociado')
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"usuarios_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
+        filas = (
+            [
+                id_, username, email, first_name, last_name, telefono or '', puesto or '', cliente or '',
+                si_no(activo), si_no(staff), si_no(superusuario), si_no(genera), si_no(ve_todos),
+                csv_export.formatear(date_joined, '%d/%m/%Y %H:%M'),
+            ]
+            for (
+                id_, username, email, first_name, last_name, telefono, puesto, cliente,
+                activo, staff, superusuario, genera, ve_todos, date_joined,
+            ) in csv_export.iterar(
+                Usuario.objects.all(),
+                'id', 'username', 'email', 'first_name', 'last_name', 'telefono', 'puesto',
+                'cliente_asociado__nombre', 'is_active', 'is_staff', 'is_superuser',
+                'puede_generar_tickets', 'puede_ver_todos_tickets', 'date_joined',
+            )
+        )
+        return csv_export.respuesta_csv('usuarios', [
             'ID', 'Usuario', 'Email', 'Nombre', 'Apellido', 'Teléfono', 
             'Puesto', 'Cliente Asociado', 'Activo', 'Staff', 'Superusuario',
             'Puede Generar Tickets', 'Puede Ver Todos Tickets', 'Fecha Registro'
-        ])
-        
-        for usuario in usuarios:
-            writer.writerow([
-                usuario.id,
-                usuario.username,
-                usuario.email,
-                usuario.first_name,
-                usuario.last_name,
-                usuario.telefono or '',
-                usuario.puesto or '',
-                usuario.cliente_asociado.nombre if usuario.cliente_asociado else '',
-                'Sí' if usuario.is_active else 'No',
-                'Sí' if usuario.is_staff else 'No',
-                'Sí' if usuario.is_superuser else 'No',
-                'Sí' if usuario.puede_generar_tickets else 'No',
-                'Sí' if usuario.puede_ver_todos_tickets else 'No',
-                usuario.date_joined.strftime('%d/%m/%Y %H:%M') if usuario.date_joined else ''
-            ])
-        
-        return response
+        ], filas)
         
     except Exception as e:
         logger.error(f"Error exportando usuarios: {str(e)}")
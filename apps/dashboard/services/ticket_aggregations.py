@@ -0,0 +1,322 @@
+"""
+Agregaciones de tickets para los dashboards.
+
+Los conteos se leen de la tabla precalculada TicketDailyStats (una fila por
+día y combinación de dimensiones) con values().annotate(Sum) y TruncMonth:
+el costo depende del número de grupos y de días, no del número de tickets.
+Solo la tabla de últimos tickets consulta Ticket directamente.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import Group
+from django.db.models import Q, F, Prefetch, Sum
+from django.db.utils import ProgrammingError
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from extractor import ticket_stats
+from extractor.models import Ticket, TicketDailyStats
+
+
+# Estados mostrados en las gráficas, en orden
+ESTADOS_COMPLETOS = [
+    ('GENERADO', 'Generado'),
+    ('EN_PROCESO', 'En Proceso'),
+    ('COMPLETADO', 'Completado'),
+    ('CANCELADO', 'Cancelado'),
+    ('NO EXITOSO', 'No Exitoso'),
+]
+
+# Estados antiguos que se agrupan con uno actual
+ESTADOS_ALIAS = {
+    'ABIERTO': 'GENERADO',
+}
+
+SIN_TICKET = ('SIN_TICKET', 'Sin Ticket')
+
+
+def _parse_id(valor):
+    try:
+        return int(valor) if valor not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def filtrar_tickets(cliente_id=None, proyecto_id=None, estado=None, fecha_desde=None, fecha_hasta=None):
+    """
+    Tickets con los filtros del dashboard aplicados en la base de datos
+
+    Args:
+        cliente_id, proyecto_id: IDs (str o int); vacío = sin filtro
+        estado: Código de estado; vacío = sin filtro
+        fecha_desde, fecha_hasta: date sobre la fecha de creación (inclusive)
+    """
+    tickets = Ticket.objects.all()
+
+    cliente_id = _parse_id(cliente_id)
+    proyecto_id = _parse_id(proyecto_id)
+
+    if cliente_id:
+        tickets = tickets.filter(cliente_id=cliente_id)
+    if proyecto_id:
+        tickets = tickets.filter(proyecto_id=proyecto_id)
+    if estado:
+        tickets = tickets.filter(estado=estado)
+    if fecha_desde:
+        tickets = tickets.filter(fecha_creacion__date__gte=fecha_desde)
+    if fecha_hasta:
+        tickets = tickets.filter(fecha_creacion__date__lte=fecha_hasta)
+
+    return tickets
+
+
+def filtrar_estadisticas(cliente_id=None, proyecto_id=None, estado=None, fecha_desde=None, fecha_hasta=None):
+    """Filas de TicketDailyStats de tickets con los filtros del dashboard"""
+    filtros = {}
+    cliente_id = _parse_id(cliente_id)
+    proyecto_id = _parse_id(proyecto_id)
+    if cliente_id:
+        filtros['cliente_id'] = cliente_id
+    if proyecto_id:
+        filtros['proyecto_id'] = proyecto_id
+    if estado:
+        filtros['estado'] = estado
+    return ticket_stats.estadisticas(fecha_desde, fecha_hasta, **filtros)
+
+
+def filtrar_solicitudes_sin_ticket(cliente_id=None, proyecto_id=None, fecha_desde=None, fecha_hasta=None):
+    """Filas de TicketDailyStats de solicitudes sin ticket con los filtros del dashboard"""
+    filtros = {'estado': TicketDailyStats.ESTADO_SIN_TICKET}
+    cliente_id = _parse_id(cliente_id)
+    proyecto_id = _parse_id(proyecto_id)
+    if cliente_id:
+        filtros['cliente_id'] = cliente_id
+    if proyecto_id:
+        filtros['proyecto_id'] = proyecto_id
+    return ticket_stats.estadisticas(fecha_desde, fecha_hasta, incluir_sin_ticket=True, **filtros)
+
+
+def en_rango(estadisticas, fecha_inicio, fecha_fin):
+    """Restringe las filas a un rango de fechas (inclusive)"""
+    return estadisticas.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+
+
+def total(estadisticas):
+    """Suma de las filas"""
+    return ticket_stats.total(estadisticas)
+
+
+def metricas_principales(estadisticas, fecha_inicio, fecha_fin):
+    """
+    Métricas de las tarjetas del dashboard en una sola consulta
+
+    Returns:
+        dict: total, abiertos, en_proceso, sin_asignar, total_periodo, completados_periodo
+    """
+    en_periodo = Q(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    metricas = estadisticas.aggregate(
+        suma=Coalesce(Sum('total'), 0),
+        abiertos=Coalesce(Sum('total', filter=Q(estado__in=['ABIERTO', 'GENERADO'])), 0),
+        en_proceso=Coalesce(Sum('total', filter=Q(estado='EN_PROCESO')), 0),
+        sin_asignar=Coalesce(Sum('total', filter=Q(asignado_a__isnull=True)), 0),
+        total_periodo=Coalesce(Sum('total', filter=en_periodo), 0),
+        completados_periodo=Coalesce(Sum('total', filter=en_periodo & Q(estado='COMPLETADO')), 0),
+    )
+    metricas['total'] = metricas.pop('suma')
+    return metricas
+
+
+def _conteo_por_estado(filas, total_sin_ticket=0):
+    """
+    Agrupa filas {'estado', 'total'} por estado de las gráficas, respetando el
+    orden de ESTADOS_COMPLETOS y mapeando estados antiguos. Agrega la barra de
+    'Sin Ticket' si hay solicitudes sin ticket.
+    """
+    nombres = dict(ESTADOS_COMPLETOS)
+    conteo = {}
+    for fila in filas:
+        codigo = ESTADOS_ALIAS.get(fila['estado'], fila['estado'])
+        conteo[codigo] = conteo.get(codigo, 0) + fila['suma']
+
+    orden = [codigo for codigo, _ in ESTADOS_COMPLETOS]
+    codigos = sorted(conteo, key=lambda c: orden.index(c) if c in orden else len(orden))
+    resultado = [
+        {'estado': nombres.get(codigo, codigo), 'total': conteo[codigo], 'codigo': codigo}
+        for codigo in codigos
+    ]
+    if total_sin_ticket > 0:
+        resultado.append({'estado': SIN_TICKET[1], 'total': total_sin_ticket, 'codigo': SIN_TICKET[0]})
+    return resultado
+
+
+def tickets_por_estado(estadisticas, total_sin_ticket=0):
+    """
+    Conteo por estado (GROUP BY estado) más la barra de 'Sin Ticket'
+
+    Returns:
+        list: [{'estado', 'total', 'codigo'}, ...]
+    """
+    filas = estadisticas.values('estado').annotate(suma=Sum('total'))
+    return _conteo_por_estado(filas, total_sin_ticket)
+
+
+def tickets_por_cliente(estadisticas, solicitudes_sin_ticket, limite=10):
+    """Top de clientes sumando tickets y solicitudes sin ticket"""
+    conteo = {}
+    for queryset in (estadisticas, solicitudes_sin_ticket):
+        filas = (
+            queryset
+            .exclude(cliente__nombre__isnull=True)
+            .exclude(cliente__nombre='')
+            .values('cliente__nombre')
+            .annotate(suma=Sum('total'))
+        )
+        for fila in filas:
+            conteo[fila['cliente__nombre']] = conteo.get(fila['cliente__nombre'], 0) + fila['suma']
+
+    top = sorted(conteo.items(), key=lambda x: x[1], reverse=True)[:limite]
+    return [{'cliente__nombre': nombre, 'total': total} for nombre, total in top]
+
+
+def conteo_por_relacion(estadisticas, campo, limite=None):
+    """
+    Conteo de tickets agrupado por el nombre de una relación (ej. 'proyecto__nombre')
+
+    Returns:
+        list: [{campo: nombre, 'total': n}, ...] ordenado de mayor a menor
+    """
+    filas = (
+        estadisticas
+        .exclude(**{f'{campo}__isnull': True})
+        .exclude(**{campo: ''})
+        .values(campo)
+        .annotate(suma=Sum('total'))
+        .order_by('-suma', campo)
+    )
+    if limite:
+        filas = filas[:limite]
+    return [{campo: fila[campo], 'total': fila['suma']} for fila in filas]
+
+
+def tendencia_diaria(estadisticas, solicitudes_sin_ticket, desde):
+    """
+    Tickets y solicitudes sin ticket por día a partir de 'desde' (datetime)
+
+    Returns:
+        list: [{'dia_str': 'YYYY-MM-DD', 'total': n}, ...] ordenado por día
+    """
+    # Un día cuenta completo si su medianoche (hora local) cae dentro del rango
+    desde_local = timezone.localtime(desde) if timezone.is_aware(desde) else desde
+    primer_dia = desde_local.date()
+    if desde_local.time() != datetime.min.time():
+        primer_dia += timedelta(days=1)
+
+    conteo = {}
+    for queryset in (estadisticas, solicitudes_sin_ticket):
+        filas = queryset.filter(fecha__gte=primer_dia).values('fecha').annotate(suma=Sum('total'))
+        for fila in filas:
+            dia = fila['fecha'].isoformat()
+            conteo[dia] = conteo.get(dia, 0) + fila['suma']
+
+    return [{'dia_str': dia, 'total': total} for dia, total in sorted(conteo.items())]
+
+
+def ultimos_tickets(tickets, limite=10):
+    """Los tickets más recientes con sus relaciones para la tabla"""
+    return list(
+        tickets.select_related('cliente', 'proyecto', 'tipo_servicio', 'asignado_a', 'creado_por')
+        .order_by(F('fecha_creacion').desc(nulls_last=True))[:limite]
+    )
+
+
+def estados_por_mes(estadisticas, solicitudes_sin_ticket, meses):
+    """
+    Conteo por estado para varios meses con una consulta agrupada por
+    TruncMonth + estado
+
+    Args:
+        meses: lista de (fecha_inicio, fecha_fin) como date
+
+    Returns:
+        list: por mes, [{'estado', 'total'}, ...] en el mismo orden de 'meses'
+    """
+    inicio = min(m[0] for m in meses)
+    fin = max(m[1] for m in meses)
+
+    por_mes = {}
+    filas = (
+        en_rango(estadisticas, inicio, fin)
+        .annotate(mes=TruncMonth('fecha'))
+        .values('mes', 'estado')
+        .annotate(suma=Sum('total'))
+    )
+    for fila in filas:
+        por_mes.setdefault((fila['mes'].year, fila['mes'].month), []).append(fila)
+
+    sin_ticket = {}
+    filas = (
+        en_rango(solicitudes_sin_ticket, inicio, fin)
+        .annotate(mes=TruncMonth('fecha'))
+        .values('mes')
+        .annotate(suma=Sum('total'))
+    )
+    for fila in filas:
+        sin_ticket[(fila['mes'].year, fila['mes'].month)] = fila['suma']
+
+    resultado = []
+    for fecha_inicio, _ in meses:
+        clave = (fecha_inicio.year, fecha_inicio.month)
+        datos = _conteo_por_estado(por_mes.get(clave, []), sin_ticket.get(clave, 0))
+        resultado.append([{'estado': d['estado'], 'total': d['total']} for d in datos])
+    return resultado
+
+
+def conteos_por_usuario(estadisticas, campo):
+    """
+    Conteo de tickets por usuario (asignado o creador) en una sola consulta
+    agrupada por (asignado_a, creado_por, campo). Un ticket cuenta una vez por
+    usuario aunque sea a la vez su creador y su asignado.
+
+    Args:
+        campo: 'mes' (TruncMonth de la fecha) o 'estado'
+
+    Returns:
+        dict: {usuario_id: {valor_del_campo: total}}
+    """
+    queryset = estadisticas
+    if campo == 'mes':
+        queryset = queryset.annotate(mes=TruncMonth('fecha'))
+
+    filas = queryset.values('asignado_a', 'creado_por', campo).annotate(suma=Sum('total'))
+
+    conteo = defaultdict(lambda: defaultdict(int))
+    for fila in filas:
+        for usuario_id in {fila['asignado_a'], fila['creado_por']} - {None}:
+            conteo[usuario_id][fila[campo]] += fila['suma']
+    return conteo
+
+
+def usuarios_con_rol(usuarios):
+    """
+    Evalúa los usuarios con su pertenencia al grupo 'Lideres' precargada en
+    una sola consulta
+
+    Returns:
+        list: [(usuario, es_lider), ...]
+    """
+    try:
+        lista = list(usuarios.prefetch_related(
+            Prefetch('groups', queryset=Group.objects.filter(name='Lideres'), to_attr='grupos_lider')
+        ))
+        return [
+            (usuario, getattr(usuario, 'es_lider_pruebas', False) or bool(usuario.grupos_lider))
+            for usuario in lista
+        ]
+    except ProgrammingError as e:
+        if 'relation "extractor_usuario_groups" does not exist' in str(e):
+            return [
+                (usuario, getattr(usuario, 'es_lider_pruebas', False) or usuario.is_superuser)
+                for usuario in usuarios
+            ]
+        raise
@@ -13,6 +13,7 @@ from django.db import connections
 from django.db.utils import ProgrammingError
 from extractor.models import Ticket, Cliente, Proyecto, Usuario, SolicitudPruebas
 from django.conf import settings
+from apps.dashboard.services import ticket_aggregations as agg
 
 
 def es_lider_pruebas(user):
@@ -58,196 +59,58 @@ def dashboard_lider(request):
     fecha_hasta = request.GET.get('fecha_hasta')
     periodo = request.GET.get('periodo', 'mes_actual')  # mes_actual, mes_anterior, trimestre, semestre, año
     
-    # ========== OBTENER TODOS LOS TICKETS ==========
-    tickets = Ticket.objects.all().select_related('cliente', 'proyecto', 'tipo_servicio', 'asignado_a', 'creado_por')
+    # ========== FILTROS (sobre la tabla precalculada TicketDailyStats) ==========
+    fecha_desde_obj = datetime.strptime(fecha_desde, '%Y-%m-%d').date() if fecha_desde else None
+    fecha_hasta_obj = datetime.strptime(fecha_hasta, '%Y-%m-%d').date() if fecha_hasta else None
     
-    # ========== OBTENER SOLICITUDES SIN TICKET ==========
-    solicitudes_sin_ticket = SolicitudPruebas.objects.filter(ticket__isnull=True).select_related('cliente', 'proyecto')
-    
-    # ========== APLICAR FILTROS MANUALMENTE ==========
-    tickets_list = list(tickets)
-    
-    # Filtro por cliente
-    if cliente_id and cliente_id != '':
-        tickets_list = [t for t in tickets_list if t.cliente_id == int(cliente_id)]
-        solicitudes_sin_ticket = solicitudes_sin_ticket.filter(cliente_id=int(cliente_id))
-    
-    # Filtro por proyecto
-    if proyecto_id and proyecto_id != '':
-        tickets_list = [t for t in tickets_list if t.proyecto_id == int(proyecto_id)]
-        solicitudes_sin_ticket = solicitudes_sin_ticket.filter(proyecto_id=int(proyecto_id))
-    
-    # Filtro por estado
-    if estado and estado != '':
-        tickets_list = [t for t in tickets_list if t.estado == estado]
-    
-    # Filtro por fecha desde
-    fecha_desde_obj = None
-    fecha_hasta_obj = None
-    if fecha_desde:
-        fecha_desde_obj = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-        tickets_list = [t for t in tickets_list if t.fecha_creacion and t.fecha_creacion.date() >= fecha_desde_obj]
-        solicitudes_sin_ticket = solicitudes_sin_ticket.filter(fecha_solicitud__gte=fecha_desde_obj)
-    
-    # Filtro por fecha hasta
-    if fecha_hasta:
-        fecha_hasta_obj = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-        tickets_list = [t for t in tickets_list if t.fecha_creacion and t.fecha_creacion.date() <= fecha_hasta_obj]
-        solicitudes_sin_ticket = solicitudes_sin_ticket.filter(fecha_solicitud__lte=fecha_hasta_obj)
+    tickets_generales = agg.filtrar_estadisticas(cliente_id, proyecto_id, estado, fecha_desde_obj, fecha_hasta_obj)
+    solicitudes_sin_ticket_generales = agg.filtrar_solicitudes_sin_ticket(cliente_id, proyecto_id, fecha_desde_obj, fecha_hasta_obj)
     
     ahora = timezone.now()
     
     # ========== CALCULAR PERÍODOS ==========
     fechas_periodo = calcular_fechas_periodo(periodo, ahora)
     
-    # ========== FILTRAR TICKETS POR PERÍODO ==========
-    tickets_generales = tickets_list  # Todos los tickets (con filtros aplicados)
-    tickets_periodo = [t for t in tickets_list if t.fecha_creacion and fechas_periodo['fecha_inicio'] <= t.fecha_creacion.date() <= fechas_periodo['fecha_fin']]
-    
-   
-      # ========== FILTRAR SOLICITUDES SIN TICKET POR PERÍODO ==========
-    solicitudes_sin_ticket_generales = solicitudes_sin_ticket
-    solicitudes_sin_ticket_periodo = solicitudes_sin_ticket.filter(
-        fecha_solicitud__gte=fechas_periodo['fecha_inicio'],
-        fecha_solicitud__lte=fechas_periodo['fecha_fin']
-    )
+    tickets_periodo = agg.en_rango(tickets_generales, fechas_periodo['fecha_inicio'], fechas_periodo['fecha_fin'])
+    solicitudes_sin_ticket_periodo = agg.en_rango(solicitudes_sin_ticket_generales, fechas_periodo['fecha_inicio'], fechas_periodo['fecha_fin'])
     
-   
     # ========== CALCULAR DATOS POR MES PARA GRÁFICAS ==========
-    datos_por_mes = calcular_estados_por_mes(
-        ahora, tickets_list, solicitudes_sin_ticket_generales,
-        cliente_id, proyecto_id, estado, fecha_desde_obj, fecha_hasta_obj
-    )
+    datos_por_mes = calcular_estados_por_mes(ahora, tickets_generales, solicitudes_sin_ticket_generales)
 
-    total_sin_ticket_general = solicitudes_sin_ticket_generales.count()
-    total_sin_ticket_periodo = solicitudes_sin_ticket_periodo.count()
+    total_sin_ticket_general = agg.total(solicitudes_sin_ticket_generales)
+    total_sin_ticket_periodo = agg.total(solicitudes_sin_ticket_periodo)
     
     # ========== MÉTRICAS PRINCIPALES ==========
-    total_tickets = len(tickets_generales)
-    
-    tickets_abiertos = len([t for t in tickets_generales if t.estado in ['ABIERTO', 'GENERADO']])
-    tickets_proceso = len([t for t in tickets_generales if t.estado == 'EN_PROCESO'])
-    tickets_sin_asignar = len([t for t in tickets_generales if t.asignado_a is None])
+    metricas = agg.metricas_principales(tickets_generales, fechas_periodo['fecha_inicio'], fechas_periodo['fecha_fin'])
+    total_tickets = metricas['total']
+    tickets_abiertos = metricas['abiertos']
+    tickets_proceso = metricas['en_proceso']
+    tickets_sin_asignar = metricas['sin_asignar']
     
     # Tickets completados en el período seleccionado
-    tickets_completados_periodo = len([t for t in tickets_periodo if t.estado == 'COMPLETADO'])
+    tickets_completados_periodo = metricas['completados_periodo']
     
     usuarios_activos = Usuario.objects.filter(is_active=True).count()
     
-    # ========== GRÁFICO 1: TICKETS POR ESTADO (GENERAL) CON INCLUSIÓN DE SIN TICKET Y NO EXITOSO ==========
-    # Definir todos los estados posibles incluyendo NO EXITOSO y SIN_TICKET
-    ESTADOS_COMPLETOS = [
-        ('GENERADO', 'Generado'),
-        ('EN_PROCESO', 'En Proceso'),
-        ('COMPLETADO', 'Completado'),
-        ('CANCELADO', 'Cancelado'),
-        ('NO EXITOSO', 'No Exitoso'),
-    ]
-    
-    conteo_estados_general = defaultdict(int)
-    estado_codigos = {}  # Para mapear nombre a código
-    
-    for ticket in tickets_generales:
-        for codigo, nombre in ESTADOS_COMPLETOS:
-            if ticket.estado == codigo:
-                conteo_estados_general[nombre] += 1
-                estado_codigos[nombre] = codigo
-                break
-        # Si el estado no está en ESTADOS_COMPLETOS (ej: ABIERTO antiguo), mapear a GENERADO o mantener
-        if ticket.estado not in [c[0] for c in ESTADOS_COMPLETOS]:
-            if ticket.estado == 'ABIERTO':
-                conteo_estados_general['Generado'] += 1
-                estado_codigos['Generado'] = 'GENERADO'
-            else:
-                conteo_estados_general[ticket.estado] += 1
-                estado_codigos[ticket.estado] = ticket.estado
-    
-    # Agregar "Sin Ticket" al gráfico general
-    if total_sin_ticket_general > 0:
-        conteo_estados_general['Sin Ticket'] = total_sin_ticket_general
-        estado_codigos['Sin Ticket'] = 'SIN_TICKET'
-    
-    tickets_por_estado_general = [{'estado': k, 'total': v, 'codigo': estado_codigos.get(k, k)} 
-                                   for k, v in conteo_estados_general.items()]
-    
-    # ========== GRÁFICO 2: TICKETS POR ESTADO (PERÍODO) ==========
-    conteo_estados_periodo = defaultdict(int)
-    estado_codigos_periodo = {}
-    
-    for ticket in tickets_periodo:
-        for codigo, nombre in ESTADOS_COMPLETOS:
-            if ticket.estado == codigo:
-                conteo_estados_periodo[nombre] += 1
-                estado_codigos_periodo[nombre] = codigo
-                break
-        if ticket.estado not in [c[0] for c in ESTADOS_COMPLETOS]:
-            if ticket.estado == 'ABIERTO':
-                conteo_estados_periodo['Generado'] += 1
-                estado_codigos_periodo['Generado'] = 'GENERADO'
-            else:
-                conteo_estados_periodo[ticket.estado] += 1
-                estado_codigos_periodo[ticket.estado] = ticket.estado
-    
-    # Agregar "Sin Ticket" al gráfico del período
-    if total_sin_ticket_periodo > 0:
-        conteo_estados_periodo['Sin Ticket'] = total_sin_ticket_periodo
-        estado_codigos_periodo['Sin Ticket'] = 'SIN_TICKET'
-    
-    tickets_por_estado_periodo = [{'estado': k, 'total': v, 'codigo': estado_codigos_periodo.get(k, k)} 
-                                   for k, v in conteo_estados_periodo.items()]
+    # ========== GRÁFICOS: TICKETS POR ESTADO (GENERAL Y PERÍODO) CON SIN TICKET ==========
+    tickets_por_estado_general = agg.tickets_por_estado(tickets_generales, total_sin_ticket_general)
+    tickets_por_estado_periodo = agg.tickets_por_estado(tickets_periodo, total_sin_ticket_periodo)
     
     # ========== GRÁFICO: TICKETS POR CLIENTE ==========
-    conteo_clientes = defaultdict(int)
-    for ticket in tickets_generales:
-        if ticket.cliente and ticket.cliente.nombre:
-            conteo_clientes[ticket.cliente.nombre] += 1
-    
-    # Agregar solicitudes sin ticket al conteo de clientes
-    for solicitud in solicitudes_sin_ticket_generales:
-        if solicitud.cliente and solicitud.cliente.nombre:
-            conteo_clientes[solicitud.cliente.nombre] += 1
-    
-    tickets_por_cliente = [{'cliente__nombre': k, 'total': v} for k, v in sorted(conteo_clientes.items(), key=lambda x: x[1], reverse=True)[:10]]
+    tickets_por_cliente = agg.tickets_por_cliente(tickets_generales, solicitudes_sin_ticket_generales, limite=10)
     
     # ========== GRÁFICO: TENDENCIA ÚLTIMOS 30 DÍAS ==========
-    fecha_limite = ahora - timedelta(days=30)
-    conteo_por_dia = defaultdict(int)
-    
-    for ticket in tickets_generales:
-        if ticket.fecha_creacion and ticket.fecha_creacion >= fecha_limite:
-            fecha_str = ticket.fecha_creacion.date().isoformat()
-            conteo_por_dia[fecha_str] += 1
-    
-    # Agregar solicitudes sin ticket a la tendencia
-    for solicitud in solicitudes_sin_ticket_generales:
-        if solicitud.fecha_solicitud:
-            fecha_dt = datetime.combine(solicitud.fecha_solicitud, datetime.min.time())
-            if hasattr(fecha_dt, 'replace'):
-                fecha_dt = timezone.make_aware(fecha_dt) if settings.USE_TZ else fecha_dt
-            if fecha_dt >= fecha_limite:
-                fecha_str = solicitud.fecha_solicitud.isoformat()
-                conteo_por_dia[fecha_str] += 1
-    
-    tickets_por_dia = [{'dia_str': k, 'total': v} for k, v in sorted(conteo_por_dia.items())]
+    tickets_por_dia = agg.tendencia_diaria(tickets_generales, solicitudes_sin_ticket_generales, ahora - timedelta(days=30))
     
     # ========== TABLA: ÚLTIMOS 10 TICKETS ==========
-    ultimos_tickets = sorted(tickets_generales, key=lambda x: x.fecha_creacion if x.fecha_creacion else timezone.make_aware(datetime.min), reverse=True)[:10]
-    
-    # ========== TICKETS POR TIPO DE SERVICIO ==========
-    conteo_servicio = defaultdict(int)
-    for ticket in tickets_generales:
-        if ticket.tipo_servicio and ticket.tipo_servicio.nombre:
-            conteo_servicio[ticket.tipo_servicio.nombre] += 1
-    
-    tickets_por_servicio = [{'tipo_servicio__nombre': k, 'total': v} for k, v in sorted(conteo_servicio.items(), key=lambda x: x[1], reverse=True)]
-    
-    # ========== TICKETS POR PROYECTO ==========
-    conteo_proyecto = defaultdict(int)
-    for ticket in tickets_generales:
-        if ticket.proyecto and ticket.proyecto.nombre:
-            conteo_proyecto[ticket.proyecto.nombre] += 1
+    ultimos_tickets = agg.ultimos_tickets(
+        agg.filtrar_tickets(cliente_id, proyecto_id, estado, fecha_desde_obj, fecha_hasta_obj),
+        limite=10
+    )
     
-    tickets_por_proyecto = [{'proyecto__nombre': k, 'total': v} for k, v in sorted(conteo_proyecto.items(), key=lambda x: x[1], reverse=True)[:5]]
+    # ========== TICKETS POR TIPO DE SERVICIO Y POR PROYECTO ==========
+    tickets_por_servicio = agg.conteo_por_relacion(tickets_generales, 'tipo_servicio__nombre')
+    tickets_por_proyecto = agg.conteo_por_relacion(tickets_generales, 'proyecto__nombre', limite=5)
     
     # ========== NUEVO: DATOS PARA TABLAS DE GRÁFICAS ==========
     # Datos para gráfica general
@@ -277,71 +140,33 @@ def dashboard_lider(request):
         })
     
     # ========== NUEVO: RESUMEN DE USUARIOS CON TICKETS POR MES ==========
-    from django.db.models import Count, Q
-    from django.db.models.functions import TruncMonth
+    # Usuarios activos con su rol precargado (una consulta + un prefetch)
+    usuarios_activos_qs = Usuario.objects.filter(is_active=True).exclude(username='qa_adwin')
+    usuarios_rol = agg.usuarios_con_rol(usuarios_activos_qs)
     
-    resumen_usuarios = []
-    top_usuarios_por_mes = {}
+    # Tickets por usuario y mes con los mismos filtros del dashboard (una consulta)
+    conteo_usuario_mes = agg.conteos_por_usuario(tickets_generales, 'mes')
     
-    # Obtener todos los usuarios activos
-    usuarios_activos_qs = Usuario.objects.filter(is_active=True).exclude(username='qa_adwin')
+    resumen_usuarios = []
+    top_usuarios_por_mes = defaultdict(list)
     
-    for usuario_obj in usuarios_activos_qs:
-        # Tickets del usuario (asignados o creados por él)
-        tickets_usuario = Ticket.objects.filter(
-            Q(asignado_a=usuario_obj) | Q(creado_por=usuario_obj)
-        )
-        
-        # Aplicar los mismos filtros de cliente, proyecto, etc. a los tickets del usuario
-        tickets_usuario_list = list(tickets_usuario)
-        
-        if cliente_id and cliente_id != '':
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.cliente_id == int(cliente_id)]
-        
-        if proyecto_id and proyecto_id != '':
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.proyecto_id == int(proyecto_id)]
-        
-        if estado and estado != '':
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.estado == estado]
-        
-        if fecha_desde and fecha_desde_obj:
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.fecha_creacion and t.fecha_creacion.date() >= fecha_desde_obj]
-        
-        if fecha_hasta and fecha_hasta_obj:
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.fecha_creacion and t.fecha_creacion.date() <= fecha_hasta_obj]
-        
-        # Tickets por mes (usando los tickets filtrados)
-        tickets_por_mes = defaultdict(int)
-        for ticket in tickets_usuario_list:
-            if ticket.fecha_creacion:
-                mes_key = ticket.fecha_creacion.strftime('%B %Y')
-                tickets_por_mes[mes_key] += 1
+    for usuario_obj, es_lider_usuario in usuarios_rol:
+        nombre_usuario = usuario_obj.get_full_name() or usuario_obj.username
+        tickets_por_mes = conteo_usuario_mes.get(usuario_obj.id, {})
         
         # Obtener últimos 6 meses
-        meses_ordenados = sorted(tickets_por_mes.items(), key=lambda x: datetime.strptime(x[0], '%B %Y'), reverse=True)[:6]
+        meses_ordenados = sorted(tickets_por_mes.items(), reverse=True)[:6]
+        tickets_mes_list = [
+            {'mes_nombre': mes.strftime('%B %Y'), 'cantidad': cantidad}
+            for mes, cantidad in meses_ordenados
+        ]
         
-        tickets_mes_list = []
-        for mes_nombre, cantidad in meses_ordenados:
-            tickets_mes_list.append({
-                'mes_nombre': mes_nombre,
-                'cantidad': cantidad
-            })
-        
-        total_tickets_usuario = len(tickets_usuario_list)
+        total_tickets_usuario = sum(tickets_por_mes.values())
         promedio = total_tickets_usuario / 6 if len(tickets_por_mes) > 0 else 0
         
-        # Verificar si el usuario es líder (ajusta según tu modelo)
-        try:
-            es_lider_usuario = getattr(usuario_obj, 'es_lider_pruebas', False) or usuario_obj.groups.filter(name='Lideres').exists()
-        except ProgrammingError as e:
-            if 'relation "extractor_usuario_groups" does not exist' in str(e):
-                es_lider_usuario = getattr(usuario_obj, 'es_lider_pruebas', False) or usuario_obj.is_superuser
-            else:
-                raise
-        
         resumen_usuarios.append({
             'id': usuario_obj.id,
-            'nombre_completo': usuario_obj.get_full_name() or usuario_obj.username,
+            'nombre_completo': nombre_usuario,
             'es_lider': es_lider_usuario,
             'total_tickets': total_tickets_usuario,
             'tickets_por_mes': tickets_mes_list,
@@ -349,69 +174,43 @@ def dashboard_lider(request):
         })
         
         # Para top usuarios por mes
-        for ticket in tickets_usuario_list:
-            if ticket.fecha_creacion:
-                mes_key = ticket.fecha_creacion.strftime('%B %Y')
-                if mes_key not in top_usuarios_por_mes:
-                    top_usuarios_por_mes[mes_key] = {}
-                
-                nombre_usuario = usuario_obj.get_full_name() or usuario_obj.username
-                if nombre_usuario not in top_usuarios_por_mes[mes_key]:
-                    top_usuarios_por_mes[mes_key][nombre_usuario] = {
-                        'nombre': nombre_usuario,
-                        'total': 0,
-                        'es_lider': es_lider_usuario
-                    }
-                top_usuarios_por_mes[mes_key][nombre_usuario]['total'] += 1
+        for mes, cantidad in tickets_por_mes.items():
+            top_usuarios_por_mes[mes].append({
+                'nombre': nombre_usuario,
+                'total': cantidad,
+                'es_lider': es_lider_usuario
+            })
     
     # Convertir top usuarios por mes a lista ordenada
     top_usuarios_por_mes_ordenado = {}
-    for mes, usuarios_dict in top_usuarios_por_mes.items():
-        usuarios_list = list(usuarios_dict.values())
-        usuarios_list.sort(key=lambda x: x['total'], reverse=True)
-        top_usuarios_por_mes_ordenado[mes] = usuarios_list[:5]
+    for mes in sorted(top_usuarios_por_mes, reverse=True):
+        usuarios_list = sorted(top_usuarios_por_mes[mes], key=lambda x: x['total'], reverse=True)
+        top_usuarios_por_mes_ordenado[mes.strftime('%B %Y')] = usuarios_list[:5]
     
     # Ordenar resumen de usuarios por total de tickets
     resumen_usuarios.sort(key=lambda x: x['total_tickets'], reverse=True)
     
     # ========== RESUMEN DE ESTADOS POR USUARIO ==========
+    # Solo aplican los filtros de cliente y proyecto (una consulta)
+    conteo_usuario_estado = agg.conteos_por_usuario(agg.filtrar_estadisticas(cliente_id, proyecto_id), 'estado')
+    
     resumen_estados_usuarios = []
 
-    for usuario_obj in usuarios_activos_qs:
-        # Tickets del usuario (asignados o creados por él)
-        tickets_usuario = Ticket.objects.filter(
-            Q(asignado_a=usuario_obj) | Q(creado_por=usuario_obj)
-        )
-        
-        # Aplicar filtros
-        tickets_usuario_list = list(tickets_usuario)
-        
-        if cliente_id and cliente_id != '':
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.cliente_id == int(cliente_id)]
-        
-        if proyecto_id and proyecto_id != '':
-            tickets_usuario_list = [t for t in tickets_usuario_list if t.proyecto_id == int(proyecto_id)]
+    for usuario_obj, es_lider_usuario in usuarios_rol:
+        por_estado = conteo_usuario_estado.get(usuario_obj.id, {})
         
         # Contar por estado (incluyendo NO EXITOSO)
-        abiertos = len([t for t in tickets_usuario_list if t.estado in ['ABIERTO', 'GENERADO']])
-        en_proceso = len([t for t in tickets_usuario_list if t.estado == 'EN_PROCESO'])
-        completados = len([t for t in tickets_usuario_list if t.estado == 'COMPLETADO'])
-        cancelados = len([t for t in tickets_usuario_list if t.estado == 'CANCELADO'])
-        no_exitosos = len([t for t in tickets_usuario_list if t.estado == 'NO EXITOSO'])  # <-- AGREGAR ESTA LÍNEA
-        total = len(tickets_usuario_list)
+        abiertos = por_estado.get('ABIERTO', 0) + por_estado.get('GENERADO', 0)
+        en_proceso = por_estado.get('EN_PROCESO', 0)
+        completados = por_estado.get('COMPLETADO', 0)
+        cancelados = por_estado.get('CANCELADO', 0)
+        no_exitosos = por_estado.get('NO EXITOSO', 0)
+        total = sum(por_estado.values())
         
         # Tasa de éxito (completados / total de no cancelados y no no_exitosos)
         tickets_evaluables = total - cancelados - no_exitosos
         tasa_exito = (completados / tickets_evaluables * 100) if tickets_evaluables > 0 else 0
         
-        try:
-            es_lider_usuario = getattr(usuario_obj, 'es_lider_pruebas', False) or usuario_obj.groups.filter(name='Lideres').exists()
-        except ProgrammingError as e:
-            if 'relation "extractor_usuario_groups" does not exist' in str(e):
-                es_lider_usuario = getattr(usuario_obj, 'es_lider_pruebas', False) or usuario_obj.is_superuser
-            else:
-                raise
-        
         rol = "Líder de Pruebas" if es_lider_usuario else "Tester"
         
         resumen_estados_usuarios.append({
@@ -424,7 +223,7 @@ def dashboard_lider(request):
             'en_proceso': en_proceso,
             'completados': completados,
             'cancelados': cancelados,
-            'no_exitosos': no_exitosos,  # <-- AGREGAR ESTA LÍNEA
+            'no_exitosos': no_exitosos,
             'tasa_exito': tasa_exito
         })
 
@@ -467,7 +266,7 @@ def dashboard_lider(request):
         'periodo_nombre': fechas_periodo['nombre'],
         'periodo_fecha_inicio': fechas_periodo['fecha_inicio'].strftime('%d/%m/%Y'),
         'periodo_fecha_fin': fechas_periodo['fecha_fin'].strftime('%d/%m/%Y'),
-        'total_tickets_periodo': len(tickets_periodo),
+        'total_tickets_periodo': metricas['total_periodo'],
         
         'tickets_filtrados_count': total_tickets,  # total_tickets ya es el conteo con filtros aplicados
     
@@ -573,7 +372,7 @@ def calcular_fechas_periodo(periodo, fecha_referencia):
         'fecha_fin': fecha_fin.date() if hasattr(fecha_fin, 'date') else fecha_fin,
     }
 
-def calcular_estados_por_mes(fecha_referencia, tickets_list, solicitudes_sin_ticket, cliente_id, proyecto_id, estado, fecha_desde_obj, fecha_hasta_obj):
+def calcular_estados_por_mes(fecha_referencia, tickets, solicitudes_sin_ticket):
     """Calcula los datos para los gráficos de mes actual y mes anterior"""
     
     # Calcular mes actual
@@ -589,60 +388,27 @@ def calcular_estados_por_mes(fecha_referencia, tickets_list, solicitudes_sin_tic
     ultimo_dia_anterior = calendar.monthrange(mes_anterior_inicio.year, mes_anterior_inicio.month)[1]
     mes_anterior_fin = mes_anterior_inicio.replace(day=ultimo_dia_anterior)
     
-    # Filtrar tickets por mes
-    tickets_mes_actual = [t for t in tickets_list if t.fecha_creacion and mes_actual_inicio.date() <= t.fecha_creacion.date() <= mes_actual_fin.date()]
-    tickets_mes_anterior = [t for t in tickets_list if t.fecha_creacion and mes_anterior_inicio.date() <= t.fecha_creacion.date() <= mes_anterior_fin.date()]
-    
-    # Filtrar solicitudes sin ticket por mes
-    solicitudes_mes_actual = solicitudes_sin_ticket.filter(
-        fecha_solicitud__gte=mes_actual_inicio.date(),
-        fecha_solicitud__lte=mes_actual_fin.date()
-    )
-    solicitudes_mes_anterior = solicitudes_sin_ticket.filter(
-        fecha_solicitud__gte=mes_anterior_inicio.date(),
-        fecha_solicitud__lte=mes_anterior_fin.date()
+    # Una sola consulta agrupada por mes y estado para ambos meses
+    datos_mes_actual, datos_mes_anterior = agg.estados_por_mes(
+        tickets,
+        solicitudes_sin_ticket,
+        [
+            (mes_actual_inicio.date(), mes_actual_fin.date()),
+            (mes_anterior_inicio.date(), mes_anterior_fin.date()),
+        ]
     )
     
-    # Definir estados
-    ESTADOS_COMPLETOS = [
-        ('GENERADO', 'Generado'),
-        ('EN_PROCESO', 'En Proceso'),
-        ('COMPLETADO', 'Completado'),
-        ('CANCELADO', 'Cancelado'),
-        ('NO EXITOSO', 'No Exitoso'),
-    ]
-    
-    def contar_estados(tickets, solicitudes):
-        conteo = defaultdict(int)
-        for ticket in tickets:
-            for codigo, nombre in ESTADOS_COMPLETOS:
-                if ticket.estado == codigo:
-                    conteo[nombre] += 1
-                    break
-            if ticket.estado not in [c[0] for c in ESTADOS_COMPLETOS]:
-                if ticket.estado == 'ABIERTO':
-                    conteo['Generado'] += 1
-                else:
-                    conteo[ticket.estado] += 1
-        # Agregar solicitudes sin ticket
-        if solicitudes.count() > 0:
-            conteo['Sin Ticket'] = solicitudes.count()
-        return conteo
-    
-    conteo_mes_actual = contar_estados(tickets_mes_actual, solicitudes_mes_actual)
-    conteo_mes_anterior = contar_estados(tickets_mes_anterior, solicitudes_mes_anterior)
-    
     return {
             'mes_actual': {
                 'nombre': f"{mes_actual_inicio.strftime('%B %Y')}",
                 'fecha_inicio': mes_actual_inicio.date(),  # Devuelve objeto date, no string
                 'fecha_fin': mes_actual_fin.date(),        # Devuelve objeto date, no string
-                'datos': [{'estado': k, 'total': v} for k, v in conteo_mes_actual.items()]
+                'datos': datos_mes_actual
             },
             'mes_anterior': {
                 'nombre': f"{mes_anterior_inicio.strftime('%B %Y')}",
                 'fecha_inicio': mes_anterior_inicio.date(),  # Devuelve objeto date, no string
                 'fecha_fin': mes_anterior_fin.date(),        # Devuelve objeto date, no string
-                'datos': [{'estado': k, 'total': v} for k, v in conteo_mes_anterior.items()]
+                'datos': datos_mes_anterior
             }
         }
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Procesamiento por lotes de archivos Excel de solicitud
+"""
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from extractor import ticket_sequence
+from extractor.jira_helper import enqueue_jira_issue_from_ticket
+from extractor.models import Cliente, Proyecto, TipoServicio, SolicitudPruebas
+from .extractor_service import read_excel_workbook
+from .ticket_generator import generate_and_save_ticket
+
+
+MAX_BATCH_FILES = 100
+MAX_ZIP_UNCOMPRESSED_SIZE = 200 * 1024 * 1024  # 200MB
+# Solo .xlsx: read_excel_workbook usa openpyxl, que no lee el formato .xls antiguo
+EXCEL_EXTENSIONS = ('.xlsx',)
+
+
+class CatalogIndex:
+    """
+    Índice en memoria de un catálogo (Cliente, Proyecto, TipoServicio).
+    Se carga con una sola consulta por lote y resuelve valores con las mismas
+    reglas que find_object_by_name_or_id: ID, nombre exacto, nombre que
+    contiene y nomenclatura.
+    """
+
+    def __init__(self, model, field_name="nombre"):
+        self.field_name = field_name
+        self.objects = list(model.objects.all())
+        self.by_id = {obj.id: obj for obj in self.objects}
+        self.by_name = {}
+        self.by_nomenclatura = {}
+        for obj in self.objects:
+            self.by_name.setdefault(getattr(obj, field_name), obj)
+            if hasattr(obj, 'nomenclatura'):
+                self.by_nomenclatura.setdefault(obj.nomenclatura, obj)
+
+    def resolve(self, value):
+        if not value:
+            return None
+
+        value_str = str(value).strip()
+
+        try:
+            obj = self.by_id.get(int(float(value_str)))
+            if obj:
+                return obj
+        except (ValueError, TypeError):
+            pass
+
+        if value_str in self.by_name:
+            return self.by_name[value_str]
+
+        value_lower = value_str.lower()
+        for obj in self.objects:
+            if value_lower in (getattr(obj, self.field_name) or '').lower():
+                return obj
+
+        return self.by_nomenclatura.get(value_str)
+
+
+def _error_archivo(nombre, error):
+    return {'archivo': nombre, 'success': False, 'error': error}
+
+
+def expand_batch_files(uploaded_files):
+    """
+    Convierte los archivos subidos (Excel sueltos o ZIP) en una lista con un
+    elemento por libro de Excel, en el orden en que se subieron.
+
+    Returns:
+        list: cada elemento es un archivo (UploadedFile o SimpleUploadedFile)
+        o, si no se pudo usar, su entrada de reporte
+        {'archivo', 'success', 'error'}
+    """
+    entradas = []
+
+    for uploaded_file in uploaded_files:
+        extension = os.path.splitext(uploaded_file.name)[1].lower()
+
+        if extension != '.zip':
+            if extension in EXCEL_EXTENSIONS:
+                entradas.append(uploaded_file)
+            else:
+                entradas.append(_error_archivo(uploaded_file.name, 'Formato no válido. Solo se permiten archivos .xlsx'))
+            continue
+
+        try:
+            with zipfile.ZipFile(uploaded_file) as zf:
+                members = [
+                    info for info in zf.infolist()
+                    if not info.is_dir()
+                    and not info.filename.startswith('__MACOSX/')
+                    and os.path.splitext(info.filename)[1].lower() in EXCEL_EXTENSIONS
+                ]
+
+                total_size = sum(info.file_size for info in members)
+                if total_size > MAX_ZIP_UNCOMPRESSED_SIZE:
+                    entradas.append(_error_archivo(
+                        uploaded_file.name, 'El ZIP excede el tamaño máximo descomprimido permitido'
+                    ))
+                    continue
+
+                for info in members:
+                    content = zf.read(info)
+                    entradas.append(SimpleUploadedFile(os.path.basename(info.filename), content))
+        except zipfile.BadZipFile:
+            entradas.append(_error_archivo(uploaded_file.name, 'El archivo ZIP está dañado o no es válido'))
+
+    return entradas
+
+
+def _parse_workbook(name, content):
+    """Tarea del pool de procesos: extrae los datos de un libro en memoria"""
+    is_valid, error_msg, extracted_data = read_excel_workbook(io.BytesIO(content))
+    return name, is_valid, error_msg, extracted_data
+
+
+def parse_workbooks_parallel(files):
+    """
+    Extrae los datos de varios libros en paralelo en un pool de procesos
+    acotado por el número de núcleos.
+
+    Args:
+        files (list): [(nombre, bytes), ...]
+
+    Returns:
+        list: [(nombre, is_valid, error_message, extracted_data), ...] en el
+        mismo orden de entrada
+    """
+    if not files:
+        return []
+
+    max_workers = min(len(files), os.cpu_count() or 1)
+    if max_workers == 1:
+        return [_parse_workbook(name, content) for name, content in files]
+
+    names, contents = zip(*files)
+    # forkserver, igual que el pool de documentos: un fork del worker web
+    # copiaría sus conexiones a la base y locks tomados por otros hilos.
+    # Los procesos nuevos no tienen Django cargado y este módulo importa modelos
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('forkserver'),
+        initializer=django.setup,
+    ) as executor:
+        return list(executor.map(_parse_workbook, names, contents))
+
+
+def create_tickets_for_batch(parsed_files, tipo_servicio_form, request):
+    """
+    Resuelve catálogos una sola vez para todo el lote y crea los tickets en
+    una única transacción. Los consecutivos se reservan de una vez por cada
+    prefijo de código y cada archivo usa su propio savepoint para que un
+    error no descarte los tickets de los demás.
+
+    Args:
+        parsed_files (list): [(nombre, extracted_data), ...] ya sanitizados
+        tipo_servicio_form (str): Tipo de servicio (PRU, EST, G&A)
+        request: Request de Django
+
+    Returns:
+        list: reporte por archivo con {'archivo', 'success', 'ticket', 'error'}
+    """
+    clientes = CatalogIndex(Cliente)
+    proyectos = CatalogIndex(Proyecto)
+    tipos_servicio = CatalogIndex(TipoServicio)
+
+    solicitudes = {
+        solicitud.nombre_archivo: solicitud
+        for solicitud in SolicitudPruebas.objects.filter(
+            nombre_archivo__in=[name for name, _ in parsed_files]
+        )
+    }
+
+    report = []
+    pendientes = []
+
+    for name, extracted_data in parsed_files:
+        result = {'archivo': name, 'success': False, 'ticket': None, 'error': ''}
+        report.append(result)
+
+        campos_obligatorios = ['cliente', 'proyecto', 'tipo_pruebas']
+        campos_faltantes = [c for c in campos_obligatorios if not extracted_data.get(c)]
+        if campos_faltantes:
+            result['error'] = f"Faltan campos en el Excel: {', '.join(campos_faltantes)}"
+            continue
+
+        cliente_obj = clientes.resolve(extracted_data.get('cliente'))
+        proyecto_obj = proyectos.resolve(extracted_data.get('proyecto'))
+        tipo_prueba_obj = tipos_servicio.resolve(extracted_data.get('tipo_pruebas'))
+
+        objetos_no_encontrados = []
+        if not cliente_obj:
+            objetos_no_encontrados.append(f"Cliente '{extracted_data.get('cliente', '')}'")
+        if not proyecto_obj:
+            objetos_no_encontrados.append(f"Proyecto '{extracted_data.get('proyecto', '')}'")
+        if not tipo_prueba_obj:
+            objetos_no_encontrados.append(f"Tipo de Pruebas '{extracted_data.get('tipo_pruebas', '')}'")
+
+        if objetos_no_encontrados:
+            result['error'] = f"No se encontraron en la base de datos: {', '.join(objetos_no_encontrados)}"
+            continue
+
+        if proyecto_obj.cliente_id != cliente_obj.id:
+            result['error'] = f'El proyecto "{proyecto_obj.nombre}" no pertenece al cliente "{cliente_obj.nombre}"'
+            continue
+
+        nomenclaturas = {
+            'cliente_nomenclatura': cliente_obj.nomenclatura,
+            'proyecto_nomenclatura': proyecto_obj.codigo,
+            'tipo_pruebas_nomenclatura': tipo_prueba_obj.nomenclatura,
+            'tipo_servicio_nomenclatura': tipo_servicio_form
+        }
+
+        objetos_encontrados = {
+            'cliente_obj': cliente_obj,
+            'proyecto_obj': proyecto_obj,
+            'tipo_servicio_obj': tipo_prueba_obj
+        }
+
+        jira_data = {
+            'cliente_obj': cliente_obj,
+            'proyecto_obj': proyecto_obj,
+            'tipo_servicio': tipo_servicio_form,
+            'responsable_solicitud': extracted_data.get('responsable_solicitud', ''),
+            'lider_proyecto': extracted_data.get('lider_proyecto', ''),
+            'numero_version': extracted_data.get('numero_version', ''),
+            'funcionalidad_liberacion': extracted_data.get('funcionalidad_liberacion', ''),
+            'detalle_cambios': extracted_data.get('detalle_cambios', ''),
+            'justificacion_cambio': extracted_data.get('justificacion_cambio', ''),
+        }
+
+        clave = ticket_sequence.clave(tipo_servicio_form, tipo_prueba_obj, cliente_obj.nomenclatura, proyecto_obj.codigo)
+        pendientes.append((result, name, extracted_data, nomenclaturas, objetos_encontrados, jira_data, clave))
+
+    # Una reserva por prefijo en lugar de una por archivo (cada una en su
+    # propia transacción corta, sin bloquear la secuencia durante el lote)
+    por_clave = {}
+    for *_, clave in pendientes:
+        por_clave.setdefault(tuple(clave.values()), []).append(clave)
+    consecutivos = {
+        llave: iter(ticket_sequence.reservar(claves[0], len(claves)))
+        for llave, claves in por_clave.items()
+    }
+
+    with transaction.atomic():
+        for result, name, extracted_data, nomenclaturas, objetos_encontrados, jira_data, clave in pendientes:
+            try:
+                with transaction.atomic():
+                    ticket_code, ticket_obj = generate_and_save_ticket(
+                        extracted_data,
+                        tipo_servicio_form,
+                        nomenclaturas,
+                        objetos_encontrados,
+                        request,
+                        consecutivo=next(consecutivos[tuple(clave.values())])
+                    )
+
+                    enqueue_jira_issue_from_ticket(ticket_obj, jira_data, request)
+
+                    solicitud = solicitudes.get(name)
+                    if solicitud:
+                        solicitud.ticket = ticket_obj
+                        solicitud.tiene_ticket = True
+                        solicitud.fecha_asociacion_ticket = timezone.now()
+                        solicitud.save()
+            except Exception as e:
+                result['error'] = f'Error creando el ticket: {str(e)[:200]}'
+                continue
+
+            result['success'] = True
+            result['ticket'] = ticket_obj
+
+    return report
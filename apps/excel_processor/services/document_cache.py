@@ -0,0 +1,109 @@
+"""
+Caché en disco de los documentos ya generados (Dictamen, Resultados)
+
+Cada documento se identifica por su huella: un hash de los valores que se
+escriben en la plantilla (datos_dictamen / datos_resultados) y del mtime de
+la plantilla. Si nada de eso cambió, el archivo guardado es idéntico al que
+se generaría, así que se entrega sin abrir la plantilla. La huella sirve
+también de ETag para responder 304 cuando el navegador ya lo tiene.
+
+Los archivos viven en settings.DOCUMENTOS_CACHE_DIR/<ticket_id>/ y solo se
+conserva la última versión de cada tipo de documento por ticket.
+
+Uso:
+    clave = document_cache.huella('dictamen', ticket.id, valores)
+    contenido = document_cache.obtener_o_generar(
+        'dictamen', ticket.id, clave, lambda: document_service.generar_dictamen(valores)
+    )
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from django.conf import settings
+
+from . import template_cache
+
+# Subir si cambia la forma de generar los documentos sin cambiar sus datos
+FORMATO = 1
+
+PLANTILLAS = {
+    'dictamen': template_cache.PLANTILLA_DICTAMEN,
+    'resultados': template_cache.PLANTILLA_RESULTADOS,
+}
+
+
+def _carpeta(ticket_id):
+    return os.path.join(settings.DOCUMENTOS_CACHE_DIR, str(ticket_id))
+
+
+def _ruta(tipo, ticket_id, clave):
+    return os.path.join(_carpeta(ticket_id), f"{tipo}-{clave}.xlsx")
+
+
+def huella(tipo, ticket_id, datos):
+    """Hash de los datos del documento y de la versión de su plantilla"""
+    contenido = json.dumps(
+        {
+            'formato': FORMATO,
+            'tipo': tipo,
+            'ticket': ticket_id,
+            'plantilla': template_cache.version(PLANTILLAS[tipo]),
+            'datos': datos,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:32]
+
+
+def obtener(tipo, ticket_id, clave):
+    """Bytes del documento guardado o None"""
+    try:
+        with open(_ruta(tipo, ticket_id, clave), 'rb') as archivo:
+            return archivo.read()
+    except OSError:
+        return None
+
+
+def guardar(tipo, ticket_id, clave, contenido):
+    """
+    Guarda el documento y borra las versiones anteriores del mismo tipo
+
+    Se escribe en un temporal y se renombra, así otro proceso nunca lee un
+    archivo a medias. Un fallo al guardar no impide entregar el documento.
+    """
+    carpeta = _carpeta(ticket_id)
+    ruta = _ruta(tipo, ticket_id, clave)
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(contenido)
+            os.replace(temporal, ruta)
+        except Exception:
+            os.unlink(temporal)
+            raise
+
+        for nombre in os.listdir(carpeta):
+            if nombre.startswith(f"{tipo}-") and os.path.join(carpeta, nombre) != ruta:
+                try:
+                    os.unlink(os.path.join(carpeta, nombre))
+                except OSError:
+                    pass
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar {tipo} del ticket {ticket_id} en caché: {e}")
+
+
+def obtener_o_generar(tipo, ticket_id, clave, generar):
+    """
+    Documento guardado con esa huella o, si no existe, el que devuelve
+    generar() (que queda guardado para la próxima vez)
+    """
+    contenido = obtener(tipo, ticket_id, clave)
+    if contenido is None:
+        contenido = generar()
+        guardar(tipo, ticket_id, clave, contenido)
+    return contenido
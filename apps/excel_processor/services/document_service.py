@@ -0,0 +1,333 @@
+"""
+Generación de documentos Excel de un ticket (Dictamen y Documentación de
+Resultados), individual o por lotes
+
+Los datos se leen del ticket en el proceso principal (datos_dictamen,
+datos_resultados) y los libros se generan a partir de esos datos simples, así
+que la generación puede repartirse en un pool de procesos sin tocar la base
+de datos. Cada proceso del pool lee la plantilla una sola vez
+(template_cache) y la reutiliza para todos sus documentos.
+
+El pool usa 'forkserver': los procesos salen de un servidor de un solo hilo
+en lugar de copiar el worker de gunicorn, que tiene hilos en segundo plano
+(bifurcar un proceso con hilos puede bloquearlo). Desde la web el pool se
+limita a DOCUMENTOS_LOTE_MAX_WORKERS y la descarga sigue sujeta al timeout de
+gunicorn; para los cierres de mes usa el comando generar_documentos_lote.
+"""
+import io
+import multiprocessing
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from openpyxl import Workbook
+from openpyxl.styles import Alignment
+
+from . import template_cache, template_writer
+from ..utils.helpers import calcular_dias_habiles
+
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+TIPOS_DOCUMENTO = ('dictamen', 'resultados')
+BORDES_DICTAMEN = ['K5', 'K6', 'C9']
+# Tope de tickets por descarga web: con el pool acotado debe caber en el timeout de gunicorn
+MAX_TICKETS_LOTE = 200
+# Procesos del pool por petición web (el comando usa todos los núcleos)
+LOTE_MAX_WORKERS = getattr(settings, 'DOCUMENTOS_LOTE_MAX_WORKERS', 2)
+
+
+# ========== DATOS ==========
+
+def datos_dictamen(ticket, fecha_solicitud=None, fecha_actual=None):
+    """
+    Valores de celda del dictamen {coordenada: valor}
+
+    Args:
+        ticket: Ticket con cliente, proyecto, tipo_servicio y usuarios
+        fecha_solicitud: fecha de la SolicitudPruebas asociada (si hay)
+        fecha_actual: fecha de emisión (por defecto ahora)
+    """
+    fecha_actual = fecha_actual or datetime.now()
+    fecha_actual_str = fecha_actual.strftime('%d/%m/%Y')
+    valores = {}
+
+    # Desglosar código del ticket
+    partes = ticket.codigo.split('-')
+    if len(partes) >= 7:
+        valores['G2'] = partes[1]
+        valores['I2'] = partes[2]
+        valores['K2'] = partes[3]
+        valores['M2'] = partes[4]
+        valores['O2'] = partes[5]
+        valores['Q2'] = partes[6]
+
+    # Período de pruebas
+    if fecha_solicitud:
+        if hasattr(fecha_solicitud, 'strftime'):
+            fecha_solicitud_str = fecha_solicitud.strftime('%d/%m/%Y')
+        else:
+            try:
+                fecha_obj = datetime.strptime(str(fecha_solicitud), '%Y-%m-%d')
+                fecha_solicitud_str = fecha_obj.strftime('%d/%m/%Y')
+            except ValueError:
+                fecha_solicitud_str = str(fecha_solicitud)
+    else:
+        fecha_solicitud_str = ticket.fecha_creacion.strftime('%d/%m/%Y') if ticket.fecha_creacion else fecha_actual_str
+
+    valores['K5'] = f"{fecha_solicitud_str} - {fecha_actual_str}"
+    valores['K6'] = fecha_actual_str
+
+    # Cálculo de horas
+    horas_totales = 0
+    if fecha_solicitud:
+        if hasattr(fecha_solicitud, 'date'):
+            fecha_solicitud_date = fecha_solicitud.date()
+        else:
+            fecha_solicitud_date = fecha_solicitud
+
+        dias_habiles = calcular_dias_habiles(fecha_solicitud_date, fecha_actual.date())
+        horas_totales = dias_habiles * 8
+
+    valores['M18'] = horas_totales
+
+    # Datos del ticket
+    nombre_proyecto = ticket.proyecto.nombre if ticket.proyecto else ''
+    if ticket.nombre:
+        nombre_limpio = ticket.nombre.replace(" - ", "-")
+        partes_nombre = [p.strip() for p in nombre_limpio.split('-') if p.strip()]
+        nombre_formateado = " - ".join(partes_nombre)
+        proyecto_final = f"{nombre_proyecto} - {nombre_formateado}"
+    else:
+        proyecto_final = nombre_proyecto
+
+    valores['B5'] = ticket.cliente.nombre if ticket.cliente else ''
+    valores['B6'] = proyecto_final
+    valores['C7'] = ticket.tipo_servicio.nombre if ticket.tipo_servicio else ''
+
+    # Responsable
+    if ticket.asignado_a:
+        responsable_nombre = ticket.asignado_a.get_full_name() or ticket.asignado_a.username
+    elif ticket.creado_por:
+        responsable_nombre = ticket.creado_por.get_full_name() or ticket.creado_por.username
+    else:
+        responsable_nombre = "No asignado"
+
+    valores['F28'] = responsable_nombre
+
+    return valores
+
+
+def datos_resultados(ticket):
+    """Datos de la Documentación de Resultados"""
+    detalle_cambios = ''
+    if ticket.excel_data and ticket.excel_data.detalle_cambios:
+        detalle_cambios = ticket.excel_data.detalle_cambios.strip()
+
+    return {
+        'codigo': ticket.codigo,
+        'numero_version': ticket.numero_version,
+        'detalle_cambios': detalle_cambios,
+    }
+
+
+# ========== GENERACIÓN ==========
+
+def generar_dictamen(valores):
+    """
+    Libro del dictamen en bytes
+
+    Raises:
+        FileNotFoundError: si no existe la plantilla
+    """
+    plantilla = template_cache.obtener(template_cache.PLANTILLA_DICTAMEN)
+    if plantilla is None:
+        raise FileNotFoundError(template_cache.ruta(template_cache.PLANTILLA_DICTAMEN))
+
+    with plantilla.abrir() as wb:
+        ws = wb['Dictamen'] if 'Dictamen' in wb.sheetnames else wb.active
+        template_writer.escribir(ws, valores)
+        template_writer.restaurar_bordes(ws, BORDES_DICTAMEN)
+
+        buffer = io.BytesIO()
+        wb.save(buffer)
+
+    return buffer.getvalue()
+
+
+def generar_resultados(datos):
+    """Libro de Documentación de Resultados en bytes (libro en blanco si no hay plantilla)"""
+    plantilla = template_cache.obtener(template_cache.PLANTILLA_RESULTADOS)
+
+    with plantilla.abrir() if plantilla else nullcontext(Workbook()) as wb:
+        ws = wb.active
+        ws.title = "Resultados Pruebas"
+        if plantilla is None:
+            ws.column_dimensions['A'].width = 50
+            ws.column_dimensions['B'].width = 30
+            ws.column_dimensions['L'].width = 15
+            ws.column_dimensions['M'].width = 30
+
+        valores = {'C2': datos['codigo']}
+
+        if ws['M3'].value is None or "Versión" not in str(ws['M3'].value):
+            valores['M3'] = f"VERSIÓN: Versión {datos['numero_version'] or '1.0.0'}"
+
+        detalle_cambios = datos['detalle_cambios']
+        if detalle_cambios:
+            valores['A8'] = detalle_cambios
+            ws['A8'].alignment = Alignment(wrap_text=True, vertical='top', horizontal='left')
+
+            lineas = detalle_cambios.count('\n') + 1
+            altura_estimada = min(lineas * 15, 300)
+            ws.row_dimensions[8].height = altura_estimada
+        else:
+            valores['A8'] = "No se especificaron detalles de cambios."
+
+        template_writer.escribir(ws, valores)
+
+        buffer = io.BytesIO()
+        wb.save(buffer)
+
+    return buffer.getvalue()
+
+
+def nombre_archivo(tipo, codigo):
+    if tipo == 'dictamen':
+        return f"{codigo} Dictamen Pruebas.xlsx"
+    return f"{codigo} Documentación de Resultados.xlsx"
+
+
+# ========== LOTES ==========
+
+def tickets_para_documentos(cliente_id=None, proyecto_id=None, mes=None, fecha_desde=None, fecha_hasta=None, estado=None):
+    """
+    Tickets de un lote con todo lo necesario para sus documentos en una sola
+    consulta (cliente, proyecto, servicio, usuarios, ExcelData y solicitud)
+
+    Args:
+        mes: 'AAAA-MM' (fecha de creación); tiene prioridad sobre desde/hasta
+
+    Raises:
+        ValueError: si el mes o las fechas no tienen formato válido
+    """
+    from extractor.models import Ticket
+
+    tickets = Ticket.objects.select_related(
+        'cliente', 'proyecto', 'tipo_servicio', 'asignado_a', 'creado_por', 'excel_data', 'solicitud'
+    ).order_by('fecha_creacion', 'id')
+
+    if mes:
+        anio, numero_mes = (int(parte) for parte in mes.split('-'))
+        fecha_desde = date(anio, numero_mes, 1)
+        fecha_hasta = date(anio, numero_mes, monthrange(anio, numero_mes)[1])
+    if isinstance(fecha_desde, str):
+        fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
+    if isinstance(fecha_hasta, str):
+        fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+
+    if cliente_id:
+        tickets = tickets.filter(cliente_id=cliente_id)
+    if proyecto_id:
+        tickets = tickets.filter(proyecto_id=proyecto_id)
+    if estado:
+        tickets = tickets.filter(estado=estado)
+    if fecha_desde:
+        tickets = tickets.filter(fecha_creacion__date__gte=fecha_desde)
+    if fecha_hasta:
+        tickets = tickets.filter(fecha_creacion__date__lte=fecha_hasta)
+    return tickets
+
+
+def _solicitud(ticket):
+    try:
+        return ticket.solicitud
+    except ObjectDoesNotExist:
+        return None
+
+
+def tareas_lote(tickets, tipos=TIPOS_DOCUMENTO):
+    """[(tipo, nombre_archivo, datos), ...] para los tickets del lote"""
+    fecha_actual = datetime.now()
+    tareas = []
+    for ticket in tickets:
+        if 'dictamen' in tipos:
+            solicitud = _solicitud(ticket)
+            fecha_solicitud = solicitud.fecha_solicitud if solicitud else None
+            tareas.append((
+                'dictamen',
+                nombre_archivo('dictamen', ticket.codigo),
+                datos_dictamen(ticket, fecha_solicitud, fecha_actual),
+            ))
+        if 'resultados' in tipos:
+            tareas.append((
+                'resultados',
+                nombre_archivo('resultados', ticket.codigo),
+                datos_resultados(ticket),
+            ))
+    return tareas
+
+
+def _generar_documento(tipo, nombre, datos):
+    """Tarea del pool de procesos: (nombre, bytes, error)"""
+    try:
+        if tipo == 'dictamen':
+            return nombre, generar_dictamen(datos), None
+        return nombre, generar_resultados(datos), None
+    except Exception as e:
+        return nombre, None, str(e)[:200]
+
+
+def generar_lote(tareas, max_workers=LOTE_MAX_WORKERS):
+    """
+    Genera los documentos en paralelo en un pool de procesos
+
+    Si quien consume el generador lo cierra antes de terminar (el cliente
+    cortó la descarga), se cancelan las tareas que aún no empezaron en vez de
+    esperar a que se generen todas.
+
+    Yields:
+        (nombre, bytes, error) en el mismo orden de las tareas
+    """
+    if not tareas:
+        return
+
+    max_workers = max(1, min(len(tareas), max_workers))
+    if max_workers == 1:
+        for tarea in tareas:
+            yield _generar_documento(*tarea)
+        return
+
+    tipos, nombres, datos = zip(*tareas)
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('forkserver'),
+    )
+    try:
+        yield from executor.map(_generar_documento, tipos, nombres, datos, chunksize=8)
+    except GeneratorExit:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+
+def archivos_zip(tareas, max_workers=LOTE_MAX_WORKERS):
+    """
+    Entradas para csv_export.zip_archivos: un xlsx por documento y, si alguno
+    falló, un errores.txt al final
+    """
+    errores = []
+    documentos = generar_lote(tareas, max_workers)
+    try:
+        for nombre, contenido, error in documentos:
+            if error:
+                errores.append(f"{nombre}: {error}")
+                continue
+            yield nombre, [contenido]
+    finally:
+        # Si se corta la descarga, cancela lo pendiente del pool
+        documentos.close()
+    if errores:
+        yield 'errores.txt', ['\n'.join(errores).encode('utf-8')]
@@ -1,50 +1,69 @@
 """
 Servicios para extracción de datos de Excel
 """
-import pandas as pd
+from openpyxl import load_workbook
+
+from .layout_registry import detect_layout, get_layouts
+
+
+def clean_value(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def read_excel_workbook(file_obj):
+    """
+    Abre el libro UNA sola vez en modo streaming (read_only), detecta su layout
+    en el registro y extrae solo las celdas listadas. Deja de leer filas después
+    de la última fila mapeada del layout.
+
+    Args:
+        file_obj: Ruta o archivo (UploadedFile) del Excel
+
+    Returns:
+        tuple: (is_valid, error_message, extracted_data)
+    """
+    try:
+        wb = load_workbook(file_obj, data_only=True, read_only=True)
+    except Exception as e:
+        return False, f"El archivo Excel parece estar dañado o corrupto: {str(e)[:100]}", {}
+
+    try:
+        layout = detect_layout(wb.sheetnames)
+        if not layout:
+            hojas = ', '.join(f"'{sheet}'" for sheet in get_layouts())
+            return False, f"El archivo no contiene ninguna hoja de solicitud reconocida ({hojas})", {}
+
+        print(f"📌 Layout detectado: {layout['version']} (hoja '{layout['sheet']}')")
+
+        ws = wb[layout['sheet']]
+        layout_rows = layout['rows']
+        extracted_data = {key: "" for key in layout['cells']}
+
+        rows = ws.iter_rows(min_row=1, max_row=layout['max_row'], max_col=layout['max_col'], values_only=True)
+        for row_number, values in enumerate(rows, start=1):
+            for key, col in layout_rows.get(row_number, ()):
+                if col <= len(values):
+                    extracted_data[key] = clean_value(values[col - 1])
+    except Exception as e:
+        return False, f"Error al leer el archivo: {str(e)[:100]}", {}
+    finally:
+        wb.close()
+
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+
+    return True, "", extracted_data
 
 
 def extract_excel_data(file_path):
     """
     Extrae las celdas específicas según las reglas dadas
     """
-    try:
-        df = pd.read_excel(file_path, sheet_name='Solicitud de Pruebas V4', header=None)
-    except ValueError as e:
-        if "No sheet named" in str(e):
-            raise Exception("El archivo no contiene la hoja 'Solicitud de Pruebas V4'")
-        else:
-            raise Exception(f"Error al leer el archivo: {str(e)}")
-    
-    def clean_value(value):
-        if pd.isna(value):
-            return ""
-        return str(value).strip()
-    
-    extracted_data = {}
-    
-    # Mapeo de celdas
-    cells_mapping = {
-        'cliente': (4, 2),
-        'proyecto': (4, 7),
-        'tipo_pruebas': (7, 3),
-        'responsable_solicitud': (11, 3),
-        'lider_proyecto': (11, 9),
-        'tipo_aplicacion': (16, 3),
-        'numero_version': (16, 12),
-        'funcionalidad_liberacion': (19, 3),
-        'detalle_cambios': (21, 3),
-        'justificacion_cambio': (23, 3),
-    }
-    
-    for key, (row, col) in cells_mapping.items():
-        try:
-            extracted_data[key] = clean_value(df.iat[row, col])
-            print(f"📌 {key}: '{extracted_data[key][:100]}...'")
-        except Exception as e:
-            print(f"⚠️ Error extrayendo {key}: {e}")
-            extracted_data[key] = ""
-    
+    is_valid, error_msg, extracted_data = read_excel_workbook(file_path)
+    if not is_valid:
+        raise Exception(error_msg)
     return extracted_data
 
 
@@ -0,0 +1,79 @@
+"""
+Registro de layouts (mapeos de celdas) de las plantillas de solicitud
+"""
+import json
+import os
+from functools import lru_cache
+
+from openpyxl.utils.cell import coordinate_to_tuple
+
+
+LAYOUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layouts')
+
+
+def compile_layout(definition):
+    """
+    Convierte la definición declarativa de un layout en una estructura de
+    búsqueda: celdas agrupadas por fila (base 1) y límites de lectura.
+
+    Args:
+        definition (dict): {'version', 'sheet', 'cells': {campo: 'C5', ...}}
+
+    Returns:
+        dict: layout compilado
+    """
+    cells = {}
+    rows = {}
+    for key, coordinate in definition['cells'].items():
+        row, col = coordinate_to_tuple(coordinate.upper())
+        cells[key] = (row, col)
+        rows.setdefault(row, []).append((key, col))
+
+    return {
+        'version': definition['version'],
+        'sheet': definition['sheet'],
+        'cells': cells,
+        'rows': rows,
+        'max_row': max(rows),
+        'max_col': max(col for _, col in cells.values()),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_layouts():
+    """
+    Carga y compila una sola vez por proceso los layouts en LAYOUTS_DIR
+
+    Returns:
+        dict: {nombre_de_hoja: layout compilado}
+    """
+    layouts = {}
+    for filename in sorted(os.listdir(LAYOUTS_DIR)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(LAYOUTS_DIR, filename), encoding='utf-8') as f:
+            layout = compile_layout(json.load(f))
+        layouts[layout['sheet']] = layout
+    return layouts
+
+
+def detect_layout(sheetnames):
+    """
+    Detecta el layout de un libro a partir de los nombres de sus hojas
+
+    Returns:
+        dict | None: layout compilado o None si ninguna hoja coincide
+    """
+    layouts = get_layouts()
+    for sheetname in sheetnames:
+        if sheetname in layouts:
+            return layouts[sheetname]
+    return None
+
+
+def get_layout_by_version(version):
+    """Devuelve el layout compilado de una versión de plantilla (ej: 'V4')"""
+    for layout in get_layouts().values():
+        if layout['version'] == version:
+            return layout
+    return None
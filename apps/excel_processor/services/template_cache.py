@@ -0,0 +1,146 @@
+"""
+Caché de plantillas Excel (static/plantillas) por proceso
+
+Leer una plantilla con estilos cuesta más que guardarla, y los libros de
+openpyxl no se pueden clonar de forma fiable (copy.deepcopy y pickle pierden
+estilos y tablas). Por eso cada plantilla se lee una sola vez por proceso y
+se presta: quien la usa escribe sobre el libro ya cargado y, al terminar, se
+restauran los valores, estilos, alturas de fila y títulos que tenía. Si el
+archivo cambia en disco (mtime) se vuelve a leer. Los índices de celdas
+combinadas de template_writer se calculan al cargar.
+
+Uso:
+    plantilla = template_cache.obtener(template_cache.PLANTILLA_DICTAMEN)
+    with plantilla.abrir() as wb:
+        wb.active['B5'] = 'Cliente'
+        wb.save(buffer)
+"""
+import os
+import threading
+from contextlib import contextmanager
+from copy import copy
+
+from django.conf import settings
+from openpyxl import load_workbook
+from openpyxl.utils.indexed_list import IndexedList
+
+from .template_writer import indice_combinadas
+
+PLANTILLA_DICTAMEN = 'XXX-XXX-XXX-X-XXX-XXX-XXX DictamenPruebas PRUEBAS.xlsx'
+PLANTILLA_RESULTADOS = 'XXX-XXX-XXX-X-XXX-XXX-XXX Documentación de Resultados.xlsx'
+PLANTILLA_SOLICITUD = 'BID-PMC-FOR-00017_Formato_de_Solicitud_de_Pruebas.xlsx'
+
+# Tablas de estilos del libro que crecen al asignar estilos nuevos
+ESTILOS_LIBRO = ('_cell_styles', '_fonts', '_fills', '_borders', '_alignments', '_number_formats', '_protections')
+
+_plantillas = {}
+_lock = threading.Lock()
+
+
+def ruta(nombre):
+    return os.path.join(settings.BASE_DIR, 'static', 'plantillas', nombre)
+
+
+class _Estado:
+    """Foto del libro antes de prestarlo, para dejarlo igual al devolverlo"""
+
+    def __init__(self, wb):
+        self.wb = wb
+        self.estilos = {nombre: [copy(valor) for valor in getattr(wb, nombre)] for nombre in ESTILOS_LIBRO}
+        self.hojas = [
+            (
+                ws,
+                ws.title,
+                dict(ws._cells),
+                {clave: (celda._value, celda.data_type, copy(celda._style)) for clave, celda in ws._cells.items()},
+                {fila: dimension.height for fila, dimension in ws.row_dimensions.items()},
+            )
+            for ws in wb.worksheets
+        ]
+
+    def restaurar(self):
+        for ws, titulo, celdas, valores, alturas in self.hojas:
+            if ws.title != titulo:
+                ws.title = titulo
+
+            ws._cells.clear()
+            ws._cells.update(celdas)
+            for clave, (valor, tipo, estilo) in valores.items():
+                celda = celdas[clave]
+                if celda._value != valor or celda.data_type != tipo:
+                    celda._value = valor
+                    celda.data_type = tipo
+                celda._style = estilo
+
+            for fila in list(ws.row_dimensions):
+                if fila not in alturas:
+                    del ws.row_dimensions[fila]
+                elif ws.row_dimensions[fila].height != alturas[fila]:
+                    ws.row_dimensions[fila].height = alturas[fila]
+
+        for nombre, valores in self.estilos.items():
+            setattr(self.wb, nombre, IndexedList(valores))
+
+
+class Plantilla:
+    """Libro de una plantilla leído una vez y prestado a cada generación"""
+
+    def __init__(self, path, mtime):
+        self.path = path
+        self.mtime = mtime
+        self.wb = load_workbook(path)
+        for ws in self.wb.worksheets:
+            indice_combinadas(ws)
+        self._en_uso = threading.Lock()
+
+    @contextmanager
+    def abrir(self):
+        """
+        Libro listo para escribir; al salir se deja como estaba. Si otro hilo
+        lo está usando se entrega una copia recién leída en lugar de esperar.
+        """
+        if not self._en_uso.acquire(blocking=False):
+            yield load_workbook(self.path)
+            return
+
+        estado = _Estado(self.wb)
+        try:
+            yield self.wb
+        finally:
+            try:
+                estado.restaurar()
+            except Exception as e:
+                # Si no se pudo restaurar, la próxima petición vuelve a leer el archivo
+                print(f"⚠️ No se pudo restaurar la plantilla {os.path.basename(self.path)}: {e}")
+                with _lock:
+                    if _plantillas.get(self.path) is self:
+                        del _plantillas[self.path]
+            finally:
+                self._en_uso.release()
+
+
+def version(nombre):
+    """mtime (ns) del archivo de la plantilla sin leerla, o None si no existe"""
+    try:
+        return os.stat(ruta(nombre)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def obtener(nombre):
+    """
+    Plantilla cargada (se relee si cambió el archivo) o None si no existe
+
+    Args:
+        nombre: nombre del archivo dentro de static/plantillas
+    """
+    path = ruta(nombre)
+    mtime = version(nombre)
+    if mtime is None:
+        return None
+
+    with _lock:
+        plantilla = _plantillas.get(path)
+        if plantilla is None or plantilla.mtime != mtime:
+            plantilla = _plantillas[path] = Plantilla(path, mtime)
+    return plantilla
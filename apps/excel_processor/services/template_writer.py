@@ -0,0 +1,74 @@
+"""
+Escritura de valores en hojas de plantillas Excel con celdas combinadas
+
+Cada hoja tiene un índice {coordenada: rango combinado} que se calcula una
+sola vez (las hojas de template_cache lo traen precalculado), así que escribir
+un valor o restaurar un borde ya no recorre todos los rangos de la hoja.
+
+Uso:
+    template_writer.escribir(ws, {'B5': 'Cliente', 'K5': '01/01/2026'})
+    template_writer.restaurar_bordes(ws, ['K5', 'K6'])
+"""
+import weakref
+
+from openpyxl.styles import Border, Side
+from openpyxl.utils import get_column_letter
+
+BORDE_COMPLETO = Border(
+    left=Side(style='thin', color='000000'),
+    right=Side(style='thin', color='000000'),
+    top=Side(style='thin', color='000000'),
+    bottom=Side(style='thin', color='000000')
+)
+
+_indices = weakref.WeakKeyDictionary()
+
+
+def indice_combinadas(ws):
+    """{coordenada: CellRange} de todas las celdas que forman parte de un rango combinado"""
+    indice = _indices.get(ws)
+    if indice is None:
+        indice = {}
+        for rango in ws.merged_cells.ranges:
+            for fila, columna in rango.cells:
+                indice[f"{get_column_letter(columna)}{fila}"] = rango
+        _indices[ws] = indice
+    return indice
+
+
+def celda_superior(ws, coordenada):
+    """Coordenada donde se guarda el valor (la superior izquierda si está combinada)"""
+    rango = indice_combinadas(ws).get(coordenada)
+    return rango.start_cell.coordinate if rango is not None else coordenada
+
+
+def escribir(ws, valores):
+    """
+    Escribe un diccionario {coordenada: valor} en la hoja
+
+    Los valores de celdas combinadas van a la celda superior izquierda del
+    rango; un error en una celda no impide escribir las demás.
+    """
+    indice = indice_combinadas(ws)
+    for coordenada, valor in valores.items():
+        rango = indice.get(coordenada)
+        try:
+            ws[rango.start_cell.coordinate if rango is not None else coordenada] = valor
+        except Exception as e:
+            print(f"⚠️ Error en {coordenada}: {e}")
+
+
+def restaurar_bordes(ws, celdas, borde=BORDE_COMPLETO):
+    """Aplica el borde a cada celda o, si está combinada, a todo su rango"""
+    indice = indice_combinadas(ws)
+    for coordenada in celdas:
+        try:
+            rango = indice.get(coordenada)
+            if rango is None:
+                ws[coordenada].border = borde
+                continue
+            for fila in range(rango.min_row, rango.max_row + 1):
+                for columna in range(rango.min_col, rango.max_col + 1):
+                    ws.cell(row=fila, column=columna).border = borde
+        except Exception as e:
+            print(f"⚠️ No se pudo restaurar borde en {coordenada}: {e}")
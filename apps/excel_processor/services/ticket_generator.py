@@ -2,10 +2,11 @@
 Generador de tickets a partir de datos extraídos de Excel
 """
 from django.utils import timezone
+from extractor import ticket_sequence
 from extractor.models import Ticket, ExcelData
 
 
-def generate_and_save_ticket(extracted_data, tipo_servicio_form, nomenclaturas, objetos_encontrados, request):
+def generate_and_save_ticket(extracted_data, tipo_servicio_form, nomenclaturas, objetos_encontrados, request, consecutivo=None):
     """
     Genera y guarda un ticket basado en los datos extraídos
     
@@ -15,6 +16,8 @@ def generate_and_save_ticket(extracted_data, tipo_servicio_form, nomenclaturas,
         nomenclaturas (dict): Diccionario con nomenclaturas
         objetos_encontrados (dict): Objetos de BD encontrados
         request: Request de Django
+        consecutivo (int): Consecutivo ya reservado (lotes); si no se indica
+            se toma el siguiente de la secuencia
     
     Returns:
         tuple: (ticket_code, ticket_obj)
@@ -31,17 +34,10 @@ def generate_and_save_ticket(extracted_data, tipo_servicio_form, nomenclaturas,
     tipo_servicio_nomenclatura = nomenclaturas.get('tipo_servicio_nomenclatura', '')
     
     # Obtener el consecutivo
-    ultimo_ticket = Ticket.objects.filter(
-        empresa_code="BID",
-        tipo_servicio_code=tipo_servicio_form,
-        cliente_code=cliente_nomenclatura,
-        proyecto_code=proyecto_nomenclatura
-    ).order_by('-consecutivo').first()
-    
-    if ultimo_ticket:
-        consecutivo = ultimo_ticket.consecutivo + 1
-    else:
-        consecutivo = 1
+    if consecutivo is None:
+        consecutivo = ticket_sequence.siguiente(ticket_sequence.clave(
+            tipo_servicio_form, tipo_servicio_obj, cliente_nomenclatura, proyecto_nomenclatura
+        ))
     
     # Generar el código del ticket
     ticket_code = f"BID-{tipo_servicio_form}-{tipo_servicio_obj.nomenclatura}-{tipo_servicio_obj.id}-{cliente_nomenclatura}-{proyecto_nomenclatura}-{consecutivo:03d}"
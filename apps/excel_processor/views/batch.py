@@ -0,0 +1,107 @@
+"""
+Vista de carga por lotes de archivos Excel
+"""
+from django.shortcuts import render
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.cache import never_cache
+from django_ratelimit.decorators import ratelimit
+
+from ..services.batch_service import (
+    MAX_BATCH_FILES, expand_batch_files, parse_workbooks_parallel, create_tickets_for_batch
+)
+from .upload import validate_file_security, sanitize_extracted_data
+
+import logging
+logger = logging.getLogger('security')
+
+MAX_ZIP_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+
+
+@login_required
+@csrf_protect
+@never_cache
+@ratelimit(key='user', rate='10/h', method='POST', block=True)
+def upload_excel_batch(request):
+    """Procesa la carga de varios archivos Excel (o un ZIP) y genera un ticket por archivo"""
+
+    logger.info(f"Intento de carga por lotes por usuario {request.user.username} desde IP {request.META.get('REMOTE_ADDR')}")
+
+    if request.method != 'POST':
+        return render(request, 'extractor/upload_batch.html')
+
+    tipo_servicio_form = request.POST.get('tipo_servicio', '').strip()
+    uploaded_files = request.FILES.getlist('excel_files')
+
+    if not tipo_servicio_form:
+        messages.error(request, 'Por favor selecciona un tipo de servicio')
+        return render(request, 'extractor/upload_batch.html')
+
+    if not uploaded_files:
+        messages.error(request, 'Por favor selecciona uno o más archivos Excel o un ZIP')
+        return render(request, 'extractor/upload_batch.html')
+
+    for uploaded_file in uploaded_files:
+        if uploaded_file.name.lower().endswith('.zip') and uploaded_file.size > MAX_ZIP_FILE_SIZE:
+            messages.error(request, f'El ZIP "{uploaded_file.name}" excede el tamaño máximo de {MAX_ZIP_FILE_SIZE // 1024 // 1024}MB')
+            return render(request, 'extractor/upload_batch.html')
+
+    entradas = expand_batch_files(uploaded_files)
+    total_archivos = sum(1 for entrada in entradas if not isinstance(entrada, dict))
+
+    if total_archivos > MAX_BATCH_FILES:
+        messages.error(request, f'El lote contiene {total_archivos} archivos; el máximo es {MAX_BATCH_FILES}')
+        return render(request, 'extractor/upload_batch.html')
+
+    # El reporte conserva el orden de subida: cada etapa llena la posición de su archivo
+    report = [None] * len(entradas)
+
+    # Validación de seguridad por archivo (sin abrir el libro)
+    to_parse = []
+    indices_parse = []
+    for indice, entrada in enumerate(entradas):
+        if isinstance(entrada, dict):
+            report[indice] = entrada
+            continue
+        is_valid, error_msg = validate_file_security(entrada)
+        if not is_valid:
+            logger.warning(f"Archivo rechazado en lote para usuario {request.user.username}: {entrada.name} - {error_msg}")
+            report[indice] = {'archivo': entrada.name, 'success': False, 'error': f'Archivo inválido: {error_msg}'}
+            continue
+        to_parse.append((entrada.name, entrada.read()))
+        indices_parse.append(indice)
+
+    # Extracción en paralelo (los resultados vienen en el mismo orden)
+    parsed_files = []
+    indices_tickets = []
+    for indice, (name, is_valid, error_msg, extracted_data) in zip(indices_parse, parse_workbooks_parallel(to_parse)):
+        if not is_valid:
+            report[indice] = {'archivo': name, 'success': False, 'error': f'Archivo inválido: {error_msg}'}
+            continue
+        parsed_files.append((name, sanitize_extracted_data(extracted_data)))
+        indices_tickets.append(indice)
+
+    try:
+        ticket_report = create_tickets_for_batch(parsed_files, tipo_servicio_form, request)
+    except Exception as e:
+        logger.error(f"Error inesperado en upload_excel_batch para usuario {request.user.username}: {str(e)}")
+        messages.error(request, f'Error procesando el lote: {str(e)}')
+        return render(request, 'extractor/upload_batch.html')
+
+    for indice, result in zip(indices_tickets, ticket_report):
+        report[indice] = result
+
+    creados = sum(1 for result in report if result['success'])
+    logger.info(f"Lote procesado por usuario {request.user.username}: {creados}/{len(report)} tickets generados")
+
+    if creados:
+        messages.success(request, f'✅ {creados} de {len(report)} archivos generaron ticket')
+    else:
+        messages.error(request, 'Ningún archivo del lote generó ticket')
+
+    return render(request, 'extractor/upload_batch.html', {
+        'report': report,
+        'total': len(report),
+        'creados': creados,
+    })
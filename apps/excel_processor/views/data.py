@@ -1,17 +1,18 @@
 """
 Vistas para visualización de datos extraídos de Excel
 """
-from django.shortcuts import render
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Q
 from django.http import HttpResponse
 import csv
 from django.utils import timezone
 import logging
 from django.conf import settings 
 
+from extractor import csv_export, search_index
+from extractor.catalog_names import CatalogNames
 from extractor.models import ExcelData, Cliente, Proyecto, TipoServicio
+from extractor.pagination import contar, paginar
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ def data_list(request):
     """
     Listado de datos extraídos de archivos Excel
     """
-    data = ExcelData.objects.all().order_by('-extracted_date')
+    data = ExcelData.objects.all()
     
     # Filtros
     cliente_id = request.GET.get('cliente')
@@ -39,13 +40,7 @@ def data_list(request):
     if tipo_servicio:
         data = data.filter(tipo_servicio=tipo_servicio)
     if busqueda:
-        data = data.filter(
-            Q(responsable_solicitud__icontains=busqueda) |
-            Q(lider_proyecto__icontains=busqueda) |
-            Q(numero_version__icontains=busqueda) |
-            Q(funcionalidad_liberacion__icontains=busqueda) |
-            Q(ticket_code__icontains=busqueda)
-        )
+        data = search_index.buscar(data, busqueda)
     
     # Paginación
     por_pagina = request.GET.get('por_pagina', 20)
@@ -56,9 +51,17 @@ def data_list(request):
     except ValueError:
         por_pagina = 20
     
-    paginator = Paginator(data, por_pagina)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Paginación por cursor sobre (extracted_date, id)
+    filtrado = any([cliente_id, proyecto_id, tipo_prueba_id, tipo_servicio, busqueda])
+    page_obj = paginar(request, data, ('-extracted_date', '-id'), por_pagina, filtrado=filtrado)
+    CatalogNames().anotar(page_obj)
+    
+    # Total de la tabla (sin filtros) aparte de las coincidencias del paginador,
+    # que con filtros se cuentan solo hasta LIMITE_CONTEO
+    if filtrado:
+        total_registros, total_aproximado = contar(ExcelData.objects.all(), filtrado=False)
+    else:
+        total_registros, total_aproximado = page_obj.paginator.count, page_obj.paginator.aproximado
     
     # Obtener listas para filtros
     clientes = Cliente.objects.filter(activo=True).order_by('nombre')
@@ -69,7 +72,9 @@ def data_list(request):
     context = {
         'data_list': page_obj,
         'page_obj': page_obj,
-        'total_registros': ExcelData.objects.count(),
+        'total_registros': total_registros,
+        'total_aproximado': total_aproximado,
+        'filtrado': filtrado,
         'clientes': clientes,
         'proyectos': proyectos,
         'tipos_prueba': tipos_prueba,
@@ -109,79 +114,45 @@ def export_data_csv(request):
         if tipo_servicio:
             data = data.filter(tipo_servicio=tipo_servicio)
         if busqueda:
-            data = data.filter(
-                Q(responsable_solicitud__icontains=busqueda) |
-                Q(lider_proyecto__icontains=busqueda) |
-                Q(numero_version__icontains=busqueda) |
-                Q(ticket_code__icontains=busqueda)
-            )
+            data = search_index.buscar(data, busqueda)
+        
+        # Nombres de catálogo en lugar de IDs (una sola carga para todo el archivo)
+        nombres = CatalogNames()
         
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
+        campos = (
+            'id', 'cliente', 'proyecto', 'tipo_pruebas', 'tipo_servicio',
+            'responsable_solicitud', 'lider_proyecto', 'tipo_aplicacion',
+            'numero_version', 'funcionalidad_liberacion', 'detalle_cambios',
+            'justificacion_cambio', 'ticket_code', 'extracted_date',
+        )
         
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"datos_excel_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        def filas():
+            for fila in csv_export.iterar(data, *campos):
+                item = dict(zip(campos, fila))
+                yield [
+                    item['id'],
+                    nombres.cliente(item['cliente']),
+                    nombres.proyecto(item['proyecto']),
+                    nombres.tipo_servicio(item['tipo_pruebas']),
+                    item['tipo_servicio'],
+                    item['responsable_solicitud'],
+                    item['lider_proyecto'],
+                    item['tipo_aplicacion'],
+                    item['numero_version'],
+                    item['funcionalidad_liberacion'],
+                    item['detalle_cambios'],
+                    item['justificacion_cambio'],
+                    item['ticket_code'],
+                    csv_export.formatear(item['extracted_date'], '%d/%m/%Y %H:%M:%S'),
+                ]
         
-        writer = csv.writer(response)
-        writer.writerow([
+        logger.info(f"Usuario {request.user} exportó datos Excel")
+        return csv_export.respuesta_csv('datos_excel', [
             'ID', 'Cliente', 'Proyecto', 'Tipo Pruebas', 'Tipo Servicio',
             'Responsable Solicitud', 'Líder Proyecto', 'Tipo Aplicación',
             'Número Versión', 'Funcionalidad Liberación', 'Detalle Cambios',
             'Justificación Cambio', 'Ticket Code', 'Fecha Extracción'
-        ])
-        
-        for item in data:
-            # Obtener nombres en lugar de IDs
-            cliente_nombre = ""
-            try:
-                if item.cliente and item.cliente.isdigit():
-                    cliente = Cliente.objects.filter(id=int(item.cliente)).first()
-                    cliente_nombre = cliente.nombre if cliente else item.cliente
-                else:
-                    cliente_nombre = item.cliente
-            except:
-                cliente_nombre = item.cliente
-            
-            proyecto_nombre = ""
-            try:
-                if item.proyecto and item.proyecto.isdigit():
-                    proyecto = Proyecto.objects.filter(id=int(item.proyecto)).first()
-                    proyecto_nombre = proyecto.nombre if proyecto else item.proyecto
-                else:
-                    proyecto_nombre = item.proyecto
-            except:
-                proyecto_nombre = item.proyecto
-            
-            tipo_pruebas_nombre = ""
-            try:
-                if item.tipo_pruebas and item.tipo_pruebas.isdigit():
-                    tipo = TipoServicio.objects.filter(id=int(item.tipo_pruebas)).first()
-                    tipo_pruebas_nombre = tipo.nombre if tipo else item.tipo_pruebas
-                else:
-                    tipo_pruebas_nombre = item.tipo_pruebas
-            except:
-                tipo_pruebas_nombre = item.tipo_pruebas
-            
-            writer.writerow([
-                item.id,
-                cliente_nombre,
-                proyecto_nombre,
-                tipo_pruebas_nombre,
-                item.tipo_servicio,
-                item.responsable_solicitud,
-                item.lider_proyecto,
-                item.tipo_aplicacion,
-                item.numero_version,
-                item.funcionalidad_liberacion,
-                item.detalle_cambios,
-                item.justificacion_cambio,
-                item.ticket_code,
-                item.extracted_date.strftime('%d/%m/%Y %H:%M:%S') if item.extracted_date else ''
-            ])
-        
-        logger.info(f"Usuario {request.user} exportó datos Excel - {data.count()} registros")
-        return response
+        ], filas())
         
     except Exception as e:
         logger.error(f"Error exportando datos Excel: {str(e)}", exc_info=True)
@@ -200,41 +171,13 @@ def data_detail(request, id):
     data_item = get_object_or_404(ExcelData, id=id)
     
     # Obtener nombres en lugar de IDs para mostrar
-    cliente_nombre = ""
-    try:
-        if data_item.cliente and data_item.cliente.isdigit():
-            cliente = Cliente.objects.filter(id=int(data_item.cliente)).first()
-            cliente_nombre = cliente.nombre if cliente else data_item.cliente
-        else:
-            cliente_nombre = data_item.cliente
-    except:
-        cliente_nombre = data_item.cliente
-    
-    proyecto_nombre = ""
-    try:
-        if data_item.proyecto and data_item.proyecto.isdigit():
-            proyecto = Proyecto.objects.filter(id=int(data_item.proyecto)).first()
-            proyecto_nombre = proyecto.nombre if proyecto else data_item.proyecto
-        else:
-            proyecto_nombre = data_item.proyecto
-    except:
-        proyecto_nombre = data_item.proyecto
-    
-    tipo_pruebas_nombre = ""
-    try:
-        if data_item.tipo_pruebas and data_item.tipo_pruebas.isdigit():
-            tipo = TipoServicio.objects.filter(id=int(data_item.tipo_pruebas)).first()
-            tipo_pruebas_nombre = tipo.nombre if tipo else data_item.tipo_pruebas
-        else:
-            tipo_pruebas_nombre = data_item.tipo_pruebas
-    except:
-        tipo_pruebas_nombre = data_item.tipo_pruebas
+    CatalogNames().anotar([data_item])
     
     context = {
         'data': data_item,
-        'cliente_nombre': cliente_nombre,
-        'proyecto_nombre': proyecto_nombre,
-        'tipo_pruebas_nombre': tipo_pruebas_nombre,
+        'cliente_nombre': data_item.cliente_nombre,
+        'proyecto_nombre': data_item.proyecto_nombre,
+        'tipo_pruebas_nombre': data_item.tipo_pruebas_nombre,
         'debug': settings.DEBUG,
     }
     return render(request, 'extractor/data_detail.html', context)
\ No newline at end of file
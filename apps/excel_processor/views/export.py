@@ -1,14 +1,12 @@
 """
 Vistas para exportaciones generales (CSV, ZIP backups)
 """
-import csv
-import zipfile
-import io
 from django.http import HttpResponse, HttpResponseServerError
+from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
 import logging
 
+from extractor import csv_export
 from extractor.models import Cliente, Proyecto, TipoServicio, Ticket, ExcelData, SolicitudPruebas, Usuario
 
 logger = logging.getLogger(__name__)
@@ -17,7 +15,7 @@ logger = logging.getLogger(__name__)
 @login_required
 def export_table_csv(request, table_name):
     """
-    Exporta una tabla específica a formato CSV
+    Exporta una tabla específica a formato CSV (en streaming)
     """
     try:
         models_map = {
@@ -34,35 +32,10 @@ def export_table_csv(request, table_name):
             return HttpResponse("Tabla no encontrada", status=404)
         
         model = models_map[table_name.lower()]
-        queryset = model.objects.all()
+        headers, _ = csv_export.campos_tabla(model)
         
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        filename = f"{table_name}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        
-        headers = [field.name for field in model._meta.fields]
-        writer.writerow(headers)
-        
-        for obj in queryset:
-            row = []
-            for field in headers:
-                value = getattr(obj, field)
-                if value is None:
-                    row.append('')
-                elif hasattr(value, 'strftime'):
-                    row.append(value.strftime('%Y-%m-%d %H:%M:%S'))
-                elif hasattr(value, 'pk'):
-                    row.append(value.pk)
-                else:
-                    row.append(str(value))
-            writer.writerow(row)
-        
-        logger.info(f"Usuario {request.user} exportó tabla {table_name} - {queryset.count()} registros")
-        return response
+        logger.info(f"Usuario {request.user} exportó tabla {table_name}")
+        return csv_export.respuesta_csv(table_name, headers, csv_export.filas_tabla(model))
         
     except Exception as e:
         logger.error(f"ERROR en export_table_csv: {str(e)}", exc_info=True)
@@ -72,56 +45,27 @@ def export_table_csv(request, table_name):
 @login_required
 def export_all_tables_backup(request):
     """
-    Exporta todas las tablas como CSV en un archivo ZIP
+    Exporta todas las tablas como CSV en un archivo ZIP (en streaming: cada
+    tabla se lee por lotes y se comprime mientras se envía)
     """
     try:
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            models_to_export = {
-                'clientes': Cliente,
-                'proyectos': Proyecto,
-                'tipos_servicio': TipoServicio,
-                'tickets': Ticket,
-                'datos_excel': ExcelData,
-                'solicitudes_pruebas': SolicitudPruebas,
-                'usuarios': Usuario,
-            }
-            
-            for filename, model in models_to_export.items():
-                csv_buffer = io.StringIO()
-                writer = csv.writer(csv_buffer)
-                
-                queryset = model.objects.all()
-                
-                headers = [field.name for field in model._meta.fields]
-                writer.writerow(headers)
-                
-                for obj in queryset:
-                    row = []
-                    for field in headers:
-                        value = getattr(obj, field)
-                        if value is None:
-                            row.append('')
-                        elif hasattr(value, 'strftime'):
-                            row.append(value.strftime('%Y-%m-%d %H:%M:%S'))
-                        elif hasattr(value, 'pk'):
-                            row.append(value.pk)
-                        else:
-                            row.append(str(value))
-                    writer.writerow(row)
-                
-                csv_content = csv_buffer.getvalue().encode('utf-8-sig')
-                zip_file.writestr(f"{filename}.csv", csv_content)
-        
-        zip_buffer.seek(0)
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        models_to_export = {
+            'clientes': Cliente,
+            'proyectos': Proyecto,
+            'tipos_servicio': TipoServicio,
+            'tickets': Ticket,
+            'datos_excel': ExcelData,
+            'solicitudes_pruebas': SolicitudPruebas,
+            'usuarios': Usuario,
+        }
         
-        response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
-        response['Content-Disposition'] = f'attachment; filename="backup_completo_{timestamp}.zip"'
+        archivos = (
+            (f"{filename}.csv", csv_export.campos_tabla(model)[0], csv_export.filas_tabla(model))
+            for filename, model in models_to_export.items()
+        )
         
         logger.info(f"Usuario {request.user} realizó backup completo de la base de datos")
-        return response
+        return csv_export.respuesta_zip_csv('backup_completo', archivos)
         
     except Exception as e:
         logger.error(f"ERROR en export_all_tables_backup: {str(e)}", exc_info=True)
@@ -132,28 +76,15 @@ def export_all_tables_backup(request):
 def export_clientes_csv(request):
     """Exporta clientes a CSV"""
     try:
-        clientes = Cliente.objects.all()
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"clientes_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'])
-        
-        for cliente in clientes:
-            writer.writerow([
-                cliente.id,
-                cliente.nombre,
-                cliente.nomenclatura,
-                'Sí' if cliente.activo else 'No',
-                cliente.fecha_creacion.strftime('%d/%m/%Y %H:%M') if cliente.fecha_creacion else ''
-            ])
-        
-        return response
+        filas = (
+            [id_, nombre, nomenclatura, 'Sí' if activo else 'No', csv_export.formatear(fecha, '%d/%m/%Y %H:%M')]
+            for id_, nombre, nomenclatura, activo, fecha in csv_export.iterar(
+                Cliente.objects.all(), 'id', 'nombre', 'nomenclatura', 'activo', 'fecha_creacion'
+            )
+        )
+        return csv_export.respuesta_csv(
+            'clientes', ['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'], filas
+        )
         
     except Exception as e:
         logger.error(f"Error exportando clientes: {str(e)}")
@@ -166,31 +97,23 @@ def export_clientes_csv(request):
 def export_proyectos_csv(request):
     """Exporta proyectos a CSV"""
     try:
-        proyectos = Proyecto.objects.all().select_related('cliente')
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"proyectos_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Cliente', 'Nombre', 'Código', 'Descripción', 'Activo', 'Fecha Inicio', 'Fecha Fin'])
-        
-        for proyecto in proyectos:
-            writer.writerow([
-                proyecto.id,
-                proyecto.cliente.nombre if proyecto.cliente else '',
-                proyecto.nombre,
-                proyecto.codigo,
-                proyecto.descripcion or '',
-                'Sí' if proyecto.activo else 'No',
-                proyecto.fecha_inicio.strftime('%d/%m/%Y') if proyecto.fecha_inicio else '',
-                proyecto.fecha_fin.strftime('%d/%m/%Y') if proyecto.fecha_fin else ''
-            ])
-        
-        return response
+        filas = (
+            [
+                id_, cliente or '', nombre, codigo, descripcion or '',
+                'Sí' if activo else 'No',
+                csv_export.formatear(fecha_inicio, '%d/%m/%Y'),
+                csv_export.formatear(fecha_fin, '%d/%m/%Y'),
+            ]
+            for id_, cliente, nombre, codigo, descripcion, activo, fecha_inicio, fecha_fin in csv_export.iterar(
+                Proyecto.objects.all(),
+                'id', 'cliente__nombre', 'nombre', 'codigo', 'descripcion', 'activo', 'fecha_inicio', 'fecha_fin',
+            )
+        )
+        return csv_export.respuesta_csv(
+            'proyectos',
+            ['ID', 'Cliente', 'Nombre', 'Código', 'Descripción', 'Activo', 'Fecha Inicio', 'Fecha Fin'],
+            filas,
+        )
         
     except Exception as e:
         logger.error(f"Error exportando proyectos: {str(e)}")
@@ -203,31 +126,18 @@ def export_proyectos_csv(request):
 def export_tipos_servicio_csv(request):
     """Exporta tipos de servicio a CSV"""
     try:
-        tipos = TipoServicio.objects.all()
-        
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"tipos_servicio_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'])
-        
-        for tipo in tipos:
-            writer.writerow([
-                tipo.id,
-                tipo.nombre,
-                tipo.nomenclatura,
-                'Sí' if tipo.activo else 'No',
-                tipo.fecha_creacion.strftime('%d/%m/%Y %H:%M') if tipo.fecha_creacion else ''
-            ])
-        
-        return response
+        filas = (
+            [id_, nombre, nomenclatura, 'Sí' if activo else 'No', csv_export.formatear(fecha, '%d/%m/%Y %H:%M')]
+            for id_, nombre, nomenclatura, activo, fecha in csv_export.iterar(
+                TipoServicio.objects.all(), 'id', 'nombre', 'nomenclatura', 'activo', 'fecha_creacion'
+            )
+        )
+        return csv_export.respuesta_csv(
+            'tipos_servicio', ['ID', 'Nombre', 'Nomenclatura', 'Activo', 'Fecha Creación'], filas
+        )
         
     except Exception as e:
         logger.error(f"Error exportando tipos de servicio: {str(e)}")
         from django.contrib import messages
         messages.error(request, "Error al exportar tipos de servicio")
-        return redirect('extractor:tipos_servicio_list')
\ No newline at end of file
+        return redirect('extractor:tipos_servicio_list')
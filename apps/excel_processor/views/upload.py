@@ -9,7 +9,7 @@ import hashlib
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.files.storage import FileSystemStorage
+from django.db import transaction
 from django.forms import ValidationError
 from django.utils import timezone
 from django.conf import settings
@@ -20,9 +20,9 @@ from django.views.decorators.http import require_http_methods
 from django_ratelimit.decorators import ratelimit
 
 from extractor.models import Cliente, Proyecto, TipoServicio, ExcelData, Ticket, SolicitudPruebas
-from ..services.extractor_service import extract_excel_data, find_object_by_name_or_id
+from ..services.extractor_service import read_excel_workbook, find_object_by_name_or_id
 from ..services.ticket_generator import generate_and_save_ticket
-from extractor.jira_helper import JiraClient, create_jira_issue_from_ticket 
+from extractor.jira_helper import enqueue_jira_issue_from_ticket
 
 import logging
 logger = logging.getLogger('security')
@@ -96,18 +96,8 @@ def validate_file_security(uploaded_file: UploadedFile) -> tuple[bool, str]:
     file_hash = hashlib.sha256(uploaded_file.read()).hexdigest()
     uploaded_file.seek(0)
     
-    # 7. Verificar si es un archivo Excel válido
-    try:
-        import openpyxl
-        from openpyxl import load_workbook
-        
-        # Intentar cargar para validar estructura
-        wb = load_workbook(uploaded_file, data_only=True, read_only=True)
-        wb.close()
-        uploaded_file.seek(0)  # Reiniciar puntero después de la validación
-        
-    except Exception as e:
-        return False, f"El archivo Excel parece estar dañado o corrupto: {str(e)[:100]}"
+    # 7. La estructura del libro se valida en read_excel_workbook, que abre
+    #    el archivo una sola vez junto con la extracción de datos
     
     return True, ""
 
@@ -122,9 +112,6 @@ def upload_excel(request):
     logger.info(f"Intento de carga de archivo por usuario {request.user.username} desde IP {request.META.get('REMOTE_ADDR')}")
     
     if request.method == 'POST':
-        fs = FileSystemStorage()
-        file_path = None
-        
         try:
             tipo_servicio_form = request.POST.get('tipo_servicio', '').strip()
             excel_file = request.FILES.get('excel_file')
@@ -145,9 +132,6 @@ def upload_excel(request):
                 messages.error(request, f'Archivo inválido: {error_msg}')
                 return render(request, 'extractor/upload.html')
             
-            # Sanitizar nombre del archivo
-            safe_filename = re.sub(r'[^\w\-_\.]', '_', excel_file.name)
-            
             # Validar solicitud existente
             solicitud = SolicitudPruebas.objects.filter(
                 nombre_archivo=excel_file.name
@@ -165,12 +149,12 @@ def upload_excel(request):
                 solicitud_encontrada = True
                 print(f"✅ Solicitud existente encontrada ID: {solicitud.id}")
                 
-            # Guardar archivo temporal con nombre seguro
-            filename = fs.save(safe_filename, excel_file)
-            file_path = os.path.join(settings.MEDIA_ROOT, filename)
-            
-            # Extraer datos
-            extracted_data = extract_excel_data(file_path)
+            # Validar estructura y extraer datos en una sola lectura del libro
+            is_valid, error_msg, extracted_data = read_excel_workbook(excel_file)
+            if not is_valid:
+                logger.warning(f"Archivo rechazado para usuario {request.user.username}: {error_msg}")
+                messages.error(request, f'Archivo inválido: {error_msg}')
+                return render(request, 'extractor/upload.html')
             
             # Validar y sanitizar datos extraídos
             extracted_data = sanitize_extracted_data(extracted_data)
@@ -217,17 +201,16 @@ def upload_excel(request):
                 'tipo_servicio_obj': tipo_prueba_obj
             }
             
-            ticket_code, ticket_obj = generate_and_save_ticket(
-                extracted_data,
-                tipo_servicio_form,
-                nomenclaturas,
-                objetos_encontrados,
-                request
-            )
-            
-            # Crear Jira issue
-            if ticket_obj:
-                # Preparar datos para el helper
+            with transaction.atomic():
+                ticket_code, ticket_obj = generate_and_save_ticket(
+                    extracted_data,
+                    tipo_servicio_form,
+                    nomenclaturas,
+                    objetos_encontrados,
+                    request
+                )
+                
+                # Registrar la creación del Jira issue en el outbox (misma transacción)
                 jira_data = {
                     'cliente_obj': cliente_obj,
                     'proyecto_obj': proyecto_obj,
@@ -239,16 +222,9 @@ def upload_excel(request):
                     'detalle_cambios': extracted_data.get('detalle_cambios', ''),
                     'justificacion_cambio': extracted_data.get('justificacion_cambio', ''),
                 }
-                
-                # Crear Jira issue usando el helper
-                success, message, jira_issue = create_jira_issue_from_ticket(
-                    ticket_obj, jira_data, request
-                )
-                
-                if success:
-                    messages.info(request, f'📋 {message}')
-                else:
-                    messages.warning(request, f'Ticket creado pero {message}')
+                enqueue_jira_issue_from_ticket(ticket_obj, jira_data, request)
+            
+            messages.info(request, '📋 La incidencia en Jira se creará en segundo plano')
             
             # Actualizar solicitud (código existente)
             if solicitud_encontrada and solicitud:
@@ -272,15 +248,7 @@ def upload_excel(request):
             logger.error(f"Error inesperado en upload_excel para usuario {request.user.username}: {str(e)}")
             messages.error(request, f'Error procesando el archivo: {str(e)}')
             return render(request, 'extractor/upload.html')
-            
-        finally:
-            if file_path and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    logger.debug(f"Archivo temporal eliminado: {file_path}")
-                except Exception as e:
-                    logger.error(f"Error al eliminar archivo temporal: {e}")
-    
+
     return render(request, 'extractor/upload.html')
 
 
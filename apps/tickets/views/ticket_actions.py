@@ -7,7 +7,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.utils import timezone
 import json
-from extractor.jira_helper import JiraClient
+from extractor.jira_helper import get_jira_client
 from extractor.models import Ticket, Usuario
 
 @csrf_exempt
@@ -48,7 +48,7 @@ def ticket_cambiar_estado(request, id):
         jira_result = None
         if cerrar_en_jira and nuevo_estado in estados_terminales:
             try:
-                jira_client = JiraClient()
+                jira_client = get_jira_client()
                 # Verificar si el ticket tiene issue_key
                 if hasattr(ticket, 'jira_issue_key') and ticket.jira_issue_key:
                     jira_result = jira_client.close_issue(
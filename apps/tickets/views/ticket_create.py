@@ -4,9 +4,9 @@ Vistas para creación manual de tickets
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db import models
 from django.http import JsonResponse
 
+from extractor import ticket_sequence
 from extractor.models import Ticket, Cliente, Proyecto, TipoServicio, ExcelData
 from django.conf import settings
 
@@ -45,6 +45,7 @@ def ticket_create(request):
                 return redirect('extractor:ticket_create')
             
             # Consecutivo
+            secuencia = ticket_sequence.clave(tipo_servicio_code, tipo_prueba, cliente.nomenclatura, proyecto.codigo)
             consecutivo_manual = request.POST.get('consecutivo', '').strip()
             
             if consecutivo_manual:
@@ -54,38 +55,19 @@ def ticket_create(request):
                         messages.error(request, 'El consecutivo debe estar entre 1 y 999')
                         return redirect('extractor:ticket_create')
                     
-                    existe = Ticket.objects.filter(
-                        empresa_code="BID",
-                        tipo_servicio_code=tipo_servicio_code,
-                        funcion_code=tipo_prueba.nomenclatura,
-                        version_code=str(tipo_prueba.id),
-                        cliente_code=cliente.nomenclatura,
-                        proyecto_code=proyecto.codigo,
-                        consecutivo=consecutivo_num
-                    ).exists()
+                    existe = Ticket.objects.filter(**secuencia, consecutivo=consecutivo_num).exists()
                     
                     if existe:
                         messages.error(request, f'Ya existe un ticket con consecutivo {consecutivo_num:03d}')
                         return redirect('extractor:ticket_create')
                     
+                    ticket_sequence.registrar(secuencia, consecutivo_num)
+                    
                 except ValueError:
                     messages.error(request, 'El consecutivo debe ser un número válido')
                     return redirect('extractor:ticket_create')
             else:
-                tickets_existentes = Ticket.objects.filter(
-                    empresa_code="BID",
-                    tipo_servicio_code=tipo_servicio_code,
-                    funcion_code=tipo_prueba.nomenclatura,
-                    version_code=str(tipo_prueba.id),
-                    cliente_code=cliente.nomenclatura,
-                    proyecto_code=proyecto.codigo
-                )
-                
-                if tickets_existentes.exists():
-                    max_consecutivo = tickets_existentes.aggregate(models.Max('consecutivo'))['consecutivo__max']
-                    consecutivo_num = (max_consecutivo or 0) + 1
-                else:
-                    consecutivo_num = 1
+                consecutivo_num = ticket_sequence.siguiente(secuencia)
             
             consecutivo_str = f"{consecutivo_num:03d}"
             ticket_code = f"BID-{tipo_servicio_code}-{tipo_prueba.nomenclatura}-{tipo_prueba.id}-{cliente.nomenclatura}-{proyecto.codigo}-{consecutivo_str}"
@@ -195,6 +177,7 @@ def ticket_create_simple(request):
                 return redirect('extractor:ticket_create_simple')
             
             # Consecutivo
+            secuencia = ticket_sequence.clave(tipo_servicio_code, tipo_prueba, cliente.nomenclatura, proyecto.codigo)
             if consecutivo_manual:
                 try:
                     consecutivo_num = int(consecutivo_manual)
@@ -202,38 +185,19 @@ def ticket_create_simple(request):
                         messages.error(request, 'El consecutivo debe ser entre 1 y 999')
                         return redirect('extractor:ticket_create_simple')
                     
-                    existe = Ticket.objects.filter(
-                        empresa_code="BID",
-                        tipo_servicio_code=tipo_servicio_code,
-                        funcion_code=tipo_prueba.nomenclatura,
-                        version_code=str(tipo_prueba.id),
-                        cliente_code=cliente.nomenclatura,
-                        proyecto_code=proyecto.codigo,
-                        consecutivo=consecutivo_num
-                    ).exists()
+                    existe = Ticket.objects.filter(**secuencia, consecutivo=consecutivo_num).exists()
                     
                     if existe:
                         messages.error(request, f'Ya existe un ticket con consecutivo {consecutivo_num:03d}')
                         return redirect('extractor:ticket_create_simple')
                     
+                    ticket_sequence.registrar(secuencia, consecutivo_num)
+                    
                 except ValueError:
                     messages.error(request, 'El consecutivo debe ser un número válido')
                     return redirect('extractor:ticket_create_simple')
             else:
-                tickets_existentes = Ticket.objects.filter(
-                    empresa_code="BID",
-                    tipo_servicio_code=tipo_servicio_code,
-                    funcion_code=tipo_prueba.nomenclatura,
-                    version_code=str(tipo_prueba.id),
-                    cliente_code=cliente.nomenclatura,
-                    proyecto_code=proyecto.codigo
-                )
-                
-                if tickets_existentes.exists():
-                    max_consecutivo = tickets_existentes.aggregate(models.Max('consecutivo'))['consecutivo__max']
-                    consecutivo_num = (max_consecutivo or 0) + 1
-                else:
-                    consecutivo_num = 1
+                consecutivo_num = ticket_sequence.siguiente(secuencia)
             
             consecutivo_str = f"{consecutivo_num:03d}"
             ticket_code = f"BID-{tipo_servicio_code}-{tipo_prueba.nomenclatura}-{tipo_prueba.id}-{cliente.nomenclatura}-{proyecto.codigo}-{consecutivo_str}"
@@ -315,20 +279,8 @@ def crear_ticket_manual(request):
                 messages.error(request, 'El proyecto no pertenece al cliente seleccionado')
                 return redirect('extractor:crear_ticket_manual')
             
-            tickets_existentes = Ticket.objects.filter(
-                empresa_code="BID",
-                tipo_servicio_code=tipo_servicio_code,
-                funcion_code=tipo_prueba.nomenclatura,
-                version_code=str(tipo_prueba.id),
-                cliente_code=cliente.nomenclatura,
-                proyecto_code=proyecto.codigo
-            )
-            
-            if tickets_existentes.exists():
-                max_consecutivo = tickets_existentes.aggregate(models.Max('consecutivo'))['consecutivo__max']
-                consecutivo_num = (max_consecutivo or 0) + 1
-            else:
-                consecutivo_num = 1
+            secuencia = ticket_sequence.clave(tipo_servicio_code, tipo_prueba, cliente.nomenclatura, proyecto.codigo)
+            consecutivo_num = ticket_sequence.siguiente(secuencia)
             
             consecutivo_str = f"{consecutivo_num:03d}"
             ticket_code = f"BID-{tipo_servicio_code}-{tipo_prueba.nomenclatura}-{tipo_prueba.id}-{cliente.nomenclatura}-{proyecto.codigo}-{consecutivo_str}"
@@ -4,47 +4,40 @@ Vistas para CRUD de Tickets
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Q
 from django.http import JsonResponse
 from django.utils import timezone
 import json
+from calendar import monthrange
 from datetime import datetime
 from django.conf import settings 
+from extractor import search_index, ticket_stats
 from extractor.models import Ticket, Cliente, Proyecto, TipoServicio
+from extractor.pagination import paginar
+
+# Órdenes permitidos en el listado: solo columnas indexadas para el cursor
+ORDENES_TICKETS = {
+    '-fecha_creacion': ('-fecha_creacion', '-id'),
+    'fecha_creacion': ('fecha_creacion', 'id'),
+}
 
 @login_required
 def ticket_list(request):
     """Listado de tickets con filtros y paginación"""
     # ===== ESTADÍSTICAS DEL MES ACTUAL (NUEVO) =====
-    now = timezone.now()
-    
-    # Primer día del mes actual (00:00:00)
-    primer_dia_mes = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    # Último día del mes actual (23:59:59)
-    if now.month == 12:
-        ultimo_dia_mes = now.replace(year=now.year + 1, month=1, day=1) - timezone.timedelta(days=1)
-    else:
-        ultimo_dia_mes = now.replace(month=now.month + 1, day=1) - timezone.timedelta(days=1)
+    # Se leen de la tabla precalculada TicketDailyStats
+    hoy = timezone.localdate()
+    primer_dia_mes = hoy.replace(day=1)
+    ultimo_dia_mes = hoy.replace(day=monthrange(hoy.year, hoy.month)[1])
     
-    ultimo_dia_mes = ultimo_dia_mes.replace(hour=23, minute=59, second=59, microsecond=999999)
-    
-    # Filtrar tickets creados en el mes actual
-    tickets_mes = Ticket.objects.filter(
-        fecha_creacion__gte=primer_dia_mes,
-        fecha_creacion__lte=ultimo_dia_mes
-    )
+    conteo_mes = ticket_stats.conteo_por_estado(ticket_stats.estadisticas(primer_dia_mes, ultimo_dia_mes))
     
     # Calcular estadísticas solo del mes actual
-    total_tickets_mes = tickets_mes.count()
-    tickets_generados_mes = tickets_mes.filter(estado='GENERADO').count()
-    tickets_abiertos_mes = tickets_mes.filter(estado='ABIERTO').count()
-    tickets_proceso_mes = tickets_mes.filter(estado='EN_PROCESO').count()
-    tickets_completados_mes = tickets_mes.filter(estado='COMPLETADO').count()
+    total_tickets_mes = sum(conteo_mes.values())
+    tickets_proceso_mes = conteo_mes.get('EN_PROCESO', 0)
+    tickets_completados_mes = conteo_mes.get('COMPLETADO', 0)
     
     # Combinar GENERADO + ABIERTO para mostrar como "Generados"
-    tickets_generados_total_mes = tickets_generados_mes + tickets_abiertos_mes
+    tickets_generados_total_mes = conteo_mes.get('GENERADO', 0) + conteo_mes.get('ABIERTO', 0)
     
     # Nombre del mes actual en español
     meses_espanol = {
@@ -52,7 +45,7 @@ def ticket_list(request):
         5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
         9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
     }
-    mes_actual_nombre = meses_espanol.get(now.month, 'Mes Actual')
+    mes_actual_nombre = meses_espanol.get(hoy.month, 'Mes Actual')
     
     # ===== FIN ESTADÍSTICAS MES ACTUAL =====
 
@@ -96,12 +89,7 @@ def ticket_list(request):
         tickets = tickets.filter(proyecto_id=proyecto_id)
     
     if busqueda:
-        tickets = tickets.filter(
-            Q(codigo__icontains=busqueda) |
-            Q(nombre__icontains=busqueda) |
-            Q(responsable_solicitud__icontains=busqueda) |
-            Q(lider_proyecto__icontains=busqueda)
-        )
+        tickets = search_index.buscar(tickets, busqueda)
     
     # Aplicar filtros de fecha
     if fecha_desde:
@@ -119,7 +107,8 @@ def ticket_list(request):
             pass
 
     orden = request.GET.get('orden', '-fecha_creacion')
-    tickets = tickets.order_by(orden)
+    if orden not in ORDENES_TICKETS:
+        orden = '-fecha_creacion'
 
     # Paginación
     try:
@@ -129,19 +118,25 @@ def ticket_list(request):
     except ValueError:
         por_pagina = 20
     
-    paginator = Paginator(tickets, por_pagina)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Estadísticas generales (una consulta agrupada sobre TicketDailyStats)
+    conteo_general = ticket_stats.conteo_por_estado(ticket_stats.estadisticas())
+    filtrado = any([estado, cliente_id, cliente_nombre, proyecto_id, busqueda, fecha_desde, fecha_hasta])
 
-    # Estadísticas (considerando también los filtros de fecha para mostrar en tarjetas)
-    tickets_generados = Ticket.objects.filter(estado='GENERADO').count()
-    tickets_abiertos = Ticket.objects.filter(estado='ABIERTO').count()
-    tickets_proceso = Ticket.objects.filter(estado='EN_PROCESO').count()
-    tickets_completados = Ticket.objects.filter(estado='COMPLETADO').count()
-    tickets_cancelados = Ticket.objects.filter(estado='CANCELADO').count()
+    # Paginación por cursor; sin filtros el total sale de TicketDailyStats
+    page_obj = paginar(
+        request, tickets, ORDENES_TICKETS[orden], por_pagina,
+        filtrado=filtrado,
+        total=None if filtrado else sum(conteo_general.values()),
+    )
+    tickets_generados = conteo_general.get('GENERADO', 0)
+    tickets_abiertos = conteo_general.get('ABIERTO', 0)
+    tickets_proceso = conteo_general.get('EN_PROCESO', 0)
+    tickets_completados = conteo_general.get('COMPLETADO', 0)
+    tickets_cancelados = conteo_general.get('CANCELADO', 0)
     
-    # 🆕 Estadísticas filtradas por fecha (para mostrar en el indicador)
-    tickets_filtrados_count = tickets.count()
+    # 🆕 Estadísticas filtradas por fecha (para mostrar en el indicador);
+    # el paginador ya hizo este conteo (acotado si hay muchos resultados)
+    tickets_filtrados_count = page_obj.paginator.count
     
     context = {
         'tickets': page_obj,
@@ -156,7 +151,7 @@ def ticket_list(request):
         # ===== FIN NUEVAS VARIABLES =====
         
         # Variables originales (se mantienen por compatibilidad)
-        'total_tickets': Ticket.objects.count(),
+        'total_tickets': sum(conteo_general.values()),
         'tickets_filtrados': tickets_filtrados_count,
         'tickets_generados': tickets_generados + tickets_abiertos,
         'tickets_proceso': tickets_proceso,
@@ -173,7 +168,7 @@ def ticket_list(request):
         'busqueda': busqueda or '',
         'orden_actual': orden,
         'por_pagina': por_pagina,
-        'tickets_count': tickets.count(),
+        'tickets_count': tickets_filtrados_count,
         'fecha_desde': fecha_desde or '',
         'fecha_hasta': fecha_hasta or '',
         'cliente_nombre': cliente_nombre or '',
@@ -4,13 +4,16 @@ Vistas para exportación de tickets
 import csv
 from io import BytesIO
 from django.http import HttpResponse
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models.functions import Substr
+from django.shortcuts import redirect
 from django.utils import timezone
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 import logging
 
+from extractor import csv_export, search_index
 from extractor.models import Ticket
 
 logger = logging.getLogger(__name__)
@@ -20,7 +23,7 @@ logger = logging.getLogger(__name__)
 def export_tickets_csv_view(request):
     """Exporta tickets a CSV (versión mejorada)"""
     try:
-        tickets = Ticket.objects.all().select_related('cliente', 'proyecto', 'tipo_servicio', 'excel_data')
+        tickets = Ticket.objects.all()
         
         # Aplicar filtros si vienen en GET
         estado = request.GET.get('estado')
@@ -34,39 +37,38 @@ def export_tickets_csv_view(request):
         if proyecto_id:
             tickets = tickets.filter(proyecto_id=proyecto_id)
         
-        response = HttpResponse(content_type='text/csv')
-        response.write('\ufeff'.encode('utf-8'))
+        # Solo los primeros 100 caracteres de los textos largos, cortados en la base de datos
+        tickets = tickets.annotate(
+            funcionalidad_corta=Substr('excel_data__funcionalidad_liberacion', 1, 100),
+            detalle_corto=Substr('excel_data__detalle_cambios', 1, 100),
+            justificacion_corta=Substr('excel_data__justificacion_cambio', 1, 100),
+        )
+        estados = dict(Ticket.ESTADOS_TICKET)
         
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"tickets_{timestamp}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        filas = (
+            [
+                id_, codigo, estados.get(estado, estado),
+                cliente or '', proyecto or '', tipo_servicio or '',
+                responsable or '', lider or '', version or '',
+                funcionalidad or '', detalle or '', justificacion or '',
+                csv_export.formatear(fecha, '%d/%m/%Y %H:%M'),
+            ]
+            for (
+                id_, codigo, estado, cliente, proyecto, tipo_servicio, responsable, lider, version,
+                funcionalidad, detalle, justificacion, fecha,
+            ) in csv_export.iterar(
+                tickets,
+                'id', 'codigo', 'estado', 'cliente__nombre', 'proyecto__nombre', 'tipo_servicio__nombre',
+                'responsable_solicitud', 'lider_proyecto', 'numero_version',
+                'funcionalidad_corta', 'detalle_corto', 'justificacion_corta', 'fecha_creacion',
+            )
+        )
         
-        writer = csv.writer(response)
-        writer.writerow([
+        return csv_export.respuesta_csv('tickets', [
             'ID', 'Código Ticket', 'Estado', 'Cliente', 'Proyecto', 
             'Tipo Servicio', 'Responsable', 'Líder Proyecto', 'Versión',
             'Funcionalidad', 'Detalle Cambios', 'Justificación', 'Fecha Creación'
-        ])
-        
-        for ticket in tickets:
-            excel_data = ticket.excel_data
-            writer.writerow([
-                ticket.id,
-                ticket.codigo,
-                ticket.get_estado_display(),
-                ticket.cliente.nombre if ticket.cliente else '',
-                ticket.proyecto.nombre if ticket.proyecto else '',
-                ticket.tipo_servicio.nombre if ticket.tipo_servicio else '',
-                ticket.responsable_solicitud or '',
-                ticket.lider_proyecto or '',
-                ticket.numero_version or '',
-                excel_data.funcionalidad_liberacion[:100] if excel_data and excel_data.funcionalidad_liberacion else '',
-                excel_data.detalle_cambios[:100] if excel_data and excel_data.detalle_cambios else '',
-                excel_data.justificacion_cambio[:100] if excel_data and excel_data.justificacion_cambio else '',
-                ticket.fecha_creacion.strftime('%d/%m/%Y %H:%M') if ticket.fecha_creacion else ''
-            ])
-        
-        return response
+        ], filas)
         
     except Exception as e:
         logger.error(f"Error exportando tickets: {str(e)}", exc_info=True)
@@ -92,11 +94,7 @@ def export_tickets_excel(request):
     if proyecto_id:
         tickets = tickets.filter(proyecto_id=proyecto_id)
     if busqueda:
-        tickets = tickets.filter(
-            Q(codigo__icontains=busqueda) |
-            Q(responsable_solicitud__icontains=busqueda) |
-            Q(lider_proyecto__icontains=busqueda)
-        )
+        tickets = search_index.buscar(tickets, busqueda)
     
     wb = Workbook()
     ws = wb.active
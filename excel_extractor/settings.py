@@ -9,6 +9,7 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 from urllib.parse import urlparse
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -203,7 +204,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ============ JIRA CONFIG ============
 JIRA_CONFIG = {
-    'URL': 'https://buroidentidaddigital.atlassian.net',
+    'URL': os.environ.get('JIRA_URL', 'https://buroidentidaddigital.atlassian.net'),
     'PROJECT_KEY': 'QA01',
     'EMAIL': os.environ.get('JIRA_EMAIL', ''),
     'API_TOKEN': os.environ.get('JIRA_API_TOKEN', ''),
@@ -220,6 +221,83 @@ SOLICITUD_COOLDOWN_SEGUNDOS = SOLICITUD_COOLDOWN_MINUTOS * 60
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
+# Caché en disco del agente de IA (modelo elegido, casos generados)
+IA_CACHE_DIR = os.environ.get('IA_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'ia_agent'))
+
+# ============ CACHÉ ============
+# CACHE_BACKEND elige el backend compartido por los workers de gunicorn:
+#   file   -> archivos en DJANGO_CACHE_DIR (por defecto, sin servicios externos)
+#   db     -> tabla 'django_cache' en la base de datos (createcachetable)
+#   redis  -> servidor compatible con Redis en CACHE_URL / REDIS_URL (requiere el paquete redis)
+#   locmem -> memoria de cada proceso (solo desarrollo, no se comparte)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file').strip().lower()
+CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'pruebas')
+CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 300))
+
+if CACHE_BACKEND == 'file':
+    _cache_default = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'django')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 5000))},
+    }
+elif CACHE_BACKEND == 'db':
+    _cache_default = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.environ.get('CACHE_TABLE', 'django_cache'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 5000))},
+    }
+elif CACHE_BACKEND == 'redis':
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured("CACHE_BACKEND='redis' requiere el paquete redis (pip install redis)")
+    _cache_default = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_URL') or os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }
+elif CACHE_BACKEND == 'locmem':
+    _cache_default = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pruebas-locmem',
+    }
+else:
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND='{CACHE_BACKEND}' no es válido (usa file, db, redis o locmem)"
+    )
+
+_cache_default.update({'KEY_PREFIX': CACHE_KEY_PREFIX, 'TIMEOUT': CACHE_TIMEOUT})
+
+# django-ratelimit necesita incrementos atómicos, que file y db no tienen
+# (con concurrencia cuentan de menos). Usa Redis si está configurado y si no
+# la memoria de cada proceso, como antes de existir la caché compartida: el
+# límite se aplica por worker. En producción usa CACHE_BACKEND=redis para
+# que el límite sea global.
+if CACHE_BACKEND == 'redis':
+    _cache_ratelimit = {key: _cache_default[key] for key in ('BACKEND', 'LOCATION')}
+else:
+    _cache_ratelimit = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pruebas-ratelimit',
+    }
+_cache_ratelimit['KEY_PREFIX'] = f'{CACHE_KEY_PREFIX}-ratelimit'
+
+CACHES = {'default': _cache_default, 'ratelimit': _cache_ratelimit}
+
+# Contadores de aciertos/fallos por espacio (estado_cache). Apagados por
+# defecto: cada lectura de caché escribe un contador extra
+CACHE_CONTADORES = os.environ.get('CACHE_CONTADORES', 'False') == 'True'
+
+RATELIMIT_USE_CACHE = 'ratelimit'
+
+# Vigencia (segundos) de las estadísticas y pendientes de la consulta pública
+CONSULTA_PUBLICA_CACHE_TTL = int(os.environ.get('CONSULTA_PUBLICA_CACHE_TTL', 120))
+
+# Carpeta local de los dictámenes/resultados ya generados (ver document_cache)
+DOCUMENTOS_CACHE_DIR = os.environ.get('DOCUMENTOS_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'documentos'))
+
+# Procesos por descarga web de documentos en lote (el comando usa todos los núcleos)
+DOCUMENTOS_LOTE_MAX_WORKERS = int(os.environ.get('DOCUMENTOS_LOTE_MAX_WORKERS', 2))
+
 # ============ CLOUDINARY ============
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.environ.get('CLOUDINARY_CLOUD_NAME'),
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ExtractorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'extractor'  # Esto es importante
\ No newline at end of file
+    name = 'extractor'  # Esto es importante
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,153 @@
+# extractor/cache_utils.py
+"""
+Utilidades sobre la caché de Django configurada en settings.CACHES.
+
+Cada funcionalidad que cachea datos usa su propio CacheNamespace: las claves
+llevan el nombre del espacio como prefijo y se invalidan todas a la vez
+incrementando la versión del espacio. Con settings.CACHE_CONTADORES se cuentan
+además aciertos y fallos en la misma caché (compartidos entre procesos si el
+backend lo es).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+_AUSENTE = object()
+
+# Espacios de nombres creados en el proceso: {nombre: CacheNamespace}
+REGISTRO = {}
+
+
+def _incrementar(clave, inicial=0):
+    """Incrementa un contador sin caducidad creándolo si no existe"""
+    if cache.add(clave, inicial + 1, timeout=None):
+        return inicial + 1
+    try:
+        return cache.incr(clave)
+    except ValueError:
+        # La clave caducó o fue expulsada entre add() e incr()
+        cache.set(clave, inicial + 1, timeout=None)
+        return inicial + 1
+
+
+class CacheNamespace:
+    """
+    Grupo de claves de caché con prefijo común e invalidación por versión.
+
+    Uso:
+        NS = CacheNamespace('consulta_publica', timeout=120)
+        datos = NS.get_or_set('estadisticas', '2026-10', calcular=lambda: ...)
+        NS.invalidar()
+    """
+
+    def __init__(self, nombre, timeout=None):
+        self.nombre = nombre
+        self.timeout = timeout
+        REGISTRO[nombre] = self
+
+    def _clave_interna(self, sufijo):
+        return f'{self.nombre}:__{sufijo}__'
+
+    def version(self):
+        """
+        Versión vigente del espacio
+
+        Si la clave de versión no existe (espacio nuevo, o el backend la
+        expulsó al purgar entradas) se siembra con la hora actual en ms: es
+        mayor que cualquier versión anterior, así que no reaparecen valores
+        guardados con una versión vieja.
+        """
+        clave = self._clave_interna('version')
+        version = cache.get(clave)
+        if version is None:
+            nueva = int(time.time() * 1000)
+            if cache.add(clave, nueva, timeout=None):
+                return nueva
+            version = cache.get(clave) or nueva
+        return version
+
+    def clave(self, *partes):
+        """Clave con el prefijo del espacio: 'nombre:parte1:parte2'"""
+        return ':'.join([self.nombre, *(str(parte) for parte in partes)])
+
+    def _timeout(self, timeout):
+        return self.timeout if timeout is None else timeout
+
+    def get(self, *partes, default=None):
+        valor = cache.get(self.clave(*partes), _AUSENTE, version=self.version())
+        if valor is _AUSENTE:
+            self._contar('misses')
+            return default
+        self._contar('hits')
+        return valor
+
+    def set(self, *partes, valor, timeout=None):
+        cache.set(self.clave(*partes), valor, self._timeout(timeout), version=self.version())
+
+    def delete(self, *partes):
+        cache.delete(self.clave(*partes), version=self.version())
+
+    def get_or_set(self, *partes, calcular, timeout=None):
+        """
+        Devuelve el valor cacheado o lo calcula con calcular() y lo guarda
+
+        Args:
+            *partes: componentes de la clave dentro del espacio
+            calcular: función sin argumentos que produce el valor
+            timeout: segundos; None usa el timeout del espacio
+        """
+        version = self.version()
+        clave = self.clave(*partes)
+        valor = cache.get(clave, _AUSENTE, version=version)
+        if valor is not _AUSENTE:
+            self._contar('hits')
+            return valor
+
+        self._contar('misses')
+        valor = calcular()
+        cache.set(clave, valor, self._timeout(timeout), version=version)
+        return valor
+
+    def invalidar(self):
+        """Invalida todas las claves del espacio pasando a la siguiente versión"""
+        self.version()
+        try:
+            return cache.incr(self._clave_interna('version'))
+        except ValueError:
+            # Expulsada entre version() e incr(): sembrarla de nuevo ya invalida
+            return self.version()
+
+    # ========== CONTADORES ==========
+
+    def _contar(self, tipo):
+        if not settings.CACHE_CONTADORES:
+            return
+        try:
+            _incrementar(self._clave_interna(tipo))
+        except Exception:
+            # Los contadores son informativos: nunca deben romper la petición
+            pass
+
+    def contadores(self):
+        """{'hits', 'misses', 'ratio', 'version'} del espacio"""
+        hits = cache.get(self._clave_interna('hits')) or 0
+        misses = cache.get(self._clave_interna('misses')) or 0
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'ratio': round(hits / total, 3) if total else 0.0,
+            'version': self.version(),
+        }
+
+    def reiniciar_contadores(self):
+        cache.delete_many([self._clave_interna('hits'), self._clave_interna('misses')])
+
+
+def namespace(nombre, timeout=None):
+    """Devuelve el espacio registrado con ese nombre o lo crea"""
+    existente = REGISTRO.get(nombre)
+    if existente is not None:
+        return existente
+    return CacheNamespace(nombre, timeout=timeout)
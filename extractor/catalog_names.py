@@ -0,0 +1,73 @@
+# extractor/catalog_names.py
+"""
+Resolución de IDs de catálogo a nombres.
+
+ExcelData guarda cliente, proyecto y tipo_pruebas como texto (normalmente el
+ID). En lugar de una consulta por fila, se carga una instantánea
+{id: nombre} de Cliente, Proyecto y TipoServicio desde la caché compartida;
+las señales de esos modelos la invalidan al cambiar (ver extractor/signals.py).
+"""
+from django.db import transaction
+
+from .cache_utils import CacheNamespace
+
+CACHE = CacheNamespace('catalogos', timeout=3600)
+
+# atributo de ExcelData -> catálogo
+CAMPOS_EXCEL_DATA = {
+    'cliente': 'cliente',
+    'proyecto': 'proyecto',
+    'tipo_pruebas': 'tipo_servicio',
+}
+
+
+def _cargar():
+    from .models import Cliente, Proyecto, TipoServicio
+
+    return {
+        'cliente': dict(Cliente.objects.values_list('id', 'nombre')),
+        'proyecto': dict(Proyecto.objects.values_list('id', 'nombre')),
+        'tipo_servicio': dict(TipoServicio.objects.values_list('id', 'nombre')),
+    }
+
+
+def invalidar():
+    transaction.on_commit(CACHE.invalidar)
+
+
+class CatalogNames:
+    """
+    Mapas id -> nombre de los catálogos, cargados una vez por petición
+
+    Uso:
+        nombres = CatalogNames()
+        nombres.cliente('3')   # 'Banco X' (o '3' si no existe)
+    """
+
+    def __init__(self, mapas=None):
+        self.mapas = mapas if mapas is not None else CACHE.get_or_set('nombres', calcular=_cargar)
+
+    def nombre(self, catalogo, valor):
+        """Nombre del ID; si el valor no es un ID conocido se devuelve tal cual"""
+        if valor is None:
+            return valor
+        texto = str(valor).strip()
+        if texto.isdigit():
+            return self.mapas[catalogo].get(int(texto), valor)
+        return valor
+
+    def cliente(self, valor):
+        return self.nombre('cliente', valor)
+
+    def proyecto(self, valor):
+        return self.nombre('proyecto', valor)
+
+    def tipo_servicio(self, valor):
+        return self.nombre('tipo_servicio', valor)
+
+    def anotar(self, objetos):
+        """Agrega cliente_nombre, proyecto_nombre y tipo_pruebas_nombre a objetos ExcelData"""
+        for obj in objetos:
+            for campo, catalogo in CAMPOS_EXCEL_DATA.items():
+                setattr(obj, f'{campo}_nombre', self.nombre(catalogo, getattr(obj, campo)))
+        return objetos
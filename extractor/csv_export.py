@@ -0,0 +1,201 @@
+# extractor/csv_export.py
+"""
+Exportaciones CSV (y ZIP de varios CSV) en streaming.
+
+Las filas se leen con values_list().iterator(chunk_size=...) y se codifican
+a CSV con un generador, así que ni la tabla ni el archivo completo quedan en
+memoria: el primer bloque sale al cliente en cuanto se lee el primer lote.
+
+Las respuestas calculan ese primer bloque antes de devolverse, así que la
+primera consulta corre todavía dentro de la vista y sus errores llegan a su
+try/except. Un error posterior ya no puede cambiar la respuesta: se registra
+en el log y la descarga se corta.
+"""
+import csv
+import logging
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CHUNK_SIZE = 2000
+TAMANO_BLOQUE = 64 * 1024  # Bytes aproximados por bloque enviado al cliente
+FORMATO_FECHA_HORA = '%Y-%m-%d %H:%M:%S'
+
+logger = logging.getLogger(__name__)
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de guardarla"""
+
+    def write(self, valor):
+        return valor
+
+
+def iterar(queryset, *campos, chunk_size=CHUNK_SIZE):
+    """Tuplas con solo los campos pedidos, leídas por lotes"""
+    return queryset.values_list(*campos).iterator(chunk_size=chunk_size)
+
+
+def formatear(valor, formato_fecha=FORMATO_FECHA_HORA):
+    """Valor de celda: '' para None, fechas con formato, resto como texto"""
+    if valor is None:
+        return ''
+    if hasattr(valor, 'strftime'):
+        return valor.strftime(formato_fecha)
+    return valor
+
+
+def lineas_csv(encabezados, filas, bom=True):
+    """
+    Genera el CSV por bloques de texto
+
+    Args:
+        encabezados: lista con la fila de encabezados
+        filas: iterable de filas (listas o tuplas)
+        bom: antepone el BOM UTF-8 para que Excel detecte la codificación
+    """
+    writer = csv.writer(_Eco())
+    bloque = ['\ufeff'] if bom else []
+    bloque.append(writer.writerow(encabezados))
+    tamano = 0
+    for fila in filas:
+        linea = writer.writerow(fila)
+        bloque.append(linea)
+        tamano += len(linea)
+        if tamano >= TAMANO_BLOQUE:
+            yield ''.join(bloque)
+            bloque, tamano = [], 0
+    if bloque:
+        yield ''.join(bloque)
+
+
+def nombre_archivo(nombre_base, extension='csv'):
+    return f"{nombre_base}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+
+def transmitir(bloques, nombre):
+    """
+    Calcula ya el primer bloque (las excepciones salen aquí, en la vista) y
+    devuelve un iterador con todos; los errores del resto se registran
+    """
+    bloques = iter(bloques)
+    primero = next(bloques, None)
+
+    def todos():
+        try:
+            if primero is not None:
+                yield primero
+            yield from bloques
+        except Exception:
+            logger.exception(f"Error generando {nombre}; la descarga quedó incompleta")
+            raise
+        finally:
+            cerrar = getattr(bloques, 'close', None)
+            if cerrar:
+                cerrar()
+
+    return todos()
+
+
+def respuesta_csv(nombre_base, encabezados, filas):
+    """StreamingHttpResponse con el CSV de las filas como adjunto"""
+    response = StreamingHttpResponse(
+        transmitir(lineas_csv(encabezados, filas), nombre_base),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo(nombre_base)}"'
+    return response
+
+
+def campos_tabla(model):
+    """(encabezados, columnas) de todos los campos concretos; las FK exportan su id"""
+    campos = model._meta.concrete_fields
+    return [campo.name for campo in campos], [campo.attname for campo in campos]
+
+
+def filas_tabla(model, chunk_size=CHUNK_SIZE):
+    """Filas de una tabla completa con el formato de los respaldos"""
+    _, columnas = campos_tabla(model)
+    for fila in iterar(model.objects.order_by('pk'), *columnas, chunk_size=chunk_size):
+        yield [formatear(valor) for valor in fila]
+
+
+# ========== ZIP ==========
+
+class _SalidaZip:
+    """
+    Destino sin seek para zipfile: acumula lo escrito hasta que el generador
+    lo entrega al cliente. zipfile usa descriptores de datos al no poder
+    volver atrás, así que no necesita conocer los tamaños por adelantado.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def zip_archivos(archivos):
+    """
+    Genera un ZIP bloque a bloque
+
+    Args:
+        archivos: iterable de (nombre, bloques) donde bloques es un iterable
+            de bytes con el contenido del archivo
+    """
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for nombre, bloques in archivos:
+            with zip_file.open(nombre, 'w', force_zip64=True) as destino:
+                for bloque in bloques:
+                    destino.write(bloque)
+                    datos = salida.vaciar()
+                    if datos:
+                        yield datos
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+    yield salida.vaciar()
+
+
+def zip_csv(archivos):
+    """
+    Genera un ZIP con un CSV por entrada, bloque a bloque
+
+    Args:
+        archivos: iterable de (nombre_csv, encabezados, filas)
+    """
+    return zip_archivos(
+        (nombre, (bloque.encode('utf-8') for bloque in lineas_csv(encabezados, filas)))
+        for nombre, encabezados, filas in archivos
+    )
+
+
+def respuesta_zip(nombre_base, archivos):
+    """StreamingHttpResponse con un ZIP de (nombre, bloques) como adjunto"""
+    response = StreamingHttpResponse(transmitir(zip_archivos(archivos), nombre_base), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo(nombre_base, "zip")}"'
+    return response
+
+
+def respuesta_zip_csv(nombre_base, archivos):
+    """StreamingHttpResponse con un ZIP de CSVs como adjunto"""
+    response = StreamingHttpResponse(transmitir(zip_csv(archivos), nombre_base), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo(nombre_base, "zip")}"'
+    return response
@@ -2,14 +2,106 @@
 from jira import JIRA
 from django.conf import settings
 import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# Outbox de Jira: reintentos con espera exponencial
+OUTBOX_BACKOFF_BASE = 30  # segundos
+OUTBOX_BACKOFF_MAX = 3600  # segundos
+OUTBOX_LEASE_SECONDS = 300
+
+# Tiempo máximo de cada llamada HTTP a Jira (segundos); acota lo que tarda
+# una operación del outbox frente a su lease
+JIRA_TIMEOUT_SECONDS = 30
+
+# Pool de clientes Jira: TTLs en segundos
+JIRA_HEALTH_CHECK_TTL = 300
+JIRA_METADATA_TTL = 3600
+
+# Cierre masivo de incidencias
+BULK_CLOSE_MAX_WORKERS = 8
+BULK_SEARCH_CHUNK = 100
+
+_jira_client = None
+_jira_client_lock = threading.Lock()
+
+
+class TTLCache:
+    """Caché en memoria con expiración por entrada, segura entre hilos"""
+    
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, loader):
+        """Devuelve el valor en caché o lo carga con loader() si expiró"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        
+        value = loader()
+        with self._lock:
+            self._data[key] = (now + self.ttl, value)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def get_jira_client():
+    """
+    Devuelve el JiraClient compartido por el proceso. Reutiliza la sesión
+    HTTP (keep-alive) y las cachés de metadatos entre peticiones.
+    """
+    global _jira_client
+    if _jira_client is None:
+        with _jira_client_lock:
+            if _jira_client is None:
+                _jira_client = JiraClient()
+    return _jira_client
+
+
 class JiraClient:
     def __init__(self):
-        self.jira = None
-        self.connect()
+        self._jira = None
+        self._last_health_check = 0
+        self._connect_lock = threading.Lock()
+        self._metadata_cache = TTLCache(JIRA_METADATA_TTL)
+        self._transitions_cache = TTLCache(JIRA_METADATA_TTL)
+    
+    @property
+    def jira(self):
+        """
+        Conexión perezosa: se conecta en el primer uso y verifica la conexión
+        como máximo una vez cada JIRA_HEALTH_CHECK_TTL segundos.
+        """
+        if self._jira is None:
+            with self._connect_lock:
+                if self._jira is None:
+                    self.connect()
+        elif time.monotonic() - self._last_health_check > JIRA_HEALTH_CHECK_TTL:
+            self.health_check()
+        return self._jira
+    
+    def health_check(self):
+        """Verifica la conexión existente y reconecta si falló"""
+        try:
+            self._jira.server_info()
+            self._last_health_check = time.monotonic()
+        except Exception as e:
+            logger.warning(f"⚠️ Falló la verificación de Jira, reconectando: {e}")
+            with self._connect_lock:
+                self.connect()
     
     def connect(self):
         """Conecta con Jira usando las credenciales"""
@@ -18,7 +110,7 @@ class JiraClient:
             if not hasattr(settings, 'JIRA_CONFIG'):
                 logger.error("❌ JIRA_CONFIG no está definido en settings.py")
                 print("❌ JIRA_CONFIG no está definido en settings.py")
-                self.jira = None
+                self._jira = None
                 return
             
             config = settings.JIRA_CONFIG
@@ -31,7 +123,7 @@ class JiraClient:
                 error_msg = f"Faltan configuraciones en JIRA_CONFIG: {', '.join(missing)}"
                 logger.error(error_msg)
                 print(f"❌ {error_msg}")
-                self.jira = None
+                self._jira = None
                 return
             
             options = {
@@ -41,22 +133,61 @@ class JiraClient:
             
             print(f"🔄 Conectando a Jira: {config['URL']}")
             print(f"📋 Proyecto: {config['PROJECT_KEY']}")
-            print(f"📧 Email: {config['EMAIL']}")
             
-            self.jira = JIRA(
+            # El constructor consulta serverInfo, que sirve como prueba de conexión
+            self._jira = JIRA(
                 options,
-                basic_auth=(config['EMAIL'], config['API_TOKEN'])
+                basic_auth=(config['EMAIL'], config['API_TOKEN']),
+                timeout=JIRA_TIMEOUT_SECONDS
             )
+            self._last_health_check = time.monotonic()
+            self._metadata_cache.clear()
+            self._transitions_cache.clear()
             
-            # Probar la conexión
-            projects = self.jira.projects()
-            print(f"✅ Conectado a Jira exitosamente. Proyectos disponibles: {len(projects)}")
+            print("✅ Conectado a Jira exitosamente")
             logger.info("✅ Conectado a Jira exitosamente")
             
         except Exception as e:
             logger.error(f"❌ Error conectando a Jira: {e}")
             print(f"❌ Error conectando a Jira: {e}")
-            self.jira = None
+            self._jira = None
+    
+    def get_project_keys(self):
+        """Claves de proyectos visibles (caché con TTL)"""
+        return self._metadata_cache.get(
+            'projects',
+            lambda: [project.key for project in self.jira.projects()]
+        )
+    
+    def get_issue_types(self, project_key):
+        """Nombres de tipos de incidencia de un proyecto (caché con TTL)"""
+        return self._metadata_cache.get(
+            ('issue_types', project_key),
+            lambda: [issue_type.name for issue_type in self.jira.project(project_key).issueTypes]
+        )
+    
+    def get_transitions(self, issue):
+        """
+        Transiciones disponibles para una incidencia. Dependen del flujo de
+        trabajo (proyecto + tipo) y del estado actual, así que se cachean por
+        esa combinación en lugar de consultarse por cada incidencia.
+        """
+        key = (
+            issue.fields.project.key,
+            issue.fields.issuetype.name,
+            issue.fields.status.name,
+        )
+        return self._transitions_cache.get(
+            key,
+            lambda: [
+                {
+                    'id': transition['id'],
+                    'name': transition['name'],
+                    'to': (transition.get('to') or {}).get('name', ''),
+                }
+                for transition in self.jira.transitions(issue)
+            ]
+        )
     
     def create_issue(self, ticket_data):
         """
@@ -106,7 +237,7 @@ h3. Descripción de Cambios
                 'summary': summary[:255],  # Jira limita a 255 caracteres
                 'description': description.strip(),
                 'priority': {'name': 'Medium'},
-                'labels': ['qa-automation', 'excel-upload', ticket_data['tipo_servicio']],
+                'labels': ['qa-automation', 'excel-upload', ticket_data['tipo_servicio'], etiqueta_ticket(ticket_data['codigo'])],
             }
             
             print(f"🔄 Creando incidencia en Jira...")
@@ -128,7 +259,114 @@ h3. Descripción de Cambios
             print(f"❌ Error creando incidencia en Jira: {e}")
             return None
     
-    # 👇 AGREGAR ESTE NUEVO MÉTODO 👇
+    def find_issue_by_label(self, etiqueta):
+        """
+        Incidencia del proyecto que ya tiene la etiqueta o None. Los errores
+        se propagan: si no se puede comprobar, no se debe volver a crear.
+        """
+        config = settings.JIRA_CONFIG
+        issues = self.jira.search_issues(
+            f'project = "{config["PROJECT_KEY"]}" AND labels = "{etiqueta}"',
+            fields='summary',
+            maxResults=1
+        )
+        return issues[0] if issues else None
+    
+    def _select_close_transition(self, transitions):
+        """
+        Elige la transición para finalizar una incidencia
+        
+        Returns:
+            tuple: (transition_id, transition_name) o (None, None)
+        """
+        # 1. Buscar por estado destino "Finalizada" (case-insensitive)
+        for transition in transitions:
+            if transition['to']:
+                if transition['to'].lower() == "finalizada":
+                    logger.info(f"✅ Transición a Finalizada encontrada: '{transition['name']}' (ID: {transition['id']})")
+                    return transition['id'], transition['name']
+        
+        # 2. Si no encontró, buscar por nombre de transición con keywords
+        keywords = ['finalizada', 'finalizar', 'listo', 'ready', 'complete', 
+                'cerrar', 'close', 'done', 'terminar', 'finish']
+        for transition in transitions:
+            name_lower = transition['name'].lower()
+            for keyword in keywords:
+                if keyword in name_lower:
+                    logger.info(f"✅ Transición encontrada por keyword '{keyword}': '{transition['name']}'")
+                    return transition['id'], transition['name']
+        
+        # 3. FALLBACK: Usar la primera transición disponible
+        if transitions:
+            logger.warning(f"⚠️ Usando primera transición disponible: '{transitions[0]['name']}' (ID: {transitions[0]['id']})")
+            return transitions[0]['id'], transitions[0]['name']
+        
+        return None, None
+    
+    def _close_comment(self, resolution):
+        comment = f"Incidencia finalizada automáticamente desde el sistema QA.\n"
+        comment += f"Estado del ticket: {'COMPLETADO' if resolution == 'Done' else 'NO EXITOSO'}\n"
+        comment += f"Fecha: {timezone.now().strftime('%d/%m/%Y %H:%M:%S')}"
+        return comment
+    
+    def _execute_close_transition(self, issue_key, transition_id, transition_name, resolution, comment):
+        """
+        Ejecuta la transición de cierre enviando el comentario en la misma
+        petición. Si la pantalla de la transición no acepta comentario, se
+        agrega por separado; si exige resolución, se reintenta con ella.
+        """
+        try:
+            try:
+                self.jira.transition_issue(issue_key, transition_id, comment=comment)
+            except Exception as e:
+                if 'comment' not in str(e).lower():
+                    raise
+                self.jira.transition_issue(issue_key, transition_id)
+                try:
+                    self.jira.add_comment(issue_key, comment)
+                except Exception as e_comment:
+                    logger.warning(f"No se pudo agregar comentario: {e_comment}")
+            
+            return {
+                'success': True,
+                'issue_key': issue_key,
+                'message': f'Incidencia {issue_key} finalizada exitosamente',
+                'transition_used': transition_name
+            }
+            
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error al ejecutar transición: {error_msg}")
+            
+            # Intentar con resolución si es necesario
+            if 'resolution' in error_msg.lower():
+                try:
+                    self.jira.transition_issue(
+                        issue_key, 
+                        transition_id,
+                        fields={'resolution': {'name': resolution}},
+                        comment=comment
+                    )
+                    logger.info(f"✅ Incidencia {issue_key} finalizada con resolución {resolution}")
+                    return {
+                        'success': True,
+                        'issue_key': issue_key,
+                        'message': f'Incidencia {issue_key} finalizada exitosamente',
+                        'transition_used': transition_name
+                    }
+                except Exception as e2:
+                    return {
+                        'success': False,
+                        'issue_key': issue_key,
+                        'warning': f'Error al finalizar con resolución: {str(e2)}'
+                    }
+            else:
+                return {
+                    'success': False,
+                    'issue_key': issue_key,
+                    'warning': f'Error al finalizar: {error_msg}'
+                }
+    
     def close_issue(self, issue_key, resolution='Done'):
         """
         Cierra una incidencia en Jira cambiando el estado a Finalizada
@@ -142,7 +380,7 @@ h3. Descripción de Cambios
         
         try:
             # Obtener la incidencia
-            issue = self.jira.issue(issue_key)
+            issue = self.jira.issue(issue_key, fields='status,project,issuetype')
             current_status = issue.fields.status.name
             logger.info(f"🔍 Incidencia {issue_key} - Estado actual: {current_status}")
             
@@ -155,8 +393,8 @@ h3. Descripción de Cambios
                     'message': f'Incidencia {issue_key} ya estaba finalizada'
                 }
             
-            # Obtener transiciones disponibles
-            transitions = self.jira.transitions(issue)
+            # Obtener transiciones disponibles (caché por flujo de trabajo y estado)
+            transitions = self.get_transitions(issue)
             
             if not transitions:
                 logger.warning(f"No hay transiciones disponibles para {issue_key}")
@@ -166,38 +404,7 @@ h3. Descripción de Cambios
                 }
             
             # 🔍 Buscar la transición a FINALIZADA
-            close_transition_id = None
-            transition_name = None
-            
-            # 1. Buscar por estado destino "Finalizada" (case-insensitive)
-            for transition in transitions:
-                if hasattr(transition, 'to') and transition.to:
-                    if transition.to.name.lower() == "finalizada":
-                        close_transition_id = transition['id']
-                        transition_name = transition['name']
-                        logger.info(f"✅ Transición a Finalizada encontrada: '{transition_name}' (ID: {close_transition_id})")
-                        break
-            
-            # 2. Si no encontró, buscar por nombre de transición con keywords
-            if not close_transition_id:
-                keywords = ['finalizada', 'finalizar', 'listo', 'ready', 'complete', 
-                        'cerrar', 'close', 'done', 'terminar', 'finish']
-                for transition in transitions:
-                    name_lower = transition['name'].lower()
-                    for keyword in keywords:
-                        if keyword in name_lower:
-                            close_transition_id = transition['id']
-                            transition_name = transition['name']
-                            logger.info(f"✅ Transición encontrada por keyword '{keyword}': '{transition_name}'")
-                            break
-                    if close_transition_id:
-                        break
-            
-            # 3. FALLBACK: Usar la primera transición disponible
-            if not close_transition_id and transitions:
-                close_transition_id = transitions[0]['id']
-                transition_name = transitions[0]['name']
-                logger.warning(f"⚠️ Usando primera transición disponible: '{transition_name}' (ID: {close_transition_id})")
+            close_transition_id, transition_name = self._select_close_transition(transitions)
             
             if not close_transition_id:
                 logger.error(f"❌ No se encontró ninguna transición para {issue_key}")
@@ -207,55 +414,12 @@ h3. Descripción de Cambios
                 }
             
             # Ejecutar la transición
-            try:
-                self.jira.transition_issue(issue_key, close_transition_id)
-                
-                # Agregar comentario de cierre
-                try:
-                    comment = f"Incidencia finalizada automáticamente desde el sistema QA.\n"
-                    comment += f"Estado del ticket: {'COMPLETADO' if resolution == 'Done' else 'NO EXITOSO'}\n"
-                    comment += f"Fecha: {timezone.now().strftime('%d/%m/%Y %H:%M:%S')}"
-                    self.jira.add_comment(issue_key, comment)
-                except Exception as e:
-                    logger.warning(f"No se pudo agregar comentario: {e}")
-                
+            result = self._execute_close_transition(
+                issue_key, close_transition_id, transition_name, resolution, self._close_comment(resolution)
+            )
+            if result['success']:
                 logger.info(f"✅ Incidencia {issue_key} cambiada de '{current_status}' a 'Finalizada'")
-                
-                return {
-                    'success': True,
-                    'issue_key': issue_key,
-                    'message': f'Incidencia {issue_key} finalizada exitosamente',
-                    'transition_used': transition_name
-                }
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"Error al ejecutar transición: {error_msg}")
-                
-                # Intentar con resolución si es necesario
-                if 'resolution' in error_msg.lower():
-                    try:
-                        self.jira.transition_issue(
-                            issue_key, 
-                            close_transition_id,
-                            fields={'resolution': {'name': resolution}}
-                        )
-                        logger.info(f"✅ Incidencia {issue_key} finalizada con resolución {resolution}")
-                        return {
-                            'success': True,
-                            'issue_key': issue_key,
-                            'message': f'Incidencia {issue_key} finalizada exitosamente'
-                        }
-                    except Exception as e2:
-                        return {
-                            'success': False,
-                            'warning': f'Error al finalizar con resolución: {str(e2)}'
-                        }
-                else:
-                    return {
-                        'success': False,
-                        'warning': f'Error al finalizar: {error_msg}'
-                    }
+            return result
                 
         except Exception as e:
             error_msg = f"Error al procesar incidencia {issue_key}: {str(e)}"
@@ -264,6 +428,149 @@ h3. Descripción de Cambios
                 'success': False,
                 'warning': error_msg
             }
+    
+    def close_issues_bulk(self, issue_keys, resolution='Done', max_workers=BULK_CLOSE_MAX_WORKERS):
+        """
+        Cierra muchas incidencias a la vez. Las incidencias se consultan con
+        una búsqueda JQL por bloques, se agrupan por flujo de trabajo
+        (proyecto, tipo, estado) para resolver la transición una sola vez por
+        grupo, y las transiciones (con su comentario) se ejecutan en paralelo
+        con un número acotado de hilos.
+        
+        Returns:
+            dict: {issue_key: resultado como en close_issue}
+        """
+        results = {}
+        issue_keys = list(dict.fromkeys(key for key in issue_keys if key))
+        if not issue_keys:
+            return results
+        
+        if not self.jira:
+            logger.error("No hay conexión a Jira")
+            return {
+                key: {'success': False, 'issue_key': key, 'warning': 'No hay conexión a Jira'}
+                for key in issue_keys
+            }
+        
+        # 1. Consultar las incidencias por bloques ({clave pedida: incidencia})
+        issues = {}
+        for start in range(0, len(issue_keys), BULK_SEARCH_CHUNK):
+            chunk = issue_keys[start:start + BULK_SEARCH_CHUNK]
+            pedidas = set(chunk)
+            try:
+                # Sin validar la JQL, una clave inexistente no invalida todo el bloque
+                for issue in self.jira.search_issues(
+                    f"key in ({', '.join(chunk)})",
+                    fields='status,project,issuetype',
+                    maxResults=len(chunk),
+                    validate_query=False
+                ):
+                    # Una incidencia movida vuelve con su clave nueva; se resuelve abajo por la pedida
+                    if issue.key in pedidas:
+                        issues[issue.key] = issue
+            except Exception as e:
+                logger.warning(f"⚠️ Falló la búsqueda de un bloque de {len(chunk)} incidencias, se consultan una a una: {e}")
+            
+            # Las que la búsqueda no devolvió (movidas, borradas o bloque fallido) se consultan por separado
+            for key in chunk:
+                if key in issues:
+                    continue
+                try:
+                    issues[key] = self.jira.issue(key, fields='status,project,issuetype')
+                except Exception as e:
+                    results[key] = {
+                        'success': False,
+                        'issue_key': key,
+                        'warning': f'No se encontró {key} en Jira: {str(e)}'
+                    }
+        
+        # 2. Agrupar por flujo de trabajo y resolver la transición una vez por grupo
+        groups = {}
+        for key, issue in issues.items():
+            if issue.fields.status.name == "FINALIZADA":
+                results[key] = {
+                    'success': True,
+                    'issue_key': key,
+                    'message': f'Incidencia {key} ya estaba finalizada'
+                }
+                continue
+            group_key = (issue.fields.project.key, issue.fields.issuetype.name, issue.fields.status.name)
+            groups.setdefault(group_key, []).append((key, issue))
+        
+        comment = self._close_comment(resolution)
+        pending = []
+        for group_key, group_issues in groups.items():
+            try:
+                transitions = self.get_transitions(group_issues[0][1])
+            except Exception as e:
+                transitions = []
+                logger.error(f"❌ Error obteniendo transiciones para {group_key}: {e}")
+            
+            transition_id, transition_name = self._select_close_transition(transitions)
+            for key, issue in group_issues:
+                if not transition_id:
+                    results[key] = {
+                        'success': False,
+                        'issue_key': key,
+                        'warning': f'No se encontró transición para finalizar {key}'
+                    }
+                else:
+                    pending.append((key, transition_id, transition_name))
+        
+        # 3. Ejecutar las transiciones en paralelo
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending) or 1))) as executor:
+            futures = {
+                executor.submit(
+                    self._execute_close_transition, key, transition_id, transition_name, resolution, comment
+                ): key
+                for key, transition_id, transition_name in pending
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        cerradas = sum(1 for result in results.values() if result['success'])
+        logger.info(f"✅ Cierre masivo en Jira: {cerradas}/{len(issue_keys)} incidencias finalizadas")
+        return results
+
+def etiqueta_ticket(codigo):
+    """Etiqueta única del ticket en Jira; permite encontrar su incidencia al reintentar"""
+    return 'ticket-' + re.sub(r'\s+', '_', codigo.strip())
+
+
+def build_jira_issue_data(ticket_obj, jira_data, request=None):
+    """
+    Construye el diccionario que espera JiraClient.create_issue a partir del
+    ticket y de los datos de la solicitud (solo cadenas, serializable a JSON)
+    """
+    # Extraer nombres de cliente y proyecto
+    if 'cliente_obj' in jira_data and jira_data['cliente_obj']:
+        cliente_nombre = jira_data['cliente_obj'].nombre
+    else:
+        cliente_nombre = jira_data.get('cliente_nombre', '')
+    
+    if 'proyecto_obj' in jira_data and jira_data['proyecto_obj']:
+        proyecto_nombre = jira_data['proyecto_obj'].nombre
+    else:
+        proyecto_nombre = jira_data.get('proyecto_nombre', '')
+    
+    tipo_servicio = jira_data.get('tipo_servicio', 'PRU')
+    
+    # Preparar datos para Jira (siguiendo el mismo formato que _create_jira_issue)
+    return {
+        'codigo': ticket_obj.codigo[:50],
+        'cliente': cliente_nombre[:100],
+        'proyecto': proyecto_nombre[:100],
+        'tipo_servicio': tipo_servicio[:50],
+        'responsable_solicitud': jira_data.get('responsable_solicitud', '')[:100],
+        'lider_proyecto': jira_data.get('lider_proyecto', '')[:100],
+        'numero_version': jira_data.get('numero_version', '')[:50],
+        'funcionalidad_liberacion': jira_data.get('funcionalidad_liberacion', '')[:500],
+        'detalle_cambios': jira_data.get('detalle_cambios', '')[:1000],
+        'justificacion_cambio': jira_data.get('justificacion_cambio', '')[:500],
+        'fecha': timezone.now().strftime('%d/%m/%Y %H:%M'),
+        'usuario': request.user.username[:50] if request and request.user.is_authenticated else 'Sistema',
+    }
+
 
 def create_jira_issue_from_ticket(ticket_obj, jira_data, request=None):
     """
@@ -287,37 +594,10 @@ def create_jira_issue_from_ticket(ticket_obj, jira_data, request=None):
         tuple: (success, message, jira_issue)
     """
     try:
-        # Extraer nombres de cliente y proyecto
-        if 'cliente_obj' in jira_data and jira_data['cliente_obj']:
-            cliente_nombre = jira_data['cliente_obj'].nombre
-        else:
-            cliente_nombre = jira_data.get('cliente_nombre', '')
-        
-        if 'proyecto_obj' in jira_data and jira_data['proyecto_obj']:
-            proyecto_nombre = jira_data['proyecto_obj'].nombre
-        else:
-            proyecto_nombre = jira_data.get('proyecto_nombre', '')
-        
-        tipo_servicio = jira_data.get('tipo_servicio', 'PRU')
-        
-        # Preparar datos para Jira (siguiendo el mismo formato que _create_jira_issue)
-        jira_issue_data = {
-            'codigo': ticket_obj.codigo[:50],
-            'cliente': cliente_nombre[:100],
-            'proyecto': proyecto_nombre[:100],
-            'tipo_servicio': tipo_servicio[:50],
-            'responsable_solicitud': jira_data.get('responsable_solicitud', '')[:100],
-            'lider_proyecto': jira_data.get('lider_proyecto', '')[:100],
-            'numero_version': jira_data.get('numero_version', '')[:50],
-            'funcionalidad_liberacion': jira_data.get('funcionalidad_liberacion', '')[:500],
-            'detalle_cambios': jira_data.get('detalle_cambios', '')[:1000],
-            'justificacion_cambio': jira_data.get('justificacion_cambio', '')[:500],
-            'fecha': timezone.now().strftime('%d/%m/%Y %H:%M'),
-            'usuario': request.user.username[:50] if request and request.user.is_authenticated else 'Sistema',
-        }
+        jira_issue_data = build_jira_issue_data(ticket_obj, jira_data, request)
         
         # Crear cliente de Jira y el issue
-        jira_client = JiraClient()
+        jira_client = get_jira_client()
         jira_issue = jira_client.create_issue(jira_issue_data)
         
         if jira_issue:
@@ -335,4 +615,155 @@ def create_jira_issue_from_ticket(ticket_obj, jira_data, request=None):
             
     except Exception as e:
         logger.error(f"❌ Error creando Jira issue para ticket {ticket_obj.codigo}: {str(e)}")
-        return False, f'Error al crear incidencia en Jira: {str(e)}', None
\ No newline at end of file
+        return False, f'Error al crear incidencia en Jira: {str(e)}', None
+
+
+def enqueue_jira_issue_from_ticket(ticket_obj, jira_data, request=None):
+    """
+    Registra la creación de la incidencia en el outbox de Jira en lugar de
+    llamar a Jira dentro de la petición HTTP. Debe ejecutarse dentro de la
+    misma transacción que crea el Ticket.
+    
+    Returns:
+        JiraOutbox: operación pendiente
+    """
+    from extractor.models import JiraOutbox
+    
+    return JiraOutbox.objects.create(
+        ticket=ticket_obj,
+        operacion='CREATE_ISSUE',
+        payload=build_jira_issue_data(ticket_obj, jira_data, request),
+    )
+
+
+def _backoff_seconds(intentos):
+    """Espera exponencial entre reintentos: 30s, 60s, 120s... hasta 1h"""
+    return min(OUTBOX_BACKOFF_BASE * (2 ** max(intentos - 1, 0)), OUTBOX_BACKOFF_MAX)
+
+
+def _claim_outbox_batch(batch_size):
+    """
+    Toma un lote de operaciones vencidas y las marca como PROCESANDO con un
+    lease, de modo que dos workers no procesen la misma operación. Las que
+    quedaron en PROCESANDO por un worker caído se retoman al vencer el lease.
+    """
+    from django.db import transaction
+    from extractor.models import JiraOutbox
+    
+    now = timezone.now()
+    with transaction.atomic():
+        items = list(
+            JiraOutbox.objects.select_for_update(skip_locked=True)
+            .filter(estado__in=['PENDIENTE', 'PROCESANDO'], proximo_intento__lte=now)
+            .order_by('proximo_intento', 'id')[:batch_size]
+        )
+        if items:
+            JiraOutbox.objects.filter(pk__in=[item.pk for item in items]).update(
+                estado='PROCESANDO',
+                proximo_intento=now + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+            )
+    return items
+
+
+def _renovar_lease(pks):
+    """Extiende el lease de las operaciones del lote que aún no se procesaron"""
+    from extractor.models import JiraOutbox
+    
+    JiraOutbox.objects.filter(pk__in=pks, estado='PROCESANDO').update(
+        proximo_intento=timezone.now() + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+    )
+
+
+def _crear_incidencia(item, jira_client, reintento):
+    """
+    Crea la incidencia de una operación CREATE_ISSUE sin duplicarla
+
+    Si el ticket ya tiene incidencia no se llama a Jira. En un reintento (o
+    al retomar un lease vencido) Jira pudo haberla creado sin que se guardara
+    la respuesta, así que antes se busca por la etiqueta del ticket.
+
+    Returns:
+        str: mensaje de error o '' si el ticket quedó con su incidencia
+    """
+    from extractor.models import Ticket
+    
+    ticket = Ticket.objects.filter(pk=item.ticket_id).values('jira_issue_key').first()
+    if ticket is None:
+        return 'El ticket ya no existe'
+    if ticket['jira_issue_key']:
+        logger.info(f"ℹ️ Ticket {item.ticket_id} ya tiene la incidencia {ticket['jira_issue_key']}")
+        return ''
+    
+    jira_issue = None
+    if reintento:
+        jira_issue = jira_client.find_issue_by_label(etiqueta_ticket(item.payload['codigo']))
+        if jira_issue:
+            logger.info(f"ℹ️ Incidencia {jira_issue.key} ya existía para ticket {item.ticket_id}")
+    if jira_issue is None:
+        jira_issue = jira_client.create_issue(item.payload)
+    if not jira_issue:
+        return 'No se pudo crear la incidencia en Jira'
+    
+    Ticket.objects.filter(pk=item.ticket_id).update(
+        jira_issue_key=jira_issue.key,
+        jira_issue_url=jira_issue.permalink(),
+        fecha_sincronizacion_jira=timezone.now(),
+    )
+    return ''
+
+
+def process_jira_outbox(batch_size=20, jira_client=None):
+    """
+    Procesa un lote de operaciones pendientes del outbox de Jira.
+    
+    El lease de las operaciones que faltan se renueva antes de cada una, así
+    un lote lento no deja que otro worker las retome a medias.
+    
+    Returns:
+        dict: {'procesadas', 'completadas', 'reintentos', 'fallidas'}
+    """
+    stats = {'procesadas': 0, 'completadas': 0, 'reintentos': 0, 'fallidas': 0}
+    items = _claim_outbox_batch(batch_size)
+    if not items:
+        return stats
+    
+    if jira_client is None:
+        jira_client = get_jira_client()
+    
+    for indice, item in enumerate(items):
+        _renovar_lease([pendiente.pk for pendiente in items[indice:]])
+        
+        stats['procesadas'] += 1
+        # Ya se intentó antes, o un worker caído la dejó en PROCESANDO
+        reintento = item.intentos > 0 or item.estado == 'PROCESANDO'
+        item.intentos += 1
+        error = ''
+        
+        try:
+            if item.operacion == 'CREATE_ISSUE':
+                error = _crear_incidencia(item, jira_client, reintento)
+            else:
+                error = f'Operación no soportada: {item.operacion}'
+        except Exception as e:
+            error = str(e)
+        
+        if not error:
+            item.estado = 'COMPLETADO'
+            item.ultimo_error = ''
+            stats['completadas'] += 1
+            logger.info(f"✅ Outbox Jira {item.pk} completado para ticket {item.ticket_id}")
+        elif item.intentos >= item.max_intentos:
+            item.estado = 'FALLIDO'
+            item.ultimo_error = error[:2000]
+            stats['fallidas'] += 1
+            logger.error(f"❌ Outbox Jira {item.pk} falló definitivamente: {error}")
+        else:
+            item.estado = 'PENDIENTE'
+            item.ultimo_error = error[:2000]
+            item.proximo_intento = timezone.now() + timedelta(seconds=_backoff_seconds(item.intentos))
+            stats['reintentos'] += 1
+            logger.warning(f"⚠️ Outbox Jira {item.pk} se reintentará ({item.intentos}/{item.max_intentos}): {error}")
+        
+        item.save(update_fields=['estado', 'intentos', 'ultimo_error', 'proximo_intento', 'fecha_actualizacion'])
+    
+    return stats
@@ -0,0 +1,90 @@
+# extractor/management/commands/cerrar_issues_jira.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from extractor.jira_helper import BULK_CLOSE_MAX_WORKERS, get_jira_client
+from extractor.models import Ticket
+
+
+class Command(BaseCommand):
+    help = 'Finaliza en Jira, en lote, las incidencias de tickets COMPLETADO / NO EXITOSO'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estado',
+            choices=['COMPLETADO', 'NO EXITOSO'],
+            action='append',
+            help='Estado(s) de ticket a cerrar (default: COMPLETADO y NO EXITOSO)',
+        )
+        parser.add_argument(
+            '--desde',
+            help='Fecha de cierre inicial (AAAA-MM-DD)',
+        )
+        parser.add_argument(
+            '--hasta',
+            help='Fecha de cierre final (AAAA-MM-DD)',
+        )
+        parser.add_argument(
+            '--cliente',
+            type=int,
+            help='ID del cliente',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=BULK_CLOSE_MAX_WORKERS,
+            help=f'Transiciones concurrentes (default: {BULK_CLOSE_MAX_WORKERS})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo muestra las incidencias que se cerrarían',
+        )
+
+    def _parse_date(self, value, option):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Fecha inválida en {option}: {value} (formato AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        estados = options['estado'] or ['COMPLETADO', 'NO EXITOSO']
+
+        tickets = Ticket.objects.filter(estado__in=estados).exclude(jira_issue_key__isnull=True).exclude(jira_issue_key='')
+
+        if options['desde']:
+            tickets = tickets.filter(fecha_cierre__date__gte=self._parse_date(options['desde'], '--desde'))
+        if options['hasta']:
+            tickets = tickets.filter(fecha_cierre__date__lte=self._parse_date(options['hasta'], '--hasta'))
+        if options['cliente']:
+            tickets = tickets.filter(cliente_id=options['cliente'])
+
+        # La resolución depende del estado del ticket
+        por_resolucion = {'Done': [], 'Cannot Reproduce': []}
+        for estado, issue_key in tickets.values_list('estado', 'jira_issue_key'):
+            resolution = 'Done' if estado == 'COMPLETADO' else 'Cannot Reproduce'
+            por_resolucion[resolution].append(issue_key)
+
+        total = sum(len(keys) for keys in por_resolucion.values())
+        self.stdout.write(self.style.WARNING(f'🔍 {total} incidencias por finalizar en Jira'))
+
+        if options['dry_run']:
+            for resolution, keys in por_resolucion.items():
+                for key in keys:
+                    self.stdout.write(f"   - {key} ({resolution})")
+            return
+
+        jira_client = get_jira_client()
+        cerradas = 0
+        for resolution, keys in por_resolucion.items():
+            if not keys:
+                continue
+
+            results = jira_client.close_issues_bulk(keys, resolution=resolution, max_workers=options['workers'])
+            for key, result in results.items():
+                if result['success']:
+                    cerradas += 1
+                else:
+                    self.stdout.write(self.style.ERROR(f"   ❌ {key}: {result.get('warning', '')}"))
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {cerradas}/{total} incidencias finalizadas en Jira'))
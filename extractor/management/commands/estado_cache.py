@@ -0,0 +1,47 @@
+# extractor/management/commands/estado_cache.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from extractor import cache_utils
+
+
+class Command(BaseCommand):
+    help = 'Muestra el backend de caché y los aciertos/fallos de cada espacio de nombres'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--invalidar',
+            metavar='ESPACIO',
+            help='Invalida todas las claves del espacio indicado',
+        )
+        parser.add_argument(
+            '--reiniciar-contadores',
+            action='store_true',
+            help='Pone a cero los contadores de aciertos y fallos',
+        )
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"🗄️ Backend: {backend} ({settings.CACHE_BACKEND})")
+        if not settings.CACHE_CONTADORES:
+            self.stdout.write(self.style.WARNING('⚠️ Contadores desactivados (CACHE_CONTADORES=True para activarlos)'))
+
+        if options['invalidar']:
+            espacio = cache_utils.REGISTRO.get(options['invalidar'])
+            if espacio is None:
+                raise CommandError(
+                    f"Espacio desconocido: {options['invalidar']} "
+                    f"(disponibles: {', '.join(sorted(cache_utils.REGISTRO)) or 'ninguno'})"
+                )
+            version = espacio.invalidar()
+            self.stdout.write(self.style.SUCCESS(f'✅ {espacio.nombre} invalidado (versión {version})'))
+
+        for nombre in sorted(cache_utils.REGISTRO):
+            espacio = cache_utils.REGISTRO[nombre]
+            if options['reiniciar_contadores']:
+                espacio.reiniciar_contadores()
+            c = espacio.contadores()
+            self.stdout.write(
+                f"  {nombre}: {c['hits']} aciertos, {c['misses']} fallos "
+                f"(ratio {c['ratio']:.1%}), versión {c['version']}"
+            )
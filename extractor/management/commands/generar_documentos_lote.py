@@ -0,0 +1,77 @@
+# extractor/management/commands/generar_documentos_lote.py
+"""
+Versión por consola de la descarga de documentos en lote: sin tope de tickets
+ni timeout de gunicorn, y con un proceso por núcleo. Es la opción para los
+cierres de mes.
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.excel_processor.services import document_service
+from extractor import csv_export
+
+
+class Command(BaseCommand):
+    help = 'Genera en paralelo los dictámenes y documentos de resultados de un lote de tickets en un ZIP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cliente', type=int, help='ID del cliente')
+        parser.add_argument('--proyecto', type=int, help='ID del proyecto')
+        parser.add_argument('--mes', help='Mes de creación de los tickets (AAAA-MM)')
+        parser.add_argument('--desde', help='Fecha inicial de creación (AAAA-MM-DD)')
+        parser.add_argument('--hasta', help='Fecha final de creación (AAAA-MM-DD)')
+        parser.add_argument('--estado', help='Estado de los tickets')
+        parser.add_argument(
+            '--tipo',
+            choices=document_service.TIPOS_DOCUMENTO,
+            help='Generar solo un tipo de documento; por defecto ambos',
+        )
+        parser.add_argument(
+            '--salida',
+            help='Ruta del ZIP a escribir; por defecto documentos_tickets_<fecha>.zip',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tickets = list(document_service.tickets_para_documentos(
+                cliente_id=options['cliente'],
+                proyecto_id=options['proyecto'],
+                mes=options['mes'],
+                fecha_desde=options['desde'],
+                fecha_hasta=options['hasta'],
+                estado=options['estado'],
+            ))
+        except ValueError:
+            raise CommandError('El mes debe tener el formato AAAA-MM y las fechas AAAA-MM-DD')
+
+        if not tickets:
+            self.stdout.write(self.style.WARNING('⚠️ No hay tickets con esos filtros'))
+            return
+
+        tipos = (options['tipo'],) if options['tipo'] else document_service.TIPOS_DOCUMENTO
+        salida = options['salida'] or csv_export.nombre_archivo('documentos_tickets', 'zip')
+
+        self.stdout.write(self.style.WARNING(
+            f'🔄 Generando {", ".join(tipos)} de {len(tickets)} tickets...'
+        ))
+
+        tareas = document_service.tareas_lote(tickets, tipos)
+        resumen = {'documentos': 0, 'errores': ''}
+
+        def contar(archivos):
+            for nombre, bloques in archivos:
+                if nombre == 'errores.txt':
+                    resumen['errores'] = b''.join(bloques).decode('utf-8')
+                else:
+                    resumen['documentos'] += 1
+                yield nombre, bloques
+
+        with open(salida, 'wb') as archivo:
+            for bloque in csv_export.zip_archivos(contar(document_service.archivos_zip(tareas, os.cpu_count() or 1))):
+                archivo.write(bloque)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {resumen['documentos']} documentos guardados en {salida}"))
+        if resumen['errores']:
+            self.stdout.write(self.style.WARNING('⚠️ Documentos con error:'))
+            self.stdout.write(resumen['errores'])
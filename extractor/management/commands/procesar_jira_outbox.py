@@ -0,0 +1,63 @@
+# extractor/management/commands/procesar_jira_outbox.py
+"""
+Consumidor del outbox de Jira: las vistas solo registran la operación y este
+comando crea las incidencias. Debe estar siempre corriendo en producción:
+proceso `worker` del Procfile, o en segundo plano en el start de nixpacks.toml.
+Con --once sirve para ejecutarlo desde cron.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from extractor.jira_helper import process_jira_outbox
+
+
+class Command(BaseCommand):
+    help = 'Procesa las operaciones pendientes del outbox de Jira con reintentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa las operaciones vencidas y termina (útil para cron)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Operaciones a tomar por lote (default: 20)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Segundos de espera cuando no hay operaciones pendientes (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        once = options['once']
+        batch_size = options['batch_size']
+        sleep = options['sleep']
+
+        self.stdout.write(self.style.WARNING('🔄 Procesando outbox de Jira...'))
+
+        try:
+            while True:
+                stats = process_jira_outbox(batch_size=batch_size)
+
+                if stats['procesadas']:
+                    self.stdout.write(
+                        f"📊 Procesadas: {stats['procesadas']} | "
+                        f"Completadas: {stats['completadas']} | "
+                        f"Reintentos: {stats['reintentos']} | "
+                        f"Fallidas: {stats['fallidas']}"
+                    )
+                    continue
+
+                if once:
+                    break
+
+                time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('✅ Outbox de Jira procesado'))
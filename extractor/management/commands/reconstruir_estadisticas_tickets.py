@@ -0,0 +1,35 @@
+# extractor/management/commands/reconstruir_estadisticas_tickets.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from extractor.ticket_stats import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la tabla de estadísticas diarias de tickets (TicketDailyStats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            help='Fecha inicial a reconstruir (AAAA-MM-DD); por defecto todo el histórico',
+        )
+        parser.add_argument(
+            '--hasta',
+            help='Fecha final a reconstruir (AAAA-MM-DD)',
+        )
+
+    def _parse_date(self, value, option):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Fecha inválida en {option}: {value} (formato AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        desde = self._parse_date(options['desde'], '--desde') if options['desde'] else None
+        hasta = self._parse_date(options['hasta'], '--hasta') if options['hasta'] else None
+
+        self.stdout.write(self.style.WARNING('🔄 Reconstruyendo estadísticas diarias de tickets...'))
+
+        filas = reconstruir(desde=desde, hasta=hasta)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Estadísticas reconstruidas: {filas} filas'))
@@ -0,0 +1,23 @@
+# extractor/management/commands/reconstruir_indice_busqueda.py
+from django.core.management.base import BaseCommand
+
+from extractor import search_index
+from extractor.models import ExcelData, IndiceBusqueda, Ticket
+
+
+class Command(BaseCommand):
+    help = 'Regenera el índice invertido de búsqueda (solo bases de datos distintas de Postgres)'
+
+    def handle(self, *args, **options):
+        if search_index.usa_postgres():
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Postgres mantiene la columna {search_index.COLUMNA} automáticamente '
+                f'(configuración {search_index.config_postgres()}); no hay nada que reconstruir'
+            ))
+            return
+
+        self.stdout.write(self.style.WARNING('🔄 Reconstruyendo índice de búsqueda...'))
+
+        creados = search_index.reconstruir({'ticket': Ticket, 'exceldata': ExcelData}, IndiceBusqueda)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Índice reconstruido: {creados} términos'))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0005_ticket_nombre_usuario_es_lider_pruebas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JiraOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operacion', models.CharField(choices=[('CREATE_ISSUE', 'Crear incidencia')], default='CREATE_ISSUE', max_length=20, verbose_name='Operación')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Datos de la operación')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('max_intentos', models.PositiveIntegerField(default=8, verbose_name='Máximo de intentos')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jira_outbox', to='extractor.ticket', verbose_name='Ticket')),
+            ],
+            options={
+                'verbose_name': 'Operación Jira pendiente',
+                'verbose_name_plural': 'Operaciones Jira pendientes',
+                'ordering': ['proximo_intento', 'id'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='extractor_j_estado_7d0db4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def poblar_estadisticas(apps, schema_editor):
+    Ticket = apps.get_model('extractor', 'Ticket')
+    SolicitudPruebas = apps.get_model('extractor', 'SolicitudPruebas')
+    TicketDailyStats = apps.get_model('extractor', 'TicketDailyStats')
+
+    dimensiones = ('estado', 'cliente_id', 'proyecto_id', 'tipo_servicio_id', 'asignado_a_id', 'creado_por_id')
+    filas = [
+        TicketDailyStats(total=fila.pop('total'), **fila)
+        for fila in Ticket.objects.order_by().annotate(fecha=TruncDate('fecha_creacion'))
+        .values('fecha', *dimensiones).annotate(total=Count('id'))
+    ]
+    filas += [
+        TicketDailyStats(
+            fecha=fila['fecha_solicitud'],
+            estado='SIN_TICKET',
+            cliente_id=fila['cliente_id'],
+            proyecto_id=fila['proyecto_id'],
+            tipo_servicio_id=fila['tipo_prueba_id'],
+            total=fila['total'],
+        )
+        for fila in SolicitudPruebas.objects.order_by().filter(ticket__isnull=True)
+        .values('fecha_solicitud', 'cliente_id', 'proyecto_id', 'tipo_prueba_id').annotate(total=Count('id'))
+    ]
+    TicketDailyStats.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0006_jiraoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('estado', models.CharField(max_length=20, verbose_name='Estado')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('asignado_a', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Asignado a')),
+                ('cliente', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='extractor.cliente', verbose_name='Cliente')),
+                ('creado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+                ('proyecto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='extractor.proyecto', verbose_name='Proyecto')),
+                ('tipo_servicio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='extractor.tiposervicio', verbose_name='Tipo de Servicio')),
+            ],
+            options={
+                'verbose_name': 'Estadística diaria de tickets',
+                'verbose_name_plural': 'Estadísticas diarias de tickets',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['fecha', 'estado'], name='extractor_t_fecha_494530_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_estadisticas, migrations.RunPython.noop),
+    ]
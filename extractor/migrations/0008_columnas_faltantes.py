@@ -0,0 +1,60 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+# Columnas que existen en los modelos pero que ninguna migración creó: en las
+# bases existentes se agregaron a mano (ver 0005) y en las nuevas faltan.
+COLUMNAS = (
+    ('Ticket', 'nombre'),
+    ('SolicitudPruebas', 'email_contacto'),
+)
+
+
+def agregar_columnas_faltantes(apps, schema_editor):
+    """Crea cada columna solo si la tabla aún no la tiene"""
+    connection = schema_editor.connection
+    for modelo, campo in COLUMNAS:
+        model = apps.get_model('extractor', modelo)
+        with connection.cursor() as cursor:
+            existentes = {
+                columna.name
+                for columna in connection.introspection.get_table_description(cursor, model._meta.db_table)
+            }
+        if campo not in existentes:
+            schema_editor.add_field(model, model._meta.get_field(campo))
+
+
+def quitar_columnas_faltantes(apps, schema_editor):
+    for modelo, campo in COLUMNAS:
+        model = apps.get_model('extractor', modelo)
+        schema_editor.remove_field(model, model._meta.get_field(campo))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0008_indices_paginacion_cursor'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='ticket',
+                    name='nombre',
+                    field=models.CharField(blank=True, help_text='Nombre descriptivo para identificar fácilmente el ticket', max_length=200, null=True, verbose_name='Nombre del Ticket'),
+                ),
+                migrations.AddField(
+                    model_name='solicitudpruebas',
+                    name='email_contacto',
+                    field=models.EmailField(blank=True, help_text='Email para contactar al solicitante si hay dudas', max_length=254, null=True, verbose_name='Email de contacto'),
+                ),
+            ],
+        ),
+        migrations.RunPython(agregar_columnas_faltantes, quitar_columnas_faltantes),
+        migrations.AlterField(
+            model_name='ticket',
+            name='estado',
+            field=models.CharField(choices=[('GENERADO', 'Generado'), ('EN_PROCESO', 'En Proceso'), ('COMPLETADO', 'Completado'), ('CANCELADO', 'Cancelado'), ('NO EXITOSO', 'No Exitoso')], default='GENERADO', max_length=20, verbose_name='Estado del Ticket'),
+        ),
+    ]
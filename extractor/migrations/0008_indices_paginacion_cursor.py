@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0007_ticketdailystats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='extractor_t_fecha_c_f1b9b3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='exceldata',
+            index=models.Index(fields=['extracted_date', 'id'], name='extractor_e_extract_301ffc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='extractor_t_fecha_c_ef5dd7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudpruebas',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='extractor_s_fecha_c_ed7982_idx'),
+        ),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:40
+
+import re
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+# Copia congelada de extractor.search_index al crear esta migración: la
+# migración no debe cambiar si más adelante cambian los campos indexados.
+CAMPOS = {
+    'ticket': ('codigo', 'nombre', 'responsable_solicitud', 'lider_proyecto', 'numero_version'),
+    'exceldata': ('ticket_code', 'responsable_solicitud', 'lider_proyecto', 'numero_version', 'funcionalidad_liberacion'),
+}
+COLUMNA = 'busqueda'
+MAX_TERMINOS = 2000
+LONGITUD_TERMINO = 60
+
+_SUFIJOS = (
+    'amientos', 'imientos', 'amiento', 'imiento', 'aciones', 'uciones', 'idades',
+    'acion', 'ucion', 'mente', 'idad', 'ables', 'ibles', 'able', 'ible',
+    'istas', 'ista', 'osos', 'osas', 'oso', 'osa', 'es', 's',
+)
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+# Columna tsvector generada + índice GIN por tabla (solo Postgres)
+TABLAS = {
+    'extractor_ticket': CAMPOS['ticket'],
+    'extractor_exceldata': CAMPOS['exceldata'],
+}
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def _raiz(palabra):
+    for sufijo in _SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 3:
+            return palabra[:-len(sufijo)]
+    return palabra
+
+
+def _terminos_objeto(obj, modelo):
+    encontrados = {}
+    for campo in CAMPOS[modelo]:
+        for palabra in _PALABRA.findall(_normalizar(getattr(obj, campo, ''))):
+            encontrados.setdefault(_raiz(palabra)[:LONGITUD_TERMINO], None)
+            if len(encontrados) >= MAX_TERMINOS:
+                return list(encontrados)
+    return list(encontrados)
+
+
+def _poblar_indice_invertido(apps):
+    IndiceBusqueda = apps.get_model('extractor', 'IndiceBusqueda')
+    modelos = {
+        'ticket': apps.get_model('extractor', 'Ticket'),
+        'exceldata': apps.get_model('extractor', 'ExcelData'),
+    }
+    for modelo, model_class in modelos.items():
+        filas = []
+        for obj in model_class.objects.only('id', *CAMPOS[modelo]).iterator(chunk_size=500):
+            filas.extend(
+                IndiceBusqueda(modelo=modelo, objeto_id=obj.pk, termino=termino)
+                for termino in _terminos_objeto(obj, modelo)
+            )
+            if len(filas) >= 5000:
+                IndiceBusqueda.objects.bulk_create(filas)
+                filas = []
+        IndiceBusqueda.objects.bulk_create(filas)
+
+
+def _crear_config_unaccent(cursor, alias):
+    """Crea la configuración spanish_unaccent; devuelve False si no hay permisos para unaccent"""
+    try:
+        with transaction.atomic(using=alias):
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+            cursor.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'spanish_unaccent') THEN
+                        CREATE TEXT SEARCH CONFIGURATION spanish_unaccent (COPY = spanish);
+                        ALTER TEXT SEARCH CONFIGURATION spanish_unaccent
+                            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+                    END IF;
+                END
+                $$;
+            """)
+        return True
+    except Exception as e:
+        print(f"⚠️ No se pudo habilitar unaccent ({str(e)[:100]}); se usa la configuración 'spanish'")
+        return False
+
+
+def crear_indices_busqueda(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor != 'postgresql':
+        # Respaldo: índice invertido para los registros existentes
+        _poblar_indice_invertido(apps)
+        return
+
+    with connection.cursor() as cursor:
+        config = 'spanish_unaccent' if _crear_config_unaccent(cursor, connection.alias) else 'spanish'
+        for tabla, campos in TABLAS.items():
+            documento = " || ' ' || ".join(f"coalesce({campo}, '')" for campo in campos)
+            cursor.execute(
+                f"ALTER TABLE {tabla} ADD COLUMN {COLUMNA} tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('{config}'::regconfig, {documento})) STORED"
+            )
+            cursor.execute(
+                f"CREATE INDEX {tabla}_{COLUMNA}_gin ON {tabla} USING gin ({COLUMNA})"
+            )
+
+
+def eliminar_indices_busqueda(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for tabla in TABLAS:
+            cursor.execute(f"DROP INDEX IF EXISTS {tabla}_{COLUMNA}_gin")
+            cursor.execute(f"ALTER TABLE {tabla} DROP COLUMN IF EXISTS {COLUMNA}")
+        cursor.execute('DROP TEXT SEARCH CONFIGURATION IF EXISTS spanish_unaccent')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0008_columnas_faltantes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=20, verbose_name='Modelo')),
+                ('objeto_id', models.BigIntegerField(verbose_name='ID del objeto')),
+                ('termino', models.CharField(max_length=60, verbose_name='Término')),
+            ],
+            options={
+                'verbose_name': 'Término de búsqueda',
+                'verbose_name_plural': 'Índice de búsqueda',
+                'indexes': [
+                    models.Index(fields=['modelo', 'termino'], name='extractor_i_modelo_1db3c7_idx'),
+                    models.Index(fields=['modelo', 'objeto_id'], name='extractor_i_modelo_2eee3d_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(crear_indices_busqueda, eliminar_indices_busqueda),
+    ]
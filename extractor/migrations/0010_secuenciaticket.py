@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+from django.db.models import Max
+
+CAMPOS_CLAVE = ('empresa_code', 'tipo_servicio_code', 'funcion_code', 'version_code', 'cliente_code', 'proyecto_code')
+
+
+def poblar_secuencias(apps, schema_editor):
+    Ticket = apps.get_model('extractor', 'Ticket')
+    SecuenciaTicket = apps.get_model('extractor', 'SecuenciaTicket')
+
+    SecuenciaTicket.objects.bulk_create([
+        SecuenciaTicket(ultimo=fila.pop('ultimo') or 0, **fila)
+        for fila in Ticket.objects.order_by().values(*CAMPOS_CLAVE).annotate(ultimo=Max('consecutivo'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extractor', '0009_indicebusqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecuenciaTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('empresa_code', models.CharField(max_length=10, verbose_name='Código Empresa')),
+                ('tipo_servicio_code', models.CharField(max_length=10, verbose_name='Código Tipo Servicio')),
+                ('funcion_code', models.CharField(max_length=20, verbose_name='Código Función')),
+                ('version_code', models.CharField(max_length=10, verbose_name='Código Versión')),
+                ('cliente_code', models.CharField(max_length=10, verbose_name='Código Cliente')),
+                ('proyecto_code', models.CharField(max_length=10, verbose_name='Código Proyecto')),
+                ('ultimo', models.IntegerField(default=0, verbose_name='Último consecutivo')),
+            ],
+            options={
+                'verbose_name': 'Secuencia de tickets',
+                'verbose_name_plural': 'Secuencias de tickets',
+                'unique_together': {('empresa_code', 'tipo_servicio_code', 'funcion_code', 'version_code', 'cliente_code', 'proyecto_code')},
+            },
+        ),
+        migrations.RunPython(poblar_secuencias, migrations.RunPython.noop),
+    ]
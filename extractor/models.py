@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
 import random  
 
@@ -130,6 +131,11 @@ class ExcelData(models.Model):
     ticket_code = models.CharField(max_length=100, blank=True, null=True) 
     extracted_date = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['extracted_date', 'id']),
+        ]
+    
     def __str__(self):
         return f"Datos extraídos {self.extracted_date}"
     
@@ -321,7 +327,7 @@ class Ticket(models.Model):
         indexes = [
             models.Index(fields=['codigo']),
             models.Index(fields=['estado']),
-            models.Index(fields=['fecha_creacion']),
+            models.Index(fields=['fecha_creacion', 'id']),
         ]
     
     def __str__(self):
@@ -497,6 +503,7 @@ class SolicitudPruebas(models.Model):
             models.Index(fields=['fecha_solicitud']),
             models.Index(fields=['cliente', 'proyecto']),
             models.Index(fields=['tiene_ticket']), 
+            models.Index(fields=['fecha_creacion', 'id']),
         ]
     
     def __str__(self):
@@ -594,7 +601,10 @@ class SolicitudPruebas(models.Model):
             )
             
             # Asociar el ticket a la solicitud (sin llamar a save() completo)
-            # Usamos update en lugar de save() para evitar validaciones adicionales
+            # Usamos update en lugar de save() para evitar validaciones adicionales;
+            # update() no dispara señales, así que se descuenta aquí de las estadísticas
+            from .ticket_stats import ajustar, clave_solicitud
+            ajustar(clave_solicitud(self), -1)
             SolicitudPruebas.objects.filter(pk=self.pk).update(
                 ticket=ticket_obj,
                 tiene_ticket=True,
@@ -618,4 +628,172 @@ class SolicitudPruebas(models.Model):
         # Asegurar que ticket_id nunca sea string vacío
         if self.ticket_id == '':
             self.ticket_id = None
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class JiraOutbox(models.Model):
+    """
+    Operaciones pendientes contra Jira. Se registran en la misma transacción
+    que el Ticket y las procesa el comando procesar_jira_outbox.
+    """
+    OPERACIONES = [
+        ('CREATE_ISSUE', 'Crear incidencia'),
+    ]
+
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('PROCESANDO', 'Procesando'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='jira_outbox',
+        verbose_name="Ticket"
+    )
+    operacion = models.CharField(
+        max_length=20,
+        choices=OPERACIONES,
+        default='CREATE_ISSUE',
+        verbose_name="Operación"
+    )
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Datos de la operación")
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS,
+        default='PENDIENTE',
+        verbose_name="Estado"
+    )
+    intentos = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    max_intentos = models.PositiveIntegerField(default=8, verbose_name="Máximo de intentos")
+    proximo_intento = models.DateTimeField(default=timezone.now, verbose_name="Próximo intento")
+    ultimo_error = models.TextField(blank=True, verbose_name="Último error")
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+
+    class Meta:
+        verbose_name = "Operación Jira pendiente"
+        verbose_name_plural = "Operaciones Jira pendientes"
+        ordering = ['proximo_intento', 'id']
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_operacion_display()} - ticket #{self.ticket_id} ({self.get_estado_display()})"
+
+
+class TicketDailyStats(models.Model):
+    """
+    Conteo precalculado de tickets por día y dimensiones (estado, cliente,
+    proyecto, servicio, asignado, creador). Las solicitudes sin ticket se
+    registran con estado 'SIN_TICKET' por fecha de solicitud.
+
+    Lo mantienen las señales de Ticket y SolicitudPruebas
+    (extractor/signals.py) y se reconstruye con el comando
+    reconstruir_estadisticas_tickets.
+    """
+    ESTADO_SIN_TICKET = 'SIN_TICKET'
+
+    fecha = models.DateField(verbose_name="Fecha")
+    estado = models.CharField(max_length=20, verbose_name="Estado")
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Cliente"
+    )
+    proyecto = models.ForeignKey(
+        Proyecto,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Proyecto"
+    )
+    tipo_servicio = models.ForeignKey(
+        TipoServicio,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Tipo de Servicio"
+    )
+    asignado_a = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Asignado a"
+    )
+    creado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Creado por"
+    )
+    total = models.IntegerField(default=0, verbose_name="Total")
+
+    class Meta:
+        verbose_name = "Estadística diaria de tickets"
+        verbose_name_plural = "Estadísticas diarias de tickets"
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['fecha', 'estado']),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} - {self.estado}: {self.total}"
+
+
+class IndiceBusqueda(models.Model):
+    """
+    Índice invertido (término -> objeto) para la búsqueda de texto cuando la
+    base de datos no es Postgres. En Postgres se usa la columna tsvector
+    generada y este modelo queda vacío (ver extractor/search_index.py).
+    """
+    modelo = models.CharField(max_length=20, verbose_name="Modelo")
+    objeto_id = models.BigIntegerField(verbose_name="ID del objeto")
+    termino = models.CharField(max_length=60, verbose_name="Término")
+
+    class Meta:
+        verbose_name = "Término de búsqueda"
+        verbose_name_plural = "Índice de búsqueda"
+        indexes = [
+            models.Index(fields=['modelo', 'termino']),
+            models.Index(fields=['modelo', 'objeto_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo}#{self.objeto_id}: {self.termino}"
+
+
+class SecuenciaTicket(models.Model):
+    """
+    Último consecutivo usado por cada prefijo de código de ticket. Los
+    números se asignan con extractor/ticket_sequence.py.
+    """
+    empresa_code = models.CharField(max_length=10, verbose_name="Código Empresa")
+    tipo_servicio_code = models.CharField(max_length=10, verbose_name="Código Tipo Servicio")
+    funcion_code = models.CharField(max_length=20, verbose_name="Código Función")
+    version_code = models.CharField(max_length=10, verbose_name="Código Versión")
+    cliente_code = models.CharField(max_length=10, verbose_name="Código Cliente")
+    proyecto_code = models.CharField(max_length=10, verbose_name="Código Proyecto")
+    ultimo = models.IntegerField(default=0, verbose_name="Último consecutivo")
+
+    class Meta:
+        verbose_name = "Secuencia de tickets"
+        verbose_name_plural = "Secuencias de tickets"
+        unique_together = ['empresa_code', 'tipo_servicio_code', 'funcion_code', 'version_code', 'cliente_code', 'proyecto_code']
+
+    def __str__(self):
+        return (
+            f"{self.empresa_code}-{self.tipo_servicio_code}-{self.funcion_code}-{self.version_code}-"
+            f"{self.cliente_code}-{self.proyecto_code}: {self.ultimo:03d}"
+        )
@@ -0,0 +1,279 @@
+# extractor/pagination.py
+"""
+Paginación por cursor (keyset) para los listados grandes.
+
+En lugar de OFFSET, cada página filtra por los valores de la última fila de la
+página anterior sobre columnas indexadas (p. ej. fecha_creacion, id), así que
+la página 500 cuesta lo mismo que la 1. Los cursores son opacos (JSON en
+base64) y llevan también el número de página para poder mostrarlo.
+
+El total se obtiene con un conteo ligero: estimación de Postgres en vistas sin
+filtros y conteo acotado a LIMITE_CONTEO en vistas filtradas.
+"""
+import base64
+import binascii
+import json
+import math
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+
+LIMITE_CONTEO = 10000
+UMBRAL_ESTIMACION = 10000  # Por debajo de esto el COUNT exacto es barato
+CURSOR_ULTIMA = 'ultima'
+PARAMETROS_PAGINA = ('cursor', 'page')
+
+
+def _serializar(valor):
+    # isoformat conserva los microsegundos (DjangoJSONEncoder los trunca)
+    return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+
+def codificar_cursor(datos):
+    texto = json.dumps(datos, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """dict del cursor o None si no es válido"""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        datos = json.loads(texto)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(datos, dict) or not isinstance(datos.get('v'), list):
+        return None
+    return datos
+
+
+def filas_estimadas(model):
+    """Número de filas estimado por Postgres (pg_class.reltuples) o None"""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [model._meta.db_table])
+        fila = cursor.fetchone()
+    if not fila or fila[0] is None or fila[0] < 0:
+        return None
+    return int(fila[0])
+
+
+def contar(queryset, filtrado):
+    """
+    Conteo ligero para el paginador
+
+    Args:
+        queryset: queryset ya filtrado
+        filtrado: True si el usuario aplicó algún filtro
+
+    Returns:
+        tuple: (total, aproximado)
+    """
+    if not filtrado:
+        estimado = filas_estimadas(queryset.model)
+        if estimado is not None and estimado >= UMBRAL_ESTIMACION:
+            return estimado, True
+        return queryset.order_by().count(), False
+
+    total = queryset.order_by()[:LIMITE_CONTEO + 1].count()
+    if total > LIMITE_CONTEO:
+        return LIMITE_CONTEO, True
+    return total, False
+
+
+class KeysetPage:
+    """Página con la interfaz de django.core.paginator.Page usada en las plantillas"""
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous, parametros):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._parametros = parametros
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+    def _url(self, cursor=None):
+        parametros = list(self._parametros)
+        if cursor:
+            parametros.append(('cursor', cursor))
+        return '?' + urlencode(parametros)
+
+    @property
+    def url_primera(self):
+        return self._url()
+
+    @property
+    def url_ultima(self):
+        return self._url(CURSOR_ULTIMA)
+
+    @property
+    def url_siguiente(self):
+        if not self._has_next or not self.object_list:
+            return ''
+        return self._url(self.paginator.cursor(self.object_list[-1], 's', self.number + 1))
+
+    @property
+    def url_anterior(self):
+        if not self._has_previous or not self.object_list:
+            return ''
+        return self._url(self.paginator.cursor(self.object_list[0], 'a', self.number - 1))
+
+
+class KeysetPaginator:
+    """
+    Paginador por cursor
+
+    Args:
+        queryset: queryset filtrado (sin orden; se aplica `orden`)
+        per_page: filas por página
+        orden: campos de orden, el último único (p. ej. ('-fecha_creacion', '-id'));
+               las columnas no deben admitir NULL
+        count: total de filas (exacto o aproximado) para mostrar páginas
+        aproximado: True si count es una estimación o un conteo acotado
+    """
+
+    def __init__(self, queryset, per_page, orden, count=None, aproximado=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.orden = tuple(orden)
+        self.campos = [campo.lstrip('-') for campo in self.orden]
+        self.count = count
+        self.aproximado = aproximado
+
+    @property
+    def num_pages(self):
+        if not self.count:
+            return 1
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def cursor(self, fila, direccion, numero):
+        return codificar_cursor({
+            'd': direccion,
+            'p': numero,
+            'v': [_serializar(getattr(fila, campo)) for campo in self.campos],
+        })
+
+    def _valores(self, datos):
+        if len(datos['v']) != len(self.campos) or not isinstance(datos.get('p'), int):
+            return None
+        try:
+            return [
+                self.queryset.model._meta.get_field(campo).to_python(valor)
+                for campo, valor in zip(self.campos, datos['v'])
+            ]
+        except ValidationError:
+            return None
+
+    def _condicion(self, valores, hacia_atras):
+        """
+        a <= va AND ((a < va) OR (a = va AND b < vb) ...) según la dirección
+        de cada campo
+
+        El límite sobre la primera columna es redundante, pero sin él el OR no
+        da un rango y la base recorre el índice desde el principio en vez de
+        saltar al cursor.
+        """
+        condicion = Q()
+        iguales = {}
+        for campo, valor in zip(self.orden, valores):
+            nombre = campo.lstrip('-')
+            descendente = campo.startswith('-')
+            operador = 'lt' if descendente != hacia_atras else 'gt'
+            condicion |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+            iguales[nombre] = valor
+
+        primero = self.orden[0]
+        operador = 'lte' if primero.startswith('-') != hacia_atras else 'gte'
+        return Q(**{f'{primero.lstrip("-")}__{operador}': valores[0]}) & condicion
+
+    def _orden_invertido(self):
+        return tuple(campo[1:] if campo.startswith('-') else f'-{campo}' for campo in self.orden)
+
+    def get_page(self, cursor=None, parametros=None):
+        """
+        Args:
+            cursor: valor del parámetro ?cursor= (None = primera página)
+            parametros: request.GET para conservar filtros en los enlaces
+        """
+        parametros = [
+            (clave, valor)
+            for clave, valores in (parametros.lists() if parametros is not None else [])
+            if clave not in PARAMETROS_PAGINA
+            for valor in valores
+        ]
+
+        ultima = cursor == CURSOR_ULTIMA
+        datos = decodificar_cursor(cursor) if cursor and not ultima else None
+        valores = self._valores(datos) if datos else None
+        if valores is None:
+            datos = None
+
+        hacia_atras = ultima or (datos is not None and datos.get('d') == 'a')
+        filas = self.queryset
+        if datos:
+            filas = filas.filter(self._condicion(valores, hacia_atras))
+        filas = filas.order_by(*(self._orden_invertido() if hacia_atras else self.orden))
+
+        filas = list(filas[:self.per_page + 1])
+        hay_mas = len(filas) > self.per_page
+        filas = filas[:self.per_page]
+        if hacia_atras:
+            filas.reverse()
+
+        if ultima:
+            has_next, has_previous = False, hay_mas
+            numero = max(2, self.num_pages) if hay_mas else 1
+        elif hacia_atras:
+            has_next, has_previous = True, hay_mas
+            numero = max(2, datos['p']) if hay_mas else 1
+        elif datos:
+            has_next, has_previous = hay_mas, True
+            numero = max(2, datos['p'])
+        else:
+            has_next, has_previous = hay_mas, False
+            numero = 1
+
+        return KeysetPage(filas, numero, self, has_next, has_previous, parametros)
+
+
+def paginar(request, queryset, orden, por_pagina, filtrado=True, total=None):
+    """
+    Atajo para las vistas: cuenta de forma ligera y devuelve la página pedida
+
+    Args:
+        total: conteo ya conocido (p. ej. de TicketDailyStats); evita contar
+    """
+    if total is None:
+        total, aproximado = contar(queryset, filtrado)
+    else:
+        aproximado = False
+    paginator = KeysetPaginator(queryset, por_pagina, orden, count=total, aproximado=aproximado)
+    return paginator.get_page(request.GET.get('cursor'), request.GET)
@@ -0,0 +1,69 @@
+# extractor/public_cache.py
+"""
+Caché de la página pública de consulta de tickets.
+
+Las estadísticas del mes y la lista de pendientes cambian pocas veces por
+hora, así que se guardan en la caché compartida con una vigencia corta y se
+invalidan explícitamente cuando se guarda o elimina un ticket o una solicitud.
+"""
+from calendar import monthrange
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import ticket_stats
+from .cache_utils import CacheNamespace
+from .models import Ticket, TicketDailyStats
+
+LIMITE_PENDIENTES = 20
+
+CACHE = CacheNamespace('consulta_publica')
+
+
+def _ttl():
+    return getattr(settings, 'CONSULTA_PUBLICA_CACHE_TTL', 120)
+
+
+def _calcular_estadisticas(hoy):
+    inicio_mes = hoy.replace(day=1)
+    fin_mes = hoy.replace(day=monthrange(hoy.year, hoy.month)[1])
+    conteo_mes = ticket_stats.conteo_por_estado(
+        ticket_stats.estadisticas(inicio_mes, fin_mes, incluir_sin_ticket=True)
+    )
+    solicitudes_sin_ticket = conteo_mes.pop(TicketDailyStats.ESTADO_SIN_TICKET, 0)
+    return conteo_mes, solicitudes_sin_ticket
+
+
+def estadisticas_mes(hoy=None):
+    """
+    Conteo por estado del mes actual y número de solicitudes sin ticket
+
+    Returns:
+        tuple: ({estado: total}, solicitudes_sin_ticket)
+    """
+    hoy = hoy or timezone.localdate()
+    # El mes forma parte de la clave: al cambiar de mes se calcula de nuevo
+    return CACHE.get_or_set(
+        'estadisticas', f'{hoy:%Y-%m}',
+        calcular=lambda: _calcular_estadisticas(hoy),
+        timeout=_ttl(),
+    )
+
+
+def tickets_pendientes():
+    """Últimos tickets en estado GENERADO (lista ya evaluada para poder cachearla)"""
+    return CACHE.get_or_set(
+        'pendientes',
+        calcular=lambda: list(
+            Ticket.objects.select_related('cliente', 'proyecto', 'tipo_servicio')
+            .filter(estado='GENERADO')
+            .order_by('-fecha_creacion')[:LIMITE_PENDIENTES]
+        ),
+        timeout=_ttl(),
+    )
+
+
+def invalidar():
+    """Descarta los datos cacheados una vez confirmada la transacción en curso"""
+    transaction.on_commit(CACHE.invalidar)
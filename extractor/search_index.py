@@ -0,0 +1,182 @@
+# extractor/search_index.py
+"""
+Búsqueda de texto sobre Ticket y ExcelData.
+
+En Postgres cada tabla tiene una columna generada `busqueda` (tsvector con la
+configuración 'spanish_unaccent': español sin acentos) y un índice GIN; la
+base de datos la mantiene al guardar. En otros motores (SQLite en desarrollo)
+se usa el índice invertido IndiceBusqueda, que las señales actualizan en cada
+guardado.
+
+Las búsquedas son por prefijo y todas las palabras deben aparecer:
+'valid pago' encuentra 'Validación de pagos'.
+"""
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+# Campos indexados por modelo (en orden de relevancia)
+CAMPOS = {
+    'ticket': ('codigo', 'nombre', 'responsable_solicitud', 'lider_proyecto', 'numero_version'),
+    'exceldata': ('ticket_code', 'responsable_solicitud', 'lider_proyecto', 'numero_version', 'funcionalidad_liberacion'),
+}
+CONFIG_PREFERIDA = 'spanish_unaccent'
+CONFIG_RESPALDO = 'spanish'
+COLUMNA = 'busqueda'
+MAX_TERMINOS = 2000
+LONGITUD_TERMINO = 60
+
+_SUFIJOS = (
+    'amientos', 'imientos', 'amiento', 'imiento', 'aciones', 'uciones', 'idades',
+    'acion', 'ucion', 'mente', 'idad', 'ables', 'ibles', 'able', 'ible',
+    'istas', 'ista', 'osos', 'osas', 'oso', 'osa', 'es', 's',
+)
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+_config_cache = {}
+
+
+def usa_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def config_postgres():
+    """Configuración de texto creada por la migración (con o sin unaccent)"""
+    if 'config' not in _config_cache:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_ts_config WHERE cfgname = %s', [CONFIG_PREFERIDA])
+            _config_cache['config'] = CONFIG_PREFERIDA if cursor.fetchone() else CONFIG_RESPALDO
+    return _config_cache['config']
+
+
+# ========== NORMALIZACIÓN (respaldo sin Postgres) ==========
+
+def normalizar(texto):
+    """Minúsculas y sin acentos"""
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def raiz(palabra):
+    """Raíz aproximada en español: quita sufijos y plurales comunes"""
+    for sufijo in _SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 3:
+            return palabra[:-len(sufijo)]
+    return palabra
+
+
+def terminos(texto):
+    """Lista de raíces de un texto, sin repetir y en orden de aparición"""
+    vistos = dict.fromkeys(
+        raiz(palabra)[:LONGITUD_TERMINO] for palabra in _PALABRA.findall(normalizar(texto))
+    )
+    return list(vistos)
+
+
+def terminos_objeto(obj, modelo):
+    encontrados = {}
+    for campo in CAMPOS[modelo]:
+        for termino in terminos(getattr(obj, campo, '')):
+            encontrados.setdefault(termino, None)
+            if len(encontrados) >= MAX_TERMINOS:
+                return list(encontrados)
+    return list(encontrados)
+
+
+# ========== MANTENIMIENTO ==========
+
+def _modelo(obj):
+    return obj._meta.model_name
+
+
+def actualizar(obj):
+    """Reindexa un objeto (no hace nada en Postgres: la columna es generada)"""
+    if usa_postgres():
+        return
+    from .models import IndiceBusqueda
+
+    modelo = _modelo(obj)
+    with transaction.atomic():
+        IndiceBusqueda.objects.filter(modelo=modelo, objeto_id=obj.pk).delete()
+        IndiceBusqueda.objects.bulk_create([
+            IndiceBusqueda(modelo=modelo, objeto_id=obj.pk, termino=termino)
+            for termino in terminos_objeto(obj, modelo)
+        ])
+
+
+def eliminar(obj):
+    if usa_postgres():
+        return
+    from .models import IndiceBusqueda
+
+    IndiceBusqueda.objects.filter(modelo=_modelo(obj), objeto_id=obj.pk).delete()
+
+
+def reconstruir(modelos, indice_model):
+    """
+    Regenera el índice invertido completo
+
+    Args:
+        modelos: {'ticket': Ticket, 'exceldata': ExcelData} (vivos o históricos)
+        indice_model: modelo IndiceBusqueda
+
+    Returns:
+        int: términos creados
+    """
+    creados = 0
+    for modelo, model_class in modelos.items():
+        indice_model.objects.filter(modelo=modelo).delete()
+        filas = []
+        for obj in model_class.objects.only('id', *CAMPOS[modelo]).iterator(chunk_size=500):
+            filas.extend(
+                indice_model(modelo=modelo, objeto_id=obj.pk, termino=termino)
+                for termino in terminos_objeto(obj, modelo)
+            )
+            if len(filas) >= 5000:
+                indice_model.objects.bulk_create(filas)
+                creados += len(filas)
+                filas = []
+        indice_model.objects.bulk_create(filas)
+        creados += len(filas)
+    return creados
+
+
+# ========== CONSULTA ==========
+
+def buscar(queryset, texto):
+    """
+    Filtra un queryset de Ticket o ExcelData por el texto de búsqueda
+
+    Args:
+        queryset: queryset de Ticket o ExcelData
+        texto: texto libre del buscador
+
+    Returns:
+        QuerySet filtrado (sin cambios si el texto no tiene palabras)
+    """
+    palabras = terminos(texto)
+    if not palabras:
+        return queryset
+
+    model = queryset.model
+    modelo = model._meta.model_name
+
+    if usa_postgres():
+        # 'palabra:*' busca por prefijo; la configuración aplica acentos y raíces
+        consulta = ' & '.join(f'{palabra}:*' for palabra in _PALABRA.findall(normalizar(texto)))
+        return queryset.filter(RawSQL(
+            f'"{model._meta.db_table}"."{COLUMNA}" @@ to_tsquery(%s::regconfig, %s)',
+            [config_postgres(), consulta],
+            output_field=BooleanField(),
+        ))
+
+    from .models import IndiceBusqueda
+
+    for palabra in palabras:
+        queryset = queryset.filter(pk__in=IndiceBusqueda.objects.filter(
+            modelo=modelo, termino__startswith=palabra
+        ).values('objeto_id'))
+    return queryset
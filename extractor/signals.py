@@ -0,0 +1,102 @@
+# extractor/signals.py
+"""
+Señales que mantienen TicketDailyStats al día de forma incremental,
+invalidan la caché de la consulta pública y la de nombres de catálogo, y
+actualizan el índice de búsqueda
+"""
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import catalog_names, public_cache, search_index, ticket_stats
+from .models import Cliente, ExcelData, Proyecto, Ticket, SolicitudPruebas, TipoServicio
+
+
+@receiver(pre_save, sender=Ticket)
+def ticket_pre_save(sender, instance, raw=False, **kwargs):
+    instance._stats_clave_anterior = None
+    if raw or not instance.pk:
+        return
+    anterior = Ticket.objects.filter(pk=instance.pk).only(
+        'fecha_creacion', 'estado', 'cliente', 'proyecto', 'tipo_servicio', 'asignado_a', 'creado_por'
+    ).first()
+    if anterior:
+        instance._stats_clave_anterior = ticket_stats.clave_ticket(anterior)
+
+
+def _campos_busqueda_cambiaron(modelo, update_fields):
+    return update_fields is None or bool(set(update_fields) & set(search_index.CAMPOS[modelo]))
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    ticket_stats.mover(getattr(instance, '_stats_clave_anterior', None), ticket_stats.clave_ticket(instance))
+    public_cache.invalidar()
+    if _campos_busqueda_cambiaron('ticket', update_fields):
+        search_index.actualizar(instance)
+
+
+@receiver(pre_delete, sender=Ticket)
+def ticket_pre_delete(sender, instance, **kwargs):
+    # La solicitud asociada queda sin ticket (SET_NULL se aplica sin señales)
+    for solicitud in SolicitudPruebas.objects.filter(ticket=instance):
+        solicitud.ticket_id = None
+        ticket_stats.ajustar(ticket_stats.clave_solicitud(solicitud), 1)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_post_delete(sender, instance, **kwargs):
+    ticket_stats.ajustar(ticket_stats.clave_ticket(instance), -1)
+    public_cache.invalidar()
+    search_index.eliminar(instance)
+
+
+@receiver(pre_save, sender=SolicitudPruebas)
+def solicitud_pre_save(sender, instance, raw=False, **kwargs):
+    instance._stats_clave_anterior = None
+    if raw or not instance.pk:
+        return
+    anterior = SolicitudPruebas.objects.filter(pk=instance.pk).only(
+        'ticket', 'fecha_solicitud', 'cliente', 'proyecto', 'tipo_prueba'
+    ).first()
+    if anterior:
+        instance._stats_clave_anterior = ticket_stats.clave_solicitud(anterior)
+
+
+@receiver(post_save, sender=SolicitudPruebas)
+def solicitud_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ticket_stats.mover(getattr(instance, '_stats_clave_anterior', None), ticket_stats.clave_solicitud(instance))
+    public_cache.invalidar()
+
+
+@receiver(post_delete, sender=SolicitudPruebas)
+def solicitud_post_delete(sender, instance, **kwargs):
+    ticket_stats.ajustar(ticket_stats.clave_solicitud(instance), -1)
+    public_cache.invalidar()
+
+
+@receiver(post_save, sender=ExcelData)
+def excel_data_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if _campos_busqueda_cambiaron('exceldata', update_fields):
+        search_index.actualizar(instance)
+
+
+@receiver(post_delete, sender=ExcelData)
+def excel_data_post_delete(sender, instance, **kwargs):
+    search_index.eliminar(instance)
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_save, sender=Proyecto)
+@receiver(post_save, sender=TipoServicio)
+@receiver(post_delete, sender=Cliente)
+@receiver(post_delete, sender=Proyecto)
+@receiver(post_delete, sender=TipoServicio)
+def catalogo_cambiado(sender, raw=False, **kwargs):
+    if not raw:
+        catalog_names.invalidar()
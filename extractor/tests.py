@@ -1,3 +1,144 @@
+from datetime import date, time
+
 from django.test import TestCase
 
-# Create your tests here.
+from .jira_helper import etiqueta_ticket, process_jira_outbox
+from .models import Cliente, Proyecto, TipoServicio, SolicitudPruebas, Ticket, TicketDailyStats, JiraOutbox
+
+
+class EstadisticasSolicitudTests(TestCase):
+    """Las señales de SolicitudPruebas mantienen las filas SIN_TICKET de TicketDailyStats"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = Cliente.objects.create(nombre='Banco Prueba', nomenclatura='BPR')
+        cls.proyecto = Proyecto.objects.create(
+            cliente=cls.cliente, nombre='Portal', codigo='PRT-01', nomenclatura='PRT'
+        )
+        cls.funcional = TipoServicio.objects.create(nombre='Funcionales', nomenclatura='FUN')
+        cls.regresion = TipoServicio.objects.create(nombre='Regresión', nomenclatura='REG')
+
+    def crear_solicitud(self, **kwargs):
+        datos = {
+            'cliente': self.cliente,
+            'proyecto': self.proyecto,
+            'fecha_solicitud': date(2026, 10, 1),
+            'hora_solicitud': time(9, 0),
+            'tipo_servicio_code': 'PRU',
+            'tipo_prueba': self.funcional,
+        }
+        datos.update(kwargs)
+        return SolicitudPruebas.objects.create(**datos)
+
+    def filas(self):
+        return list(
+            TicketDailyStats.objects.filter(estado=TicketDailyStats.ESTADO_SIN_TICKET)
+            .order_by('fecha', 'tipo_servicio_id')
+            .values_list('fecha', 'cliente_id', 'proyecto_id', 'tipo_servicio_id', 'total')
+        )
+
+    def test_crear_solicitud_suma_fila_sin_ticket(self):
+        self.crear_solicitud()
+        self.crear_solicitud()
+
+        self.assertEqual(self.filas(), [
+            (date(2026, 10, 1), self.cliente.id, self.proyecto.id, self.funcional.id, 2),
+        ])
+
+    def test_actualizar_solicitud_mueve_la_fila(self):
+        solicitud = self.crear_solicitud()
+
+        solicitud.tipo_prueba = self.regresion
+        solicitud.fecha_solicitud = date(2026, 10, 2)
+        solicitud.save()
+
+        filas = [fila for fila in self.filas() if fila[-1]]
+        self.assertEqual(filas, [
+            (date(2026, 10, 2), self.cliente.id, self.proyecto.id, self.regresion.id, 1),
+        ])
+
+    def test_eliminar_solicitud_resta_la_fila(self):
+        solicitud = self.crear_solicitud()
+
+        solicitud.delete()
+
+        self.assertEqual([fila for fila in self.filas() if fila[-1]], [])
+
+
+class IncidenciaFalsa:
+    def __init__(self, key):
+        self.key = key
+
+    def permalink(self):
+        return f'https://jira.example.com/browse/{self.key}'
+
+
+class JiraFalso:
+    """Registra las llamadas; `existentes` simula incidencias ya creadas por etiqueta"""
+
+    def __init__(self, existentes=None):
+        self.existentes = existentes or {}
+        self.creadas = []
+        self.busquedas = []
+
+    def create_issue(self, datos):
+        self.creadas.append(datos['codigo'])
+        return IncidenciaFalsa(f'QA01-{len(self.creadas)}')
+
+    def find_issue_by_label(self, etiqueta):
+        self.busquedas.append(etiqueta)
+        return self.existentes.get(etiqueta)
+
+
+class JiraOutboxTests(TestCase):
+    """El outbox no crea dos veces la incidencia de un ticket"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cliente = Cliente.objects.create(nombre='Banco Prueba', nomenclatura='BPR')
+        proyecto = Proyecto.objects.create(cliente=cliente, nombre='Portal', codigo='PRT-01', nomenclatura='PRT')
+        tipo = TipoServicio.objects.create(nombre='Funcionales', nomenclatura='FUN')
+        cls.ticket = Ticket.objects.create(
+            codigo='BID-PRU-FUN-V1-BPR-PRT-001', cliente=cliente, proyecto=proyecto, tipo_servicio=tipo,
+            tipo_servicio_code='PRU', funcion_code='FUN', version_code='V1',
+            cliente_code='BPR', proyecto_code='PRT', consecutivo=1,
+        )
+
+    def encolar(self, **kwargs):
+        return JiraOutbox.objects.create(ticket=self.ticket, payload={'codigo': self.ticket.codigo}, **kwargs)
+
+    def test_primer_intento_crea_sin_buscar(self):
+        item = self.encolar()
+        jira = JiraFalso()
+
+        process_jira_outbox(jira_client=jira)
+
+        item.refresh_from_db()
+        self.ticket.refresh_from_db()
+        self.assertEqual(item.estado, 'COMPLETADO')
+        self.assertEqual(jira.creadas, [self.ticket.codigo])
+        self.assertEqual(jira.busquedas, [])
+        self.assertEqual(self.ticket.jira_issue_key, 'QA01-1')
+
+    def test_reintento_reutiliza_la_incidencia_creada(self):
+        item = self.encolar(intentos=1)
+        jira = JiraFalso({etiqueta_ticket(self.ticket.codigo): IncidenciaFalsa('QA01-77')})
+
+        process_jira_outbox(jira_client=jira)
+
+        item.refresh_from_db()
+        self.ticket.refresh_from_db()
+        self.assertEqual(item.estado, 'COMPLETADO')
+        self.assertEqual(jira.creadas, [])
+        self.assertEqual(self.ticket.jira_issue_key, 'QA01-77')
+
+    def test_ticket_con_incidencia_no_llama_a_jira(self):
+        Ticket.objects.filter(pk=self.ticket.pk).update(jira_issue_key='QA01-5')
+        item = self.encolar(estado='PROCESANDO')
+        jira = JiraFalso()
+
+        process_jira_outbox(jira_client=jira)
+
+        item.refresh_from_db()
+        self.assertEqual(item.estado, 'COMPLETADO')
+        self.assertEqual((jira.creadas, jira.busquedas), ([], []))
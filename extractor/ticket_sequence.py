@@ -0,0 +1,88 @@
+# extractor/ticket_sequence.py
+"""
+Asignación de consecutivos para los códigos de ticket.
+
+Cada prefijo de código (empresa, servicio, función, versión, cliente,
+proyecto) tiene una fila en SecuenciaTicket con el último consecutivo usado.
+Reservar números es un UPDATE ultimo = ultimo + n sobre esa fila: la base de
+datos bloquea la fila hasta el final de la transacción, así que dos procesos
+nunca reciben el mismo número y no hace falta reintentar por choques con
+Ticket.codigo (unique).
+
+La fila se crea la primera vez que se usa una clave, partiendo del mayor
+consecutivo existente en Ticket. Si la creación del ticket falla después de
+reservar, el número se pierde (queda un hueco), igual que con una secuencia
+de base de datos.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+
+from .models import SecuenciaTicket, Ticket
+
+CAMPOS_CLAVE = ('empresa_code', 'tipo_servicio_code', 'funcion_code', 'version_code', 'cliente_code', 'proyecto_code')
+
+
+def clave(tipo_servicio_code, tipo_prueba, cliente_code, proyecto_code, empresa_code='BID'):
+    """
+    Clave de la secuencia (dict con los campos de Ticket que forman el prefijo)
+
+    Args:
+        tipo_servicio_code: PRU, EST, G&A...
+        tipo_prueba: objeto TipoServicio (aporta función y versión)
+        cliente_code: nomenclatura del cliente
+        proyecto_code: código del proyecto
+    """
+    return {
+        'empresa_code': empresa_code,
+        'tipo_servicio_code': tipo_servicio_code,
+        'funcion_code': tipo_prueba.nomenclatura,
+        'version_code': str(tipo_prueba.id),
+        'cliente_code': cliente_code,
+        'proyecto_code': proyecto_code,
+    }
+
+
+def _crear(clave):
+    """Crea la fila partiendo del mayor consecutivo ya usado en Ticket"""
+    maximo = Ticket.objects.filter(**clave).aggregate(maximo=Max('consecutivo'))['maximo'] or 0
+    try:
+        with transaction.atomic():
+            SecuenciaTicket.objects.create(ultimo=maximo, **clave)
+    except IntegrityError:
+        pass  # Otro proceso la creó al mismo tiempo
+
+
+def reservar(clave, cantidad=1):
+    """
+    Reserva `cantidad` consecutivos seguidos para la clave
+
+    Returns:
+        range: números reservados (p. ej. range(8, 11) para 3)
+    """
+    if cantidad < 1:
+        raise ValueError('La cantidad a reservar debe ser al menos 1')
+
+    with transaction.atomic():
+        fila = SecuenciaTicket.objects.filter(**clave)
+        if not fila.update(ultimo=F('ultimo') + cantidad):
+            _crear(clave)
+            fila.update(ultimo=F('ultimo') + cantidad)
+        ultimo = fila.values_list('ultimo', flat=True).get()
+
+    return range(ultimo - cantidad + 1, ultimo + 1)
+
+
+def siguiente(clave):
+    """Siguiente consecutivo de la clave"""
+    return reservar(clave)[0]
+
+
+def registrar(clave, consecutivo):
+    """
+    Avisa a la secuencia de un consecutivo elegido a mano para que los
+    siguientes automáticos no lo repitan
+    """
+    with transaction.atomic():
+        if not SecuenciaTicket.objects.filter(**clave).exists():
+            _crear(clave)
+        SecuenciaTicket.objects.filter(**clave, ultimo__lt=consecutivo).update(ultimo=consecutivo)
@@ -0,0 +1,155 @@
+# extractor/ticket_stats.py
+"""
+Mantenimiento y lectura de la tabla TicketDailyStats.
+
+Cada fila cuenta los tickets creados un día con una combinación de
+dimensiones (estado, cliente, proyecto, servicio, asignado, creador). Las
+solicitudes sin ticket se cuentan con estado 'SIN_TICKET' por su fecha de
+solicitud. Los periodos (mes, trimestre, año) se calculan sumando filas.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import Ticket, SolicitudPruebas, TicketDailyStats
+
+DIMENSIONES = ('estado', 'cliente_id', 'proyecto_id', 'tipo_servicio_id', 'asignado_a_id', 'creado_por_id')
+
+
+def clave_ticket(ticket):
+    """Fila de TicketDailyStats a la que pertenece un ticket (dict) o None"""
+    if not ticket.fecha_creacion:
+        return None
+    clave = {campo: getattr(ticket, campo) for campo in DIMENSIONES}
+    clave['fecha'] = timezone.localdate(ticket.fecha_creacion)
+    return clave
+
+
+def clave_solicitud(solicitud):
+    """Fila de una solicitud sin ticket, o None si ya tiene ticket"""
+    if solicitud.ticket_id or not solicitud.fecha_solicitud:
+        return None
+    return {
+        'fecha': solicitud.fecha_solicitud,
+        'estado': TicketDailyStats.ESTADO_SIN_TICKET,
+        'cliente_id': solicitud.cliente_id,
+        'proyecto_id': solicitud.proyecto_id,
+        # La solicitud guarda el servicio en tipo_prueba (FK a TipoServicio)
+        'tipo_servicio_id': solicitud.tipo_prueba_id,
+        'asignado_a_id': None,
+        'creado_por_id': None,
+    }
+
+
+def ajustar(clave, delta):
+    """Suma delta al contador de la fila indicada por clave, creándola si no existe"""
+    if not clave or not delta:
+        return
+
+    fila_id = TicketDailyStats.objects.filter(**clave).values_list('id', flat=True).first()
+    if fila_id is None:
+        if delta > 0:
+            TicketDailyStats.objects.create(total=delta, **clave)
+        return
+
+    TicketDailyStats.objects.filter(id=fila_id).update(total=F('total') + delta)
+
+
+def mover(clave_anterior, clave_nueva):
+    """Mueve un elemento de una fila a otra si su clave cambió"""
+    if clave_anterior == clave_nueva:
+        return
+    ajustar(clave_anterior, -1)
+    ajustar(clave_nueva, 1)
+
+
+def reconstruir(desde=None, hasta=None):
+    """
+    Recalcula la tabla desde Ticket y SolicitudPruebas con consultas agrupadas
+
+    Args:
+        desde, hasta: Rango de fechas (date) a reconstruir; None = todo
+
+    Returns:
+        int: filas creadas
+    """
+    tickets = Ticket.objects.order_by().annotate(fecha=TruncDate('fecha_creacion'))
+    solicitudes = SolicitudPruebas.objects.order_by().filter(ticket__isnull=True)
+    existentes = TicketDailyStats.objects.all()
+    if desde:
+        tickets = tickets.filter(fecha__gte=desde)
+        solicitudes = solicitudes.filter(fecha_solicitud__gte=desde)
+        existentes = existentes.filter(fecha__gte=desde)
+    if hasta:
+        tickets = tickets.filter(fecha__lte=hasta)
+        solicitudes = solicitudes.filter(fecha_solicitud__lte=hasta)
+        existentes = existentes.filter(fecha__lte=hasta)
+
+    filas = [
+        TicketDailyStats(total=fila.pop('total'), **fila)
+        for fila in tickets.values('fecha', *DIMENSIONES).annotate(total=Count('id'))
+    ]
+    filas += [
+        TicketDailyStats(
+            fecha=fila['fecha_solicitud'],
+            estado=TicketDailyStats.ESTADO_SIN_TICKET,
+            cliente_id=fila['cliente_id'],
+            proyecto_id=fila['proyecto_id'],
+            tipo_servicio_id=fila['tipo_prueba_id'],
+            total=fila['total'],
+        )
+        for fila in solicitudes.values('fecha_solicitud', 'cliente_id', 'proyecto_id', 'tipo_prueba_id').annotate(total=Count('id'))
+    ]
+
+    with transaction.atomic():
+        existentes.delete()
+        TicketDailyStats.objects.bulk_create(filas, batch_size=1000)
+
+    return len(filas)
+
+
+# ========== LECTURA ==========
+
+def estadisticas(desde=None, hasta=None, incluir_sin_ticket=False, **filtros):
+    """
+    Filas de la tabla en un rango de fechas (inclusive) con filtros por dimensión
+
+    Args:
+        desde, hasta: date
+        incluir_sin_ticket: si es False solo devuelve filas de tickets
+        **filtros: filtros de queryset adicionales (cliente_id=..., estado=...)
+    """
+    filas = TicketDailyStats.objects.order_by()
+    if not incluir_sin_ticket:
+        filas = filas.exclude(estado=TicketDailyStats.ESTADO_SIN_TICKET)
+    if desde:
+        filas = filas.filter(fecha__gte=desde)
+    if hasta:
+        filas = filas.filter(fecha__lte=hasta)
+    if filtros:
+        filas = filas.filter(**filtros)
+    return filas
+
+
+def total(filas, condicion=None):
+    """Suma de 'total' de las filas, opcionalmente con una condición Q"""
+    return filas.aggregate(
+        suma=Coalesce(Sum('total', filter=condicion), 0)
+    )['suma']
+
+
+def conteo_por_estado(filas):
+    """{estado: total} con una consulta agrupada"""
+    return {
+        fila['estado']: fila['suma']
+        for fila in filas.values('estado').annotate(suma=Sum('total'))
+    }
+
+
+def totales_usuario(usuario):
+    """Totales históricos de tickets creados y asignados por un usuario (una consulta)"""
+    return TicketDailyStats.objects.exclude(estado=TicketDailyStats.ESTADO_SIN_TICKET).aggregate(
+        creados=Coalesce(Sum('total', filter=Q(creado_por=usuario)), 0),
+        asignados=Coalesce(Sum('total', filter=Q(asignado_a=usuario)), 0),
+    )
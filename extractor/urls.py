@@ -17,6 +17,7 @@ urlpatterns = [
     
     # Upload Excel
     path('upload/', views.upload_excel, name='upload_excel'),
+    path('upload/lote/', views.upload_excel_batch, name='upload_excel_batch'),
     path('data/', views.data_list, name='data_list'),
     
     # Tickets
@@ -89,6 +90,7 @@ urlpatterns = [
     # Documentos
     path('ticket/<int:ticket_id>/dictamen/', views.generar_excel_dictamen, name='generar_excel_dictamen'),
     path('ticket/<int:ticket_id>/resultados/', views.generar_excel_resultados, name='generar_excel_resultados'),
+    path('tickets/documentos/lote/', views.generar_documentos_lote, name='generar_documentos_lote'),
     path('verificar-plantilla/', views.verificar_plantilla, name='verificar_plantilla'),
 
     path('dashboard-lider/', views.dashboard_lider, name='dashboard_lider'),
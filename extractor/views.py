@@ -43,9 +43,10 @@ from apps.tickets.views.ticket_files import (
 
 # ===== EXCEL PROCESSOR =====
 from apps.excel_processor.views.upload import upload_excel
+from apps.excel_processor.views.batch import upload_excel_batch
 from apps.excel_processor.views.data import data_list, export_data_csv, data_detail
 from apps.excel_processor.views.generate import (
-    generar_excel_dictamen, generar_excel_resultados, verificar_plantilla
+    generar_excel_dictamen, generar_excel_resultados, generar_documentos_lote, verificar_plantilla
 )
 from apps.excel_processor.views.export import export_table_csv, export_all_tables_backup
 
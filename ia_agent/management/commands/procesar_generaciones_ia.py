@@ -0,0 +1,45 @@
+# ia_agent/management/commands/procesar_generaciones_ia.py
+import time
+
+from django.core.management.base import BaseCommand
+from ia_agent.services.generacion_jobs import recuperar_pendientes
+
+
+class Command(BaseCommand):
+    help = 'Procesa las generaciones de casos de prueba con IA pendientes o huérfanas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los requerimientos pendientes y termina (útil para cron)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Segundos de espera cuando no hay generaciones pendientes (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        once = options['once']
+        sleep = options['sleep']
+
+        self.stdout.write(self.style.WARNING('🔄 Procesando generaciones de IA...'))
+
+        try:
+            while True:
+                procesados = recuperar_pendientes(ejecutar_en_linea=True)
+
+                if procesados:
+                    self.stdout.write(f"📊 Requerimientos procesados: {procesados}")
+                    continue
+
+                if once:
+                    break
+
+                time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('✅ Generaciones de IA procesadas'))
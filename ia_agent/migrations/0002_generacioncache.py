@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia_agent', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneracionCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(help_text='SHA-256 de prompt + modelo + configuración', max_length=64, unique=True)),
+                ('modelo', models.CharField(max_length=100)),
+                ('casos', models.JSONField(default=list)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Caché de Generación',
+                'verbose_name_plural': 'Caché de Generaciones',
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def cerrar_procesando_anteriores(apps, schema_editor):
+    """
+    Los 'procesando' de antes de la cola quedaron así cuando la petición falló
+    o venció el timeout de gunicorn. No tienen parámetros para repetirse, así
+    que se marcan como error en vez de dejarlos a la recuperación automática.
+    """
+    Requerimiento = apps.get_model('ia_agent', 'Requerimiento')
+    Requerimiento.objects.filter(estado='procesando', fecha_inicio_proceso__isnull=True).update(
+        estado='error',
+        mensaje_error='Generación interrumpida antes de la actualización; vuelve a generarla',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia_agent', '0002_generacioncache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requerimiento',
+            name='creado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requerimientos_ia', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='requerimiento',
+            name='fecha_inicio_proceso',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='requerimiento',
+            name='mensaje_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='requerimiento',
+            name='parametros',
+            field=models.JSONField(blank=True, default=dict, help_text='Contexto y configuración de la generación'),
+        ),
+        migrations.RunPython(cerrar_procesando_anteriores, migrations.RunPython.noop),
+    ]
@@ -35,6 +35,18 @@ class Requerimiento(models.Model):
     contenido_extraido = models.TextField(help_text="Contenido extraído de la fuente")
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
     
+    # Trabajo de generación en segundo plano
+    parametros = models.JSONField(default=dict, blank=True, help_text="Contexto y configuración de la generación")
+    mensaje_error = models.TextField(blank=True, default='')
+    fecha_inicio_proceso = models.DateTimeField(null=True, blank=True)
+    creado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='requerimientos_ia'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -137,4 +149,24 @@ class EjecucionPrueba(models.Model):
         verbose_name_plural = 'Ejecuciones de Pruebas'
     
     def __str__(self):
-        return f"{self.caso_prueba.identificador} - {self.get_resultado_display()} - {self.fecha_ejecucion}"
\ No newline at end of file
+        return f"{self.caso_prueba.identificador} - {self.get_resultado_display()} - {self.fecha_ejecucion}"
+
+class GeneracionCache(models.Model):
+    """
+    Caché de casos generados por IA, direccionada por contenido: la clave es
+    el hash del prompt construido más el modelo y la configuración.
+    """
+    clave = models.CharField(max_length=64, unique=True, help_text="SHA-256 de prompt + modelo + configuración")
+    modelo = models.CharField(max_length=100)
+    casos = models.JSONField(default=list)
+    hits = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        verbose_name = 'Caché de Generación'
+        verbose_name_plural = 'Caché de Generaciones'
+    
+    def __str__(self):
+        return f"{self.clave[:12]} - {self.modelo} ({len(self.casos)} casos)"
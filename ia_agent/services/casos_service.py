@@ -0,0 +1,119 @@
+# ia_agent/services/casos_service.py
+"""
+Persistencia de los casos de prueba generados (IA o fallback).
+
+Normaliza cada caso al esquema de CasoPrueba y los guarda con un único
+bulk_create, actualizando el Requerimiento en la misma transacción.
+"""
+import logging
+from typing import Dict, List, Optional
+
+from django.db import transaction
+
+from ia_agent.models import CasoPrueba
+
+logger = logging.getLogger(__name__)
+
+PRIORIDAD_POR_RIESGO = {
+    'alto': 'alta',
+    'medio': 'media',
+    'bajo': 'baja',
+}
+PRIORIDADES_VALIDAS = {valor for valor, _ in CasoPrueba.PRIORIDAD_CHOICES}
+
+_IDENTIFICADOR_MAX = CasoPrueba._meta.get_field('identificador').max_length
+_TITULO_MAX = CasoPrueba._meta.get_field('titulo').max_length
+
+
+def _como_lista(valor) -> List:
+    if valor is None or valor == '':
+        return []
+    if isinstance(valor, (list, tuple)):
+        return [item for item in valor if item not in (None, '')]
+    return [valor]
+
+
+def normalizar_caso(caso_data: Dict, indice: int) -> Optional[Dict]:
+    """
+    Valida un caso devuelto por la IA y lo lleva a los campos de CasoPrueba
+    
+    Args:
+        caso_data: Caso tal como lo devolvió Gemini o el fallback
+        indice: Posición (1-based) usada para el identificador por defecto
+    
+    Returns:
+        Dict con los campos del modelo, o None si el caso no es utilizable
+    """
+    if not isinstance(caso_data, dict):
+        logger.warning(f"Caso {indice} descartado: no es un objeto ({type(caso_data).__name__})")
+        return None
+    
+    titulo = str(caso_data.get('titulo') or '').strip()
+    if not titulo:
+        logger.warning(f"Caso {indice} descartado: sin título")
+        return None
+    
+    # nivel_riesgo (esquema del prompt) manda sobre prioridad
+    nivel_riesgo = str(caso_data.get('nivel_riesgo') or '').strip().lower()
+    prioridad = PRIORIDAD_POR_RIESGO.get(nivel_riesgo) or str(caso_data.get('prioridad') or '').strip().lower()
+    if prioridad not in PRIORIDADES_VALIDAS:
+        prioridad = 'media'
+    
+    datos_prueba = caso_data.get('datos_prueba')
+    if not isinstance(datos_prueba, dict):
+        datos_prueba = {'valor': datos_prueba} if datos_prueba else {}
+    
+    identificador = str(caso_data.get('identificador') or f"TC-{indice:03d}").strip()
+    
+    return {
+        'identificador': identificador[:_IDENTIFICADOR_MAX],
+        'titulo': titulo[:_TITULO_MAX],
+        'descripcion': str(caso_data.get('descripcion') or ''),
+        'precondiciones': '\n'.join(str(p) for p in _como_lista(caso_data.get('precondiciones'))),
+        'pasos': _como_lista(caso_data.get('pasos')),
+        'resultados_esperados': _como_lista(caso_data.get('resultados_esperados')),
+        'datos_prueba': datos_prueba,
+        'prioridad': prioridad,
+    }
+
+
+def guardar_casos_generados(requerimiento, casos_generados: List[Dict], usuario=None) -> List[CasoPrueba]:
+    """
+    Guarda todos los casos del requerimiento con un solo INSERT y lo marca
+    como completado en la misma transacción
+    
+    Args:
+        requerimiento: Requerimiento al que pertenecen los casos
+        casos_generados: Lista devuelta por IAService.generar_casos_prueba
+        usuario: Autor de los casos (por defecto requerimiento.creado_por)
+    
+    Returns:
+        Lista de CasoPrueba creados
+    """
+    origen = requerimiento.ticket or requerimiento.solicitud
+    autor = usuario if usuario is not None else requerimiento.creado_por
+    
+    casos = []
+    for indice, caso_data in enumerate(casos_generados or [], start=1):
+        campos = normalizar_caso(caso_data, indice)
+        if campos is None:
+            continue
+        casos.append(CasoPrueba(
+            requerimiento=requerimiento,
+            ticket=requerimiento.ticket,
+            solicitud=requerimiento.solicitud,
+            proyecto=origen.proyecto if origen else None,
+            cliente=origen.cliente if origen else None,
+            estado='borrador',
+            created_by=autor,
+            **campos
+        ))
+    
+    with transaction.atomic():
+        creados = CasoPrueba.objects.bulk_create(casos)
+        requerimiento.estado = 'completado'
+        requerimiento.mensaje_error = ''
+        requerimiento.save(update_fields=['estado', 'mensaje_error', 'updated_at'])
+    
+    logger.info(f"💾 {len(creados)} casos guardados para requerimiento {requerimiento.id}")
+    return creados
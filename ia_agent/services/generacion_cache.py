@@ -0,0 +1,91 @@
+# ia_agent/services/generacion_cache.py
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Vigencia y tamaño máximo de la caché (configurables en settings)
+CACHE_TTL = timedelta(days=getattr(settings, 'IA_GENERACION_CACHE_TTL_DIAS', 7))
+CACHE_MAX_ENTRADAS = getattr(settings, 'IA_GENERACION_CACHE_MAX_ENTRADAS', 500)
+
+
+def calcular_clave(prompt: str, model_name: str, generation_config: Dict, config: Optional[Dict] = None) -> str:
+    """Hash SHA-256 del prompt construido + modelo + configuración de generación"""
+    material = json.dumps(
+        {
+            'prompt': prompt,
+            'model': model_name,
+            'generation_config': generation_config,
+            'config': config or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def obtener(clave: str) -> Optional[List[Dict]]:
+    """Devuelve los casos guardados para la clave, o None si no hay o expiró"""
+    from ia_agent.models import GeneracionCache
+    
+    entrada = GeneracionCache.objects.filter(
+        clave=clave,
+        created_at__gte=timezone.now() - CACHE_TTL
+    ).first()
+    if not entrada:
+        return None
+    
+    GeneracionCache.objects.filter(pk=entrada.pk).update(
+        hits=F('hits') + 1,
+        last_used_at=timezone.now()
+    )
+    logger.info(f"♻️ Casos servidos desde caché ({clave[:12]}, {len(entrada.casos)} casos)")
+    return entrada.casos
+
+
+def guardar(clave: str, model_name: str, casos: List[Dict]) -> None:
+    """Guarda (o reemplaza) los casos de una clave y aplica la política de expulsión"""
+    from ia_agent.models import GeneracionCache
+    
+    try:
+        GeneracionCache.objects.update_or_create(
+            clave=clave,
+            defaults={
+                'modelo': model_name,
+                'casos': casos,
+                'created_at': timezone.now(),
+                'last_used_at': timezone.now(),
+            }
+        )
+        purgar()
+    except Exception as e:
+        logger.warning(f"No se pudo guardar la generación en caché: {e}")
+
+
+def purgar() -> int:
+    """
+    Elimina entradas vencidas por TTL y, si se supera CACHE_MAX_ENTRADAS, las
+    menos usadas recientemente
+    
+    Returns:
+        int: número de entradas eliminadas
+    """
+    from ia_agent.models import GeneracionCache
+    
+    eliminadas, _ = GeneracionCache.objects.filter(created_at__lt=timezone.now() - CACHE_TTL).delete()
+    
+    sobrantes = list(
+        GeneracionCache.objects.order_by('-last_used_at').values_list('pk', flat=True)[CACHE_MAX_ENTRADAS:]
+    )
+    if sobrantes:
+        eliminadas += GeneracionCache.objects.filter(pk__in=sobrantes).delete()[0]
+    
+    return eliminadas
@@ -0,0 +1,175 @@
+# ia_agent/services/generacion_jobs.py
+"""
+Ejecución en segundo plano de la generación de casos de prueba.
+
+El propio Requerimiento es el trabajo: la vista lo crea en estado 'pendiente'
+con los parámetros de la generación y responde de inmediato; un pool de hilos
+acotado lo pasa a 'procesando', llama a Gemini y lo deja en 'completado' o
+'error'. El front consulta el estado con un endpoint ligero.
+
+Si el proceso que tenía un trabajo muere (reinicio, timeout de gunicorn), el
+trabajo se recupera solo: cada proceso reencola los pendientes y los
+'procesando' huérfanos al crear su pool y, después, como mucho una vez por
+JOB_RECOVERY_SECONDS mientras el front consulte un trabajo sin terminar.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .casos_service import guardar_casos_generados
+from .ia_service import get_ia_service
+
+logger = logging.getLogger(__name__)
+
+# Generaciones simultáneas por proceso
+JOB_MAX_WORKERS = getattr(settings, 'IA_JOB_MAX_WORKERS', 2)
+# Un trabajo 'procesando' más antiguo que esto se considera huérfano (reinicio del proceso)
+JOB_STALE_SECONDS = getattr(settings, 'IA_JOB_STALE_SECONDS', 600)
+# Intervalo mínimo entre búsquedas de trabajos pendientes o huérfanos por proceso
+JOB_RECOVERY_SECONDS = getattr(settings, 'IA_JOB_RECOVERY_SECONDS', 60)
+
+_executor = None
+_executor_lock = threading.Lock()
+_ultima_recuperacion = None
+
+
+def _get_executor():
+    global _executor
+    creado = False
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=JOB_MAX_WORKERS, thread_name_prefix='ia-generacion')
+                creado = True
+    if creado:
+        programar_recuperacion()
+    return _executor
+
+
+def _recuperar_en_pool():
+    close_old_connections()
+    try:
+        reencolados = recuperar_pendientes()
+        if reencolados:
+            logger.info(f"🔁 {reencolados} generaciones pendientes reencoladas")
+    except Exception as e:
+        logger.error(f"Error recuperando generaciones pendientes: {str(e)}", exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def programar_recuperacion():
+    """
+    Reencola en el pool los trabajos pendientes y huérfanos, como mucho una
+    vez cada JOB_RECOVERY_SECONDS por proceso
+    """
+    global _ultima_recuperacion
+    ahora = time.monotonic()
+    with _executor_lock:
+        if _ultima_recuperacion is not None and ahora - _ultima_recuperacion < JOB_RECOVERY_SECONDS:
+            return
+        _ultima_recuperacion = ahora
+    _get_executor().submit(_recuperar_en_pool)
+
+
+def encolar_generacion(requerimiento, contexto=None, config=None, forzar=False, usuario=None):
+    """
+    Guarda los parámetros en el requerimiento y lo programa para el pool al
+    confirmar la transacción actual.
+    """
+    requerimiento.parametros = {
+        'contexto': contexto,
+        'config': config,
+        'forzar': forzar,
+    }
+    requerimiento.estado = 'pendiente'
+    requerimiento.mensaje_error = ''
+    if usuario is not None and getattr(usuario, 'is_authenticated', False):
+        requerimiento.creado_por = usuario
+    requerimiento.save()
+    
+    requerimiento_id = requerimiento.id
+    transaction.on_commit(lambda: _get_executor().submit(ejecutar_generacion, requerimiento_id))
+    logger.info(f"🕒 Generación encolada para requerimiento {requerimiento_id}")
+    return requerimiento
+
+
+def _reclamar(requerimiento_id):
+    """Pasa el requerimiento de 'pendiente' a 'procesando'; False si otro lo tomó"""
+    from ia_agent.models import Requerimiento
+    
+    return Requerimiento.objects.filter(id=requerimiento_id, estado='pendiente').update(
+        estado='procesando',
+        fecha_inicio_proceso=timezone.now()
+    ) == 1
+
+
+def ejecutar_generacion(requerimiento_id):
+    """Tarea del pool: genera y guarda los casos de un requerimiento pendiente"""
+    from ia_agent.models import Requerimiento
+    
+    close_old_connections()
+    try:
+        if not _reclamar(requerimiento_id):
+            return
+        
+        requerimiento = Requerimiento.objects.select_related(
+            'ticket__proyecto', 'ticket__cliente', 'solicitud__proyecto', 'solicitud__cliente', 'creado_por'
+        ).get(id=requerimiento_id)
+        parametros = requerimiento.parametros or {}
+        
+        try:
+            casos_generados = get_ia_service().generar_casos_prueba(
+                requerimiento.contenido_extraido,
+                parametros.get('contexto'),
+                parametros.get('config'),
+                forzar=parametros.get('forzar', False)
+            )
+            logger.info(f"IA generó {len(casos_generados)} casos para requerimiento {requerimiento_id}")
+            
+            guardar_casos_generados(requerimiento, casos_generados)
+        except Exception as e:
+            logger.error(f"Error generando casos para requerimiento {requerimiento_id}: {str(e)}", exc_info=True)
+            requerimiento.estado = 'error'
+            requerimiento.mensaje_error = str(e)[:1000]
+            requerimiento.save(update_fields=['estado', 'mensaje_error', 'updated_at'])
+    finally:
+        close_old_connections()
+
+
+def recuperar_pendientes(ejecutar_en_linea=False):
+    """
+    Reencola los requerimientos pendientes y los 'procesando' huérfanos (por
+    ejemplo tras reiniciar el servidor).
+    
+    Solo se recuperan los que tienen fecha_inicio_proceso: los 'procesando'
+    sin ella son anteriores a la cola (ver migración 0003) y no guardan los
+    parámetros para repetir la generación.
+    
+    Args:
+        ejecutar_en_linea: Si es True los procesa en el hilo actual en vez de usar el pool
+    
+    Returns:
+        int: número de requerimientos reencolados
+    """
+    from ia_agent.models import Requerimiento
+    
+    limite = timezone.now() - timedelta(seconds=JOB_STALE_SECONDS)
+    huerfanos = Requerimiento.objects.filter(estado='procesando', fecha_inicio_proceso__lt=limite)
+    huerfanos.update(estado='pendiente')
+    
+    ids = list(
+        Requerimiento.objects.filter(estado='pendiente').order_by('created_at').values_list('id', flat=True)
+    )
+    for requerimiento_id in ids:
+        if ejecutar_en_linea:
+            ejecutar_generacion(requerimiento_id)
+        else:
+            _get_executor().submit(ejecutar_generacion, requerimiento_id)
+    return len(ids)
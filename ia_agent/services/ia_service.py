@@ -1,52 +1,186 @@
 # ia_agent/services/ia_service.py
 import json
 import logging
+import os
+import threading
+import time
 from typing import Dict, List, Optional
 from django.conf import settings
 import google.generativeai as genai
 
+from . import generacion_cache
+
 logger = logging.getLogger(__name__)
 
+# Modelos a usar en orden de preferencia
+MODELOS_PREFERIDOS = [
+    'models/gemini-2.5-flash',     # ✅ Este funciona (según tu prueba)
+    'models/gemini-1.5-flash',     # Alternativa estable
+    'models/gemini-1.5-pro', 
+]
+
+# Vigencia del modelo elegido guardado en disco (segundos)
+MODEL_CACHE_TTL = 24 * 60 * 60
+
+# Temperatura baja para respuestas más consistentes
+GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "top_p": 0.95,
+    "max_output_tokens": 8192,
+}
+
+
+def _model_cache_path():
+    cache_dir = getattr(settings, 'IA_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'ia_agent'))
+    return os.path.join(cache_dir, 'gemini_model.json')
+
+
+def _leer_modelo_cacheado():
+    """Devuelve (model_name, timestamp) guardado en disco o (None, 0)"""
+    try:
+        with open(_model_cache_path(), encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('model_name'), data.get('resolved_at', 0)
+    except (OSError, ValueError):
+        return None, 0
+
+
+def _guardar_modelo_cacheado(model_name):
+    path = _model_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'model_name': model_name, 'resolved_at': time.time()}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el modelo en caché: {e}")
+
+
+_ia_service = None
+_ia_service_lock = threading.Lock()
+
+
+def get_ia_service():
+    """Devuelve el IAService compartido por el proceso (vistas y trabajos en segundo plano)"""
+    global _ia_service
+    if _ia_service is None:
+        with _ia_service_lock:
+            if _ia_service is None:
+                _ia_service = IAService()
+    return _ia_service
+
+
 class IAService:
     def __init__(self):
+        # No se hace ninguna llamada de red al construir el servicio: el modelo
+        # se resuelve en el primer uso (ver la propiedad model)
         self.api_key = getattr(settings, 'GEMINI_API_KEY', None)
         self.use_fallback = False
-        self.model = None
+        self._model = None
+        self._model_name = None
+        self._configured = False
+        self._lock = threading.Lock()
+        self._probe_thread = None
         
         if not self.api_key:
             logger.warning("⚠️ GEMINI_API_KEY no configurada")
             self.use_fallback = True
-            return
-        
-        try:
+    
+    @property
+    def model(self):
+        """Modelo de Gemini, resuelto de forma perezosa en el primer uso"""
+        if self.use_fallback:
+            return None
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._resolver_modelo()
+        return self._model
+    
+    def _configurar(self):
+        if not self._configured:
             genai.configure(api_key=self.api_key)
+            self._configured = True
+    
+    def _buscar_modelo_disponible(self):
+        """
+        Elige el primer modelo preferido que soporte generateContent usando
+        list_models (metadatos), sin generar contenido de prueba
+        """
+        self._configurar()
+        disponibles = {
+            m.name for m in genai.list_models()
+            if 'generateContent' in getattr(m, 'supported_generation_methods', [])
+        }
+        for model_name in MODELOS_PREFERIDOS:
+            if model_name in disponibles:
+                return model_name
+        return None
+    
+    def _resolver_modelo(self):
+        """Usa el modelo guardado en disco si está vigente; si no, lo busca"""
+        try:
+            self._configurar()
+            model_name, resolved_at = _leer_modelo_cacheado()
+            edad = time.time() - resolved_at
             
-            # Lista de modelos a probar en orden de preferencia
-            modelos_a_probar = [
-                'models/gemini-2.5-flash',     # ✅ Este funciona (según tu prueba)
-                'models/gemini-1.5-flash',     # Alternativa estable
-                'models/gemini-1.5-pro', 
-            ]
-            
-            for model_name in modelos_a_probar:
-                try:
-                    self.model = genai.GenerativeModel(model_name)
-                    test_response = self.model.generate_content("Test connection")
-                    if test_response and test_response.text:
-                        logger.info(f"✅ Gemini conectado con modelo: {model_name}")
-                        self.use_fallback = False
-                        break
-                except Exception as e:
-                    logger.warning(f"Error con modelo {model_name}: {e}")
-                    continue
+            if not model_name or edad > MODEL_CACHE_TTL:
+                model_name = self._buscar_modelo_disponible()
+                if model_name:
+                    _guardar_modelo_cacheado(model_name)
+            elif edad > MODEL_CACHE_TTL / 2:
+                # Vigente pero por vencer: refrescar en segundo plano
+                self.iniciar_sondeo_salud()
             
-            if not self.model:
+            if not model_name:
                 logger.error("No se pudo conectar con ningún modelo")
                 self.use_fallback = True
-                
+                return
+            
+            self._model = genai.GenerativeModel(model_name)
+            self._model_name = model_name
+            logger.info(f"✅ Gemini configurado con modelo: {model_name}")
+            
         except Exception as e:
             logger.error(f"Error configurando Gemini: {e}")
-            self.use_fallback = True
+            self._model = None
+    
+    def iniciar_sondeo_salud(self):
+        """
+        Lanza en un hilo de fondo la verificación de modelos disponibles y
+        actualiza la caché en disco (y el modelo en uso si cambió)
+        """
+        if self.use_fallback or (self._probe_thread and self._probe_thread.is_alive()):
+            return
+        
+        def _sondear():
+            try:
+                model_name = self._buscar_modelo_disponible()
+                if not model_name:
+                    logger.warning("⚠️ Sondeo de Gemini: ningún modelo preferido disponible")
+                    return
+                _guardar_modelo_cacheado(model_name)
+                if model_name != self._model_name:
+                    with self._lock:
+                        self._model = genai.GenerativeModel(model_name)
+                        self._model_name = model_name
+                    logger.info(f"🔄 Sondeo de Gemini: modelo actualizado a {model_name}")
+            except Exception as e:
+                logger.warning(f"⚠️ Sondeo de Gemini falló: {e}")
+        
+        self._probe_thread = threading.Thread(target=_sondear, name='gemini-health-probe', daemon=True)
+        self._probe_thread.start()
+    
+    def _invalidar_modelo(self):
+        """Descarta el modelo actual (ej: el modelo dejó de existir) para volver a resolverlo"""
+        with self._lock:
+            self._model = None
+            self._model_name = None
+        try:
+            os.remove(_model_cache_path())
+        except OSError:
+            pass
     
     def _limpiar_respuesta(self, texto: str) -> str:
         """Limpia la respuesta de Gemini para extraer JSON válido"""
@@ -62,7 +196,8 @@ class IAService:
     def generar_casos_prueba(self, 
                             requerimiento_texto: str, 
                             contexto: Optional[Dict] = None,
-                            config: Optional[Dict] = None) -> List[Dict]:
+                            config: Optional[Dict] = None,
+                            forzar: bool = False) -> List[Dict]:
         """
         Genera casos de prueba funcionales enfocados en riesgo
         
@@ -70,6 +205,7 @@ class IAService:
             requerimiento_texto: Texto del requerimiento
             contexto: Diccionario con información contextual (proyecto, cliente, etc)
             config: Configuración de generación
+            forzar: Ignora la caché y vuelve a llamar a Gemini
         """
         
         if self.use_fallback or not self.model:
@@ -100,17 +236,17 @@ class IAService:
             # Construir el prompt con enfoque en riesgo
             prompt = self._construir_prompt_riesgo(requerimiento_texto, contexto, config)
             
-            # Temperatura baja para respuestas más consistentes
-            temperature = 0.2
+            # Misma solicitud + modelo + configuración => mismos casos
+            clave = generacion_cache.calcular_clave(prompt, self._model_name, GENERATION_CONFIG, config)
+            if not forzar:
+                casos = generacion_cache.obtener(clave)
+                if casos is not None:
+                    return casos
             
             # Generar respuesta
             response = self.model.generate_content(
                 prompt,
-                generation_config={
-                    "temperature": temperature,
-                    "top_p": 0.95,
-                    "max_output_tokens": 8192,
-                }
+                generation_config=GENERATION_CONFIG
             )
             
             # Extraer y parsear JSON
@@ -119,6 +255,7 @@ class IAService:
                 casos = json.loads(texto_limpio)
                 logger.info(f"✅ Generados {len(casos)} casos de prueba funcionales con enfoque en riesgo")
                 logger.info(f"📊 Distribución configurada: Alto: {config.get('alto_riesgo_pct')}%, Medio: {config.get('medio_riesgo_pct')}%, Bajo: {config.get('bajo_riesgo_pct')}%")
+                generacion_cache.guardar(clave, self._model_name, casos)
                 return casos
             else:
                 logger.error("Respuesta vacía de Gemini")
@@ -130,6 +267,8 @@ class IAService:
             return self._generar_fallback(requerimiento_texto, config)
         except Exception as e:
             logger.error(f"Error generando casos: {e}")
+            if 'not found' in str(e).lower() or '404' in str(e):
+                self._invalidar_modelo()
             return self._generar_fallback(requerimiento_texto, config)
     
     def _construir_prompt_riesgo(self, 
@@ -22,6 +22,7 @@ urlpatterns = [
     
     # API
     path('api/generar/', views.api_generar_casos, name='api_generar'),
+    path('api/generacion/<int:requerimiento_id>/estado/', views.estado_generacion, name='estado_generacion'),
 
     
 ]
\ No newline at end of file
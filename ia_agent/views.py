@@ -10,10 +10,37 @@ from django.urls import reverse
 
 from extractor.models import Ticket, SolicitudPruebas, Proyecto
 from .models import Requerimiento, CasoPrueba, EjecucionPrueba
-from .services.ia_service import IAService
+from .services.ia_service import get_ia_service
+from .services.generacion_jobs import encolar_generacion, programar_recuperacion
 
 logger = logging.getLogger(__name__)
-ia_service = IAService()
+ia_service = get_ia_service()
+
+
+def _es_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+def _url_resultado(requerimiento):
+    """URL donde se ven los casos generados de un requerimiento"""
+    if requerimiento.ticket_id:
+        return reverse('ia_agent:ver_casos_ticket', kwargs={'ticket_id': requerimiento.ticket_id})
+    if requerimiento.solicitud_id:
+        return reverse('ia_agent:ver_casos_solicitud', kwargs={'solicitud_id': requerimiento.solicitud_id})
+    return reverse('ia_agent:ver_casos_requerimiento', kwargs={'requerimiento_id': requerimiento.id})
+
+
+def _respuesta_encolada(request, requerimiento, redirect_url):
+    """Responde a una generación encolada: JSON para el front, redirect sin JS"""
+    if _es_ajax(request):
+        return JsonResponse({
+            'requerimiento_id': requerimiento.id,
+            'estado': requerimiento.estado,
+            'estado_url': reverse('ia_agent:estado_generacion', kwargs={'requerimiento_id': requerimiento.id}),
+        }, status=202)
+    
+    messages.info(request, '🕒 La generación de casos se está procesando en segundo plano. Actualiza la página en unos segundos.')
+    return redirect(redirect_url)
 
 @login_required
 def generar_desde_ticket(request, ticket_id):
@@ -25,6 +52,7 @@ def generar_desde_ticket(request, ticket_id):
             # Obtener configuraciones del formulario
             incluir_negativos = request.POST.get('incluir_negativos') == 'on'
             detallado = request.POST.get('detallado') == 'on'
+            forzar = request.POST.get('forzar_regeneracion') == 'on'
             
             # Leer número de casos del formulario
             num_casos = int(request.POST.get('num_casos', 8))
@@ -106,57 +134,19 @@ Justificación del Cambio:
                 descripcion=requerimiento_texto[:500],
                 fuente='ticket',
                 contenido_extraido=requerimiento_texto,
-                estado='procesando'
+                estado='pendiente',
+                creado_por=request.user
             )
             
-            # Generar casos con IA usando configuraciones
-            casos_generados = ia_service.generar_casos_prueba(
-                requerimiento_texto,
-                contexto,
-                config
-            )
-            
-            logger.info(f"IA generó {len(casos_generados)} casos")
-            
-            # Guardar casos generados
-            casos_creados = []
-            for idx, caso_data in enumerate(casos_generados):
-                # Convertir nivel_riesgo a prioridad si es necesario
-                prioridad = caso_data.get('prioridad', 'media')
-                nivel_riesgo = caso_data.get('nivel_riesgo', '')
-                if nivel_riesgo == 'alto':
-                    prioridad = 'alta'
-                elif nivel_riesgo == 'medio':
-                    prioridad = 'media'
-                elif nivel_riesgo == 'bajo':
-                    prioridad = 'baja'
-                
-                caso = CasoPrueba.objects.create(
-                    requerimiento=requerimiento,
-                    ticket=ticket,
-                    proyecto=ticket.proyecto,
-                    cliente=ticket.cliente,
-                    identificador=caso_data.get('identificador', f"TC-{len(casos_creados)+1:03d}"),
-                    titulo=caso_data.get('titulo', ''),
-                    descripcion=caso_data.get('descripcion', ''),
-                    precondiciones='\n'.join(caso_data.get('precondiciones', [])),
-                    pasos=caso_data.get('pasos', []),
-                    resultados_esperados=caso_data.get('resultados_esperados', []),
-                    datos_prueba=caso_data.get('datos_prueba', {}),
-                    prioridad=prioridad,
-                    estado='borrador',
-                    created_by=request.user
-                )
-                casos_creados.append(caso)
-            
-            requerimiento.estado = 'completado'
-            requerimiento.save()
+            # Generar casos con IA en segundo plano
+            encolar_generacion(requerimiento, contexto, config, forzar=forzar, usuario=request.user)
             
-            messages.success(request, f'✅ Se generaron {len(casos_creados)} casos de prueba con IA')
-            return redirect('ia_agent:ver_casos_ticket', ticket_id=ticket.id)
+            return _respuesta_encolada(request, requerimiento, _url_resultado(requerimiento))
             
         except Exception as e:
             logger.error(f"Error generando casos: {str(e)}", exc_info=True)
+            if _es_ajax(request):
+                return JsonResponse({'error': str(e)}, status=500)
             messages.error(request, f'❌ Error generando casos: {str(e)}')
             return redirect('extractor:ticket_detail', id=ticket.id)
     
@@ -201,44 +191,24 @@ def generar_desde_solicitud(request, solicitud_id):
                 descripcion=requerimiento_texto,
                 fuente='solicitud',
                 contenido_extraido=requerimiento_texto,
-                estado='procesando'
+                estado='pendiente',
+                creado_por=request.user
             )
             
-            # Generar casos con IA
-            casos_generados = ia_service.generar_casos_prueba(
-                requerimiento_texto,
-                contexto
+            # Generar casos con IA en segundo plano
+            encolar_generacion(
+                requerimiento,
+                contexto,
+                forzar=request.POST.get('forzar_regeneracion') == 'on',
+                usuario=request.user
             )
             
-            # Guardar casos generados
-            casos_creados = []
-            for caso_data in casos_generados:
-                caso = CasoPrueba.objects.create(
-                    requerimiento=requerimiento,
-                    solicitud=solicitud,
-                    proyecto=solicitud.proyecto,
-                    cliente=solicitud.cliente,
-                    identificador=caso_data.get('identificador', f"TC-{len(casos_creados)+1:03d}"),
-                    titulo=caso_data.get('titulo', ''),
-                    descripcion=caso_data.get('descripcion', ''),
-                    precondiciones='\n'.join(caso_data.get('precondiciones', [])),
-                    pasos=caso_data.get('pasos', []),
-                    resultados_esperados=caso_data.get('resultados_esperados', []),
-                    datos_prueba=caso_data.get('datos_prueba', {}),
-                    prioridad=caso_data.get('prioridad', 'media'),
-                    estado='borrador',
-                    created_by=request.user
-                )
-                casos_creados.append(caso)
-            
-            requerimiento.estado = 'completado'
-            requerimiento.save()
-            
-            messages.success(request, f'Se generaron {len(casos_creados)} casos de prueba exitosamente')
-            return redirect('ia_agent:ver_casos_solicitud', solicitud_id=solicitud.id)
+            return _respuesta_encolada(request, requerimiento, _url_resultado(requerimiento))
             
         except Exception as e:
             logger.error(f"Error generando casos desde solicitud {solicitud_id}: {str(e)}")
+            if _es_ajax(request):
+                return JsonResponse({'error': str(e)}, status=500)
             messages.error(request, f'Error generando casos: {str(e)}')
             return redirect('ia_agent:ver_casos_solicitud', solicitud_id=solicitud.id)
     
@@ -273,37 +243,18 @@ def generar_desde_url(request):
                 fuente='url',
                 url_origen=url,
                 contenido_extraido=resultado['contenido'],
-                estado='procesando'
+                estado='pendiente',
+                creado_por=request.user
             )
             
-            # Generar casos con IA
-            casos_generados = ia_service.generar_casos_prueba(
-                resultado['contenido']
+            # Generar casos con IA en segundo plano
+            encolar_generacion(
+                requerimiento,
+                forzar=request.POST.get('forzar_regeneracion') == 'on',
+                usuario=request.user
             )
             
-            # Guardar casos generados
-            casos_creados = []
-            for caso_data in casos_generados:
-                caso = CasoPrueba.objects.create(
-                    requerimiento=requerimiento,
-                    identificador=caso_data.get('identificador', f"TC-{len(casos_creados)+1:03d}"),
-                    titulo=caso_data.get('titulo', ''),
-                    descripcion=caso_data.get('descripcion', ''),
-                    precondiciones='\n'.join(caso_data.get('precondiciones', [])),
-                    pasos=caso_data.get('pasos', []),
-                    resultados_esperados=caso_data.get('resultados_esperados', []),
-                    datos_prueba=caso_data.get('datos_prueba', {}),
-                    prioridad=caso_data.get('prioridad', 'media'),
-                    estado='borrador',
-                    created_by=request.user
-                )
-                casos_creados.append(caso)
-            
-            requerimiento.estado = 'completado'
-            requerimiento.save()
-            
-            messages.success(request, f'Se generaron {len(casos_creados)} casos de prueba desde la URL')
-            return redirect('ia_agent:ver_casos_requerimiento', requerimiento_id=requerimiento.id)
+            return _respuesta_encolada(request, requerimiento, _url_resultado(requerimiento))
             
         except Exception as e:
             logger.error(f"Error procesando URL {url}: {str(e)}")
@@ -436,10 +387,53 @@ def api_generar_casos(request):
             if not texto:
                 return JsonResponse({'error': 'Texto requerido'}, status=400)
             
-            casos = ia_service.generar_casos_prueba(texto)
-            return JsonResponse({'casos': casos})
+            requerimiento = Requerimiento.objects.create(
+                titulo=texto.strip().split('\n', 1)[0][:200] or 'Texto libre',
+                descripcion=texto[:500],
+                fuente='texto',
+                contenido_extraido=texto,
+                estado='pendiente',
+                creado_por=request.user
+            )
+            encolar_generacion(requerimiento, forzar=bool(data.get('forzar', False)), usuario=request.user)
+            
+            return JsonResponse({
+                'requerimiento_id': requerimiento.id,
+                'estado': requerimiento.estado,
+                'estado_url': reverse('ia_agent:estado_generacion', kwargs={'requerimiento_id': requerimiento.id}),
+            }, status=202)
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Método no permitido'}, status=405)
\ No newline at end of file
+    return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+
+@login_required
+def estado_generacion(request, requerimiento_id):
+    """Estado de una generación en segundo plano (consultado periódicamente por el front)"""
+    requerimiento = get_object_or_404(
+        Requerimiento.objects.only('id', 'estado', 'mensaje_error', 'ticket_id', 'solicitud_id'),
+        id=requerimiento_id
+    )
+    
+    respuesta = {
+        'requerimiento_id': requerimiento.id,
+        'estado': requerimiento.estado,
+        'estado_display': requerimiento.get_estado_display(),
+    }
+    
+    if requerimiento.estado == 'completado':
+        casos = list(
+            requerimiento.casos_prueba.values('id', 'identificador', 'titulo', 'prioridad')
+        )
+        respuesta['total_casos'] = len(casos)
+        respuesta['casos'] = casos
+        respuesta['redirect_url'] = _url_resultado(requerimiento)
+    elif requerimiento.estado == 'error':
+        respuesta['error'] = requerimiento.mensaje_error
+    else:
+        # Si el proceso que lo tenía murió, otro lo retoma
+        programar_recuperacion()
+    
+    return JsonResponse(respuesta)